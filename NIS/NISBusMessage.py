@@ -13,15 +13,16 @@ from __future__ import annotations
 from typing import Any, Dict, List, Union
 
 from tools.exceptions.messages import MessageValueError
-from tools.messages import AbstractResultMessage
+from tools.messages import ChunkedResultMessage
 from tools.message.block import QuantityArrayBlock, ValueArrayBlock
 from tools.tools import FullLogger
 
 LOGGER = FullLogger(__name__)
 
-class NISBusMessage(AbstractResultMessage):
+class NISBusMessage(ChunkedResultMessage):
     """the message class contain the structure for what is published
     to the Init.NIS.NetworkBusInfo by NIS component"""
+    __slots__ = ("__bus_name", "__bus_type", "__bus_voltage_base")
 
     CLASS_MESSAGE_TYPE = "Init.NIS.NetworkBusInfo"
     MESSAGE_TYPE_CHECK = True
@@ -38,6 +39,7 @@ class NISBusMessage(AbstractResultMessage):
     }
     # list all attributes that are optional here (use the JSON attribute names)
     OPTIONAL_ATTRIBUTES = []
+    STORED_VALUE_ATTRIBUTES = list(MESSAGE_ATTRIBUTES)
     # all attributes that are using the Quantity block format should be listed here
     QUANTITY_BLOCK_ATTRIBUTES = {
     }
@@ -52,20 +54,20 @@ class NISBusMessage(AbstractResultMessage):
     # always include these definitions to update the full list of attributes to these class variables
     # no need to modify anything here
     MESSAGE_ATTRIBUTES_FULL = {
-        **AbstractResultMessage.MESSAGE_ATTRIBUTES_FULL,
+        **ChunkedResultMessage.MESSAGE_ATTRIBUTES_FULL,
         **MESSAGE_ATTRIBUTES
     }
-    OPTIONAL_ATTRIBUTES_FULL = AbstractResultMessage.OPTIONAL_ATTRIBUTES_FULL + OPTIONAL_ATTRIBUTES
+    OPTIONAL_ATTRIBUTES_FULL = ChunkedResultMessage.OPTIONAL_ATTRIBUTES_FULL + OPTIONAL_ATTRIBUTES
     QUANTITY_BLOCK_ATTRIBUTES_FULL = {
-        **AbstractResultMessage.QUANTITY_BLOCK_ATTRIBUTES_FULL,
+        **ChunkedResultMessage.QUANTITY_BLOCK_ATTRIBUTES_FULL,
         **QUANTITY_BLOCK_ATTRIBUTES
     }
     QUANTITY_ARRAY_BLOCK_ATTRIBUTES_FULL = {
-        **AbstractResultMessage.QUANTITY_ARRAY_BLOCK_ATTRIBUTES_FULL,
+        **ChunkedResultMessage.QUANTITY_ARRAY_BLOCK_ATTRIBUTES_FULL,
         **QUANTITY_ARRAY_BLOCK_ATTRIBUTES
     }
     TIMESERIES_BLOCK_ATTRIBUTES_FULL = (
-        AbstractResultMessage.TIMESERIES_BLOCK_ATTRIBUTES_FULL +
+        ChunkedResultMessage.TIMESERIES_BLOCK_ATTRIBUTES_FULL +
         TIMESERIES_BLOCK_ATTRIBUTES
     )
     ######################
@@ -94,7 +96,8 @@ class NISBusMessage(AbstractResultMessage):
 
     @bus_type.setter
     def bus_type(self, bus_type: List[str]):
-        if self._check_bus_type(bus_type):
+        # a single chunk need not contain the root bus, only the whole data set must have one
+        if self._check_bus_type(bus_type) and (self.is_chunk or self._check_root_bus(bus_type)):
             self.__bus_type=bus_type
         else:
             raise MessageValueError("Invalid value, {}, for attribute: bus_type".format(bus_type))
@@ -107,11 +110,25 @@ class NISBusMessage(AbstractResultMessage):
         usage_point_num=bus_type.count("usage-point")
         root_num=bus_type.count("root")
         total_numbers=len(bus_type)
-        if (dummy_num+usage_point_num+root_num==total_numbers) and (root_num==1):
+        if dummy_num+usage_point_num+root_num==total_numbers:
             return True
         else:
             return False
 
+    @classmethod
+    def _check_root_bus(cls, bus_type: List[str]) -> bool:
+        # there is one root bus unless the network was merged from feeders which each kept their own root
+        return bus_type.count("root")>=1
+
+    @classmethod
+    def validate_json(cls, json_message: Dict[str, Any]) -> bool:
+        if not super().validate_json(json_message):
+            return False
+        if json_message.get(cls.CHUNK_COUNT, None) is None and not cls._check_root_bus(json_message[cls.BusType]):
+            LOGGER.warning("There must be at least one root bus in BusType")
+            return False
+        return True
+
     ######################
     @property
     def bus_voltage_base(self) -> QuantityArrayBlock:
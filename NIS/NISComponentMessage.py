@@ -13,15 +13,19 @@ from __future__ import annotations
 from typing import Any, Dict, List, Union
 
 from tools.exceptions.messages import MessageValueError
-from tools.messages import AbstractResultMessage
+from tools.messages import ChunkedResultMessage
 from tools.message.block import QuantityBlock, QuantityArrayBlock
 from tools.tools import FullLogger
 
 LOGGER = FullLogger(__name__)
 
 ##################################################################################################################
-class NISComponentMessage(AbstractResultMessage):
+class NISComponentMessage(ChunkedResultMessage):
     """Description for the SimpleMessage class"""
+    __slots__ = (
+        "__power_base", "__device_id", "__sending_end_bus", "__receiving_end_bus", "__resistance", "__reactance",
+        "__shunt_admittance", "__shunt_conductance", "__rated_current"
+    )
     CLASS_MESSAGE_TYPE = "Init.NIS.NetworkComponentInfo"
     MESSAGE_TYPE_CHECK = True
 
@@ -44,11 +48,12 @@ class NISComponentMessage(AbstractResultMessage):
         RatedCurrent : "rated_current",
         SendingEndBus : "sending_end_bus",
         ReceivingEndBus : "receiving_end_bus",
-        DeviceId : "device_Id",
+        DeviceId : "device_id",
         PowerBase : "power_base"
     }
     # list all attributes that are optional here (use the JSON attribute names)
     OPTIONAL_ATTRIBUTES = []
+    STORED_VALUE_ATTRIBUTES = list(MESSAGE_ATTRIBUTES)
     # all attributes that are using the Quantity array block format should be listed here
     QUANTITY_ARRAY_BLOCK_ATTRIBUTES = {
         Resistance : "{pu}",
@@ -66,20 +71,20 @@ class NISComponentMessage(AbstractResultMessage):
     # always include these definitions to update the full list of attributes to these class variables
     # no need to modify anything here
     MESSAGE_ATTRIBUTES_FULL = {
-        **AbstractResultMessage.MESSAGE_ATTRIBUTES_FULL,
+        **ChunkedResultMessage.MESSAGE_ATTRIBUTES_FULL,
         **MESSAGE_ATTRIBUTES
     }
-    OPTIONAL_ATTRIBUTES_FULL = AbstractResultMessage.OPTIONAL_ATTRIBUTES_FULL + OPTIONAL_ATTRIBUTES
+    OPTIONAL_ATTRIBUTES_FULL = ChunkedResultMessage.OPTIONAL_ATTRIBUTES_FULL + OPTIONAL_ATTRIBUTES
     QUANTITY_BLOCK_ATTRIBUTES_FULL = {
-        **AbstractResultMessage.QUANTITY_BLOCK_ATTRIBUTES_FULL,
+        **ChunkedResultMessage.QUANTITY_BLOCK_ATTRIBUTES_FULL,
         **QUANTITY_BLOCK_ATTRIBUTES
     }
     QUANTITY_ARRAY_BLOCK_ATTRIBUTES_FULL = {
-        **AbstractResultMessage.QUANTITY_ARRAY_BLOCK_ATTRIBUTES_FULL,
+        **ChunkedResultMessage.QUANTITY_ARRAY_BLOCK_ATTRIBUTES_FULL,
         **QUANTITY_ARRAY_BLOCK_ATTRIBUTES
     }
     TIMESERIES_BLOCK_ATTRIBUTES_FULL = (
-        AbstractResultMessage.TIMESERIES_BLOCK_ATTRIBUTES_FULL +
+        ChunkedResultMessage.TIMESERIES_BLOCK_ATTRIBUTES_FULL +
         TIMESERIES_BLOCK_ATTRIBUTES
     )
 
@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This software was developed as a part of doctroal studies of Mehdi Attar, funded by Fortum and Neste Foundation.
+#  This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Mehdi Attar <mehdi.attar@tuni.fi>
+#            software template: Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""
+Module containing the message class for the changes in the NIS data.
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Union
+
+from tools.exceptions.messages import MessageValueError
+from tools.messages import AbstractResultMessage
+from tools.message.block import QuantityBlock, QuantityArrayBlock
+from tools.tools import FullLogger
+
+LOGGER = FullLogger(__name__)
+
+BUS_TYPES = ("root", "dummy", "usage-point")
+
+##################################################################################################################
+class NISDeltaMessage(AbstractResultMessage):
+    """
+    The message class for the changes in the network information data after the NIS json file has been modified.
+    The branch attributes contain the rows of the added and changed branches and the bus attributes the rows of
+    the added and changed buses in the same format as in NISComponentMessage and NISBusMessage.
+    RemovedDeviceId and RemovedBusName list the branches and buses that no longer exist.
+    PowerBase is only included if it has changed.
+    """
+    __slots__ = (
+        "__bus_name", "__bus_type", "__bus_voltage_base", "__device_id", "__power_base", "__rated_current",
+        "__reactance", "__receiving_end_bus", "__removed_bus_name", "__removed_device_id", "__resistance",
+        "__sending_end_bus", "__shunt_admittance", "__shunt_conductance"
+    )
+    CLASS_MESSAGE_TYPE = "NIS.NetworkDelta"
+    MESSAGE_TYPE_CHECK = True
+
+    PowerBase = "PowerBase"
+    DeviceId = "DeviceId"
+    SendingEndBus = "SendingEndBus"
+    ReceivingEndBus = "ReceivingEndBus"
+    Resistance = "Resistance"
+    Reactance = "Reactance"
+    ShuntAdmittance = "ShuntAdmittance"
+    ShuntConductance = "ShuntConductance"
+    RatedCurrent = "RatedCurrent"
+    RemovedDeviceId = "RemovedDeviceId"
+    BusName = "BusName"
+    BusType = "BusType"
+    BusVoltageBase = "BusVoltageBase"
+    RemovedBusName = "RemovedBusName"
+
+    # all attributes specific that are added to the AbstractResult should be introduced here
+    MESSAGE_ATTRIBUTES = {
+        PowerBase : "power_base",
+        DeviceId : "device_id",
+        SendingEndBus : "sending_end_bus",
+        ReceivingEndBus : "receiving_end_bus",
+        Resistance : "resistance",
+        Reactance : "reactance",
+        ShuntAdmittance : "shunt_admittance",
+        ShuntConductance : "shunt_conductance",
+        RatedCurrent : "rated_current",
+        RemovedDeviceId : "removed_device_id",
+        BusName : "bus_name",
+        BusType : "bus_type",
+        BusVoltageBase : "bus_voltage_base",
+        RemovedBusName : "removed_bus_name"
+    }
+    # list all attributes that are optional here (use the JSON attribute names)
+    OPTIONAL_ATTRIBUTES = [PowerBase]
+    STORED_VALUE_ATTRIBUTES = list(MESSAGE_ATTRIBUTES)
+    # all attributes that are using the Quantity block format should be listed here
+    QUANTITY_BLOCK_ATTRIBUTES = {
+        PowerBase : "kV.A"
+    }
+    # all attributes that are using the Quantity array block format should be listed here
+    QUANTITY_ARRAY_BLOCK_ATTRIBUTES = {
+        Resistance : "{pu}",
+        Reactance : "{pu}",
+        ShuntAdmittance : "{pu}",
+        ShuntConductance : "{pu}",
+        RatedCurrent : "{pu}",
+        BusVoltageBase : "kV"
+    }
+    # all attributes that are using the Time series block format should be listed here
+    TIMESERIES_BLOCK_ATTRIBUTES = []
+    # always include these definitions to update the full list of attributes to these class variables
+    # no need to modify anything here
+    MESSAGE_ATTRIBUTES_FULL = {
+        **AbstractResultMessage.MESSAGE_ATTRIBUTES_FULL,
+        **MESSAGE_ATTRIBUTES
+    }
+    OPTIONAL_ATTRIBUTES_FULL = AbstractResultMessage.OPTIONAL_ATTRIBUTES_FULL + OPTIONAL_ATTRIBUTES
+    QUANTITY_BLOCK_ATTRIBUTES_FULL = {
+        **AbstractResultMessage.QUANTITY_BLOCK_ATTRIBUTES_FULL,
+        **QUANTITY_BLOCK_ATTRIBUTES
+    }
+    QUANTITY_ARRAY_BLOCK_ATTRIBUTES_FULL = {
+        **AbstractResultMessage.QUANTITY_ARRAY_BLOCK_ATTRIBUTES_FULL,
+        **QUANTITY_ARRAY_BLOCK_ATTRIBUTES
+    }
+    TIMESERIES_BLOCK_ATTRIBUTES_FULL = (
+        AbstractResultMessage.TIMESERIES_BLOCK_ATTRIBUTES_FULL +
+        TIMESERIES_BLOCK_ATTRIBUTES
+    )
+
+    #########
+
+    @property
+    def power_base(self) -> Optional[QuantityBlock]:
+        """The value of the PowerBase attribute."""
+        return self.__power_base
+
+    @power_base.setter
+    def power_base(self, power_base: Union[QuantityBlock, Dict[str, Any], None]):
+        if self._check_power_base(power_base):
+            self._set_quantity_block_value(self.PowerBase, power_base)
+        else:
+            raise MessageValueError("Invalid value, {}, for attribute: PowerBase".format(power_base))
+
+    @classmethod
+    def _check_power_base(cls, power_base: Union[QuantityBlock, Dict[str, Any], None]) -> bool:
+        return cls._check_quantity_block(
+            value=power_base,
+            unit=cls.QUANTITY_BLOCK_ATTRIBUTES[cls.PowerBase],
+            can_be_none=True)
+
+    ########
+
+    @property
+    def device_id(self) -> List[str]:
+        """The value of the DeviceId attribute."""
+        return self.__device_id
+
+    @device_id.setter
+    def device_id(self, device_id: List[str]):
+        if self._check_device_id(device_id):
+            self.__device_id = device_id
+        else:
+            raise MessageValueError("Invalid value, {}, for attribute: DeviceId".format(device_id))
+
+    @classmethod
+    def _check_device_id(cls, device_id: List[str]) -> bool:
+        return cls._check_string_list(device_id)
+
+    ########
+
+    @property
+    def sending_end_bus(self) -> List[str]:
+        """The value of the SendingEndBus attribute."""
+        return self.__sending_end_bus
+
+    @sending_end_bus.setter
+    def sending_end_bus(self, sending_end_bus: List[str]):
+        if self._check_sending_end_bus(sending_end_bus):
+            self.__sending_end_bus = sending_end_bus
+        else:
+            raise MessageValueError("Invalid value, {}, for attribute: SendingEndBus".format(sending_end_bus))
+
+    @classmethod
+    def _check_sending_end_bus(cls, sending_end_bus: List[str]) -> bool:
+        return cls._check_string_list(sending_end_bus)
+
+    ########
+
+    @property
+    def receiving_end_bus(self) -> List[str]:
+        """The value of the ReceivingEndBus attribute."""
+        return self.__receiving_end_bus
+
+    @receiving_end_bus.setter
+    def receiving_end_bus(self, receiving_end_bus: List[str]):
+        if self._check_receiving_end_bus(receiving_end_bus):
+            self.__receiving_end_bus = receiving_end_bus
+        else:
+            raise MessageValueError("Invalid value, {}, for attribute: ReceivingEndBus".format(receiving_end_bus))
+
+    @classmethod
+    def _check_receiving_end_bus(cls, receiving_end_bus: List[str]) -> bool:
+        return cls._check_string_list(receiving_end_bus)
+
+    ########
+
+    @property
+    def resistance(self) -> QuantityArrayBlock:
+        """The value of the Resistance attribute."""
+        return self.__resistance
+
+    @resistance.setter
+    def resistance(self, resistance: Union[QuantityArrayBlock, Dict[str, Any]]):
+        if self._check_resistance(resistance):
+            self._set_quantity_array_block_value(self.Resistance, resistance)
+        else:
+            raise MessageValueError("Invalid value, {}, for attribute: Resistance".format(resistance))
+
+    @classmethod
+    def _check_resistance(cls, resistance: Union[List[float], QuantityArrayBlock, Dict[str, Any]]) -> bool:
+        return cls._check_quantity_array_block(
+            value=resistance,
+            unit=cls.QUANTITY_ARRAY_BLOCK_ATTRIBUTES[cls.Resistance])
+
+    ########
+
+    @property
+    def reactance(self) -> QuantityArrayBlock:
+        """The value of the Reactance attribute."""
+        return self.__reactance
+
+    @reactance.setter
+    def reactance(self, reactance: Union[QuantityArrayBlock, Dict[str, Any]]):
+        if self._check_reactance(reactance):
+            self._set_quantity_array_block_value(self.Reactance, reactance)
+        else:
+            raise MessageValueError("Invalid value, {}, for attribute: Reactance".format(reactance))
+
+    @classmethod
+    def _check_reactance(cls, reactance: Union[List[float], QuantityArrayBlock, Dict[str, Any]]) -> bool:
+        return cls._check_quantity_array_block(
+            value=reactance,
+            unit=cls.QUANTITY_ARRAY_BLOCK_ATTRIBUTES[cls.Reactance])
+
+    ########
+
+    @property
+    def shunt_admittance(self) -> QuantityArrayBlock:
+        """The value of the ShuntAdmittance attribute."""
+        return self.__shunt_admittance
+
+    @shunt_admittance.setter
+    def shunt_admittance(self, shunt_admittance: Union[QuantityArrayBlock, Dict[str, Any]]):
+        if self._check_shunt_admittance(shunt_admittance):
+            self._set_quantity_array_block_value(self.ShuntAdmittance, shunt_admittance)
+        else:
+            raise MessageValueError("Invalid value, {}, for attribute: ShuntAdmittance".format(shunt_admittance))
+
+    @classmethod
+    def _check_shunt_admittance(cls, shunt_admittance: Union[List[float], QuantityArrayBlock, Dict[str, Any]]) -> bool:
+        return cls._check_quantity_array_block(
+            value=shunt_admittance,
+            unit=cls.QUANTITY_ARRAY_BLOCK_ATTRIBUTES[cls.ShuntAdmittance])
+
+    ########
+
+    @property
+    def shunt_conductance(self) -> QuantityArrayBlock:
+        """The value of the ShuntConductance attribute."""
+        return self.__shunt_conductance
+
+    @shunt_conductance.setter
+    def shunt_conductance(self, shunt_conductance: Union[QuantityArrayBlock, Dict[str, Any]]):
+        if self._check_shunt_conductance(shunt_conductance):
+            self._set_quantity_array_block_value(self.ShuntConductance, shunt_conductance)
+        else:
+            raise MessageValueError("Invalid value, {}, for attribute: ShuntConductance".format(shunt_conductance))
+
+    @classmethod
+    def _check_shunt_conductance(cls, shunt_conductance: Union[List[float], QuantityArrayBlock, Dict[str, Any]]) -> bool:
+        return cls._check_quantity_array_block(
+            value=shunt_conductance,
+            unit=cls.QUANTITY_ARRAY_BLOCK_ATTRIBUTES[cls.ShuntConductance])
+
+    ########
+
+    @property
+    def rated_current(self) -> QuantityArrayBlock:
+        """The value of the RatedCurrent attribute."""
+        return self.__rated_current
+
+    @rated_current.setter
+    def rated_current(self, rated_current: Union[QuantityArrayBlock, Dict[str, Any]]):
+        if self._check_rated_current(rated_current):
+            self._set_quantity_array_block_value(self.RatedCurrent, rated_current)
+        else:
+            raise MessageValueError("Invalid value, {}, for attribute: RatedCurrent".format(rated_current))
+
+    @classmethod
+    def _check_rated_current(cls, rated_current: Union[List[float], QuantityArrayBlock, Dict[str, Any]]) -> bool:
+        return cls._check_quantity_array_block(
+            value=rated_current,
+            unit=cls.QUANTITY_ARRAY_BLOCK_ATTRIBUTES[cls.RatedCurrent])
+
+    ########
+
+    @property
+    def removed_device_id(self) -> List[str]:
+        """The value of the RemovedDeviceId attribute."""
+        return self.__removed_device_id
+
+    @removed_device_id.setter
+    def removed_device_id(self, removed_device_id: List[str]):
+        if self._check_removed_device_id(removed_device_id):
+            self.__removed_device_id = removed_device_id
+        else:
+            raise MessageValueError("Invalid value, {}, for attribute: RemovedDeviceId".format(removed_device_id))
+
+    @classmethod
+    def _check_removed_device_id(cls, removed_device_id: List[str]) -> bool:
+        return cls._check_string_list(removed_device_id)
+
+    ########
+
+    @property
+    def bus_name(self) -> List[str]:
+        """The value of the BusName attribute."""
+        return self.__bus_name
+
+    @bus_name.setter
+    def bus_name(self, bus_name: List[str]):
+        if self._check_bus_name(bus_name):
+            self.__bus_name = bus_name
+        else:
+            raise MessageValueError("Invalid value, {}, for attribute: BusName".format(bus_name))
+
+    @classmethod
+    def _check_bus_name(cls, bus_name: List[str]) -> bool:
+        return cls._check_string_list(bus_name)
+
+    ########
+
+    @property
+    def bus_type(self) -> List[str]:
+        """The value of the BusType attribute."""
+        return self.__bus_type
+
+    @bus_type.setter
+    def bus_type(self, bus_type: List[str]):
+        if self._check_bus_type(bus_type):
+            self.__bus_type = bus_type
+        else:
+            raise MessageValueError("Invalid value, {}, for attribute: BusType".format(bus_type))
+
+    @classmethod
+    def _check_bus_type(cls, bus_type: List[str]) -> bool:
+        # unlike in the full bus data, the changed buses need not include the root bus
+        return isinstance(bus_type, list) and all(value in BUS_TYPES for value in bus_type)
+
+    ########
+
+    @property
+    def bus_voltage_base(self) -> QuantityArrayBlock:
+        """The value of the BusVoltageBase attribute."""
+        return self.__bus_voltage_base
+
+    @bus_voltage_base.setter
+    def bus_voltage_base(self, bus_voltage_base: Union[QuantityArrayBlock, Dict[str, Any]]):
+        if self._check_bus_voltage_base(bus_voltage_base):
+            self._set_quantity_array_block_value(self.BusVoltageBase, bus_voltage_base)
+        else:
+            raise MessageValueError("Invalid value, {}, for attribute: BusVoltageBase".format(bus_voltage_base))
+
+    @classmethod
+    def _check_bus_voltage_base(cls, bus_voltage_base: Union[List[float], QuantityArrayBlock, Dict[str, Any]]) -> bool:
+        return cls._check_quantity_array_block(
+            value=bus_voltage_base,
+            unit=cls.QUANTITY_ARRAY_BLOCK_ATTRIBUTES[cls.BusVoltageBase])
+
+    ########
+
+    @property
+    def removed_bus_name(self) -> List[str]:
+        """The value of the RemovedBusName attribute."""
+        return self.__removed_bus_name
+
+    @removed_bus_name.setter
+    def removed_bus_name(self, removed_bus_name: List[str]):
+        if self._check_removed_bus_name(removed_bus_name):
+            self.__removed_bus_name = removed_bus_name
+        else:
+            raise MessageValueError("Invalid value, {}, for attribute: RemovedBusName".format(removed_bus_name))
+
+    @classmethod
+    def _check_removed_bus_name(cls, removed_bus_name: List[str]) -> bool:
+        return cls._check_string_list(removed_bus_name)
+
+    ########
+
+    @classmethod
+    def _check_string_list(cls, values: List[str]) -> bool:
+        return isinstance(values, list) and all(isinstance(value, str) for value in values)
+
+NISDeltaMessage.register_to_factory()
@@ -8,20 +8,29 @@
 
 import asyncio
 import json
+from typing import Any, Dict, List, Optional, Tuple, Union
 # from multiprocessing import _BoundedSemaphoreType
 # from typing import Any, cast, Set, Union
 
 from tools.components import AbstractSimulationComponent
 from tools.exceptions.messages import MessageError
+from tools.message.chunk import get_chunk_ranges
+from tools.message.codec import CodecRegistry, JsonCodec
+from tools.message.template import MessageTemplate
 # from tools.messages import BaseMessage
 from tools.tools import FullLogger, load_environmental_variables
 
-from Fetcher import JsonFileNIS
+from Fetcher import JsonFileError, NetworkFileWatcher, find_feeder_files
+from NetworkDiff import NetworkDiff, diff_network_tables
+from NetworkTables import NetworkTables
+from Topology import TopologyIndex
+from Validation import validate_network_tables
 
 
 # import all the required messages from installed libraries
 from NIS.NISBusMessage import NISBusMessage
 from NIS.NISComponentMessage import NISComponentMessage
+from NIS.NISDeltaMessage import NISDeltaMessage
 
 # initialize logging object for the module
 LOGGER = FullLogger(__name__)
@@ -29,12 +38,27 @@ LOGGER = FullLogger(__name__)
 # topics
 BUS_DATA_TOPIC = "BUS_DATA_TOPIC"
 COMPONENT_DATA_TOPIC = "COMPONENT_DATA_TOPIC"
+DELTA_DATA_TOPIC = "DELTA_DATA_TOPIC"
 
 # time interval in seconds on how often to check whether the component is still running
 TIMEOUT = 2.0
 
-# input file name
+# input file name, directory or glob pattern for the feeder files
 NIS_JSON_FILE = "NIS_JSON_FILE"
+# whether to keep a binary cache of the parsed input file next to the input file
+NIS_USE_CACHE = "NIS_USE_CACHE"
+# whether to memory map the cache file so that the NIS processes on the same host share the network data
+NIS_MEMORY_MAP = "NIS_MEMORY_MAP"
+# whether to reload the input file when it changes during the simulation and publish the changes
+NIS_WATCH_FILE = "NIS_WATCH_FILE"
+# whether the feeders are merged under one shared root bus or each feeder keeps its own root
+NIS_SHARED_ROOT = "NIS_SHARED_ROOT"
+# the number of processes used to parse the feeder files, by default the number of processors
+NIS_LOAD_WORKERS = "NIS_LOAD_WORKERS"
+# the maximum number of rows in one bus or component message, 0 sends all the rows in one message
+NIS_CHUNK_SIZE = "NIS_CHUNK_SIZE"
+# the content type of the codec used for the NIS messages, by default JSON
+NIS_MESSAGE_CODEC = "NIS_MESSAGE_CODEC"
 
 
 class NIS(AbstractSimulationComponent): # the NIS class inherits from AbstractSimulationComponent class
@@ -50,26 +74,142 @@ class NIS(AbstractSimulationComponent): # the NIS class inherits from AbstractSi
     # Constructor
     def __init__(
             self,
-            component_data: dict,
-            bus_data: dict):
+            watcher: NetworkFileWatcher,
+            watch_file: bool = False,
+            single_root: bool = True,
+            network_tables: Optional[NetworkTables] = None,
+            chunk_size: int = 0,
+            message_codec: Optional[str] = None):
         """
         The NIS component is initiated in the beginning of the simulation by the simulation manager
-        and in every epoch, it publishes the NIS data. The NIS data is fetched from a class data called Fetcher.
+        and in every epoch, it publishes the NIS data. The NIS data is fetched from a class data called Fetcher
+        and it is kept in the columnar network tables until the messages are created.
+        The watcher loads the NIS data. Unless already loaded network_tables are given, the data is loaded in
+        an executor when the component is started, at the same time as the connection to the message bus is
+        being set up.
+        If watch_file is True, the NIS data is reloaded when the json file changes and the changes are published
+        as NISDeltaMessages in the following epochs.
+        single_root tells whether the network must have exactly one root bus.
+        If chunk_size is positive, the bus and component data are published in chunks of at most chunk_size rows.
+        Each chunk is sent as soon as it has been created and the consumers can reassemble the full data
+        with the ChunkAssembler from simulation-tools.
+        message_codec is the content type of the codec used for the NIS messages, for example
+        "application/x-simces-packed-arrays" sends the float arrays as packed binary data. By default JSON is used.
         """
 
         super().__init__()
-        self._component_data = component_data
-        self._bus_data = bus_data
+        self._watcher = watcher
+        self._watch_file = watch_file
+        self._single_root = single_root
+        self._chunk_size = chunk_size
+        self._network_tables = None
+        self._topology = None
+        self._load_task = None
+        # the pre-serialized bus and component messages with their topics, created when the data is loaded
+        self._message_templates = None
+        if network_tables is not None:
+            self._set_network_data(network_tables)
 
         # Load environmental variables for those parameters that were not given to the constructor.
         environment = load_environmental_variables(
             (COMPONENT_DATA_TOPIC, str, "Init.NIS.NetworkComponentInfo"),
-            (BUS_DATA_TOPIC, str, "Init.NIS.NetworkBusInfo")
+            (BUS_DATA_TOPIC, str, "Init.NIS.NetworkBusInfo"),
+            (DELTA_DATA_TOPIC, str, "NIS.NetworkDelta")
         )
         self.ComponentDataTopic=environment[COMPONENT_DATA_TOPIC]
         self.BusDataTopic=environment[BUS_DATA_TOPIC]
+        self.DeltaDataTopic=environment[DELTA_DATA_TOPIC]
+
+        # the receivers select the codec by the content type of the message, so other messages are not affected
+        for message_class in (NISBusMessage, NISComponentMessage, NISDeltaMessage):
+            CodecRegistry.set_message_type_codec(message_class.CLASS_MESSAGE_TYPE, message_codec)
         # The easiest way to ensure that the component will listen to all necessary topics
 
+    @property
+    def topology(self) -> Optional[TopologyIndex]:
+        """The topology index of the network: adjacency, traversal orders, parents and depths."""
+        return self._topology
+
+    async def start(self) -> None:
+        """Starts loading the NIS data in the background and then starts the component."""
+        if self._network_tables is None and self._load_task is None:
+            self._load_task = asyncio.create_task(self._load_network())
+        await super().start()
+
+    async def set_simulation_state(self, new_simulation_state: str) -> None:
+        """Waits for the NIS data to be loaded before the component reports that it is ready."""
+        if new_simulation_state == AbstractSimulationComponent.SIMULATION_STATE_VALUE_RUNNING:
+            await self._wait_for_network()
+        await super().set_simulation_state(new_simulation_state)
+
+    def _set_network_data(self, network_tables: NetworkTables) -> None:
+        """Validates the given network tables, builds their topology index and starts using them."""
+        report = validate_network_tables(network_tables, self._single_root)
+        if report.is_valid:
+            LOGGER.info(str(report))
+        else:
+            for issue in report.issues:
+                LOGGER.error(f"Invalid network data: {issue}")
+
+        topology = TopologyIndex(network_tables)
+        for problem in topology.describe_problems(network_tables):
+            LOGGER.warning(f"The network is not radial: {problem}")
+
+        self._network_tables = network_tables
+        self._topology = topology
+
+    def _load_network_data(self) -> None:
+        """Loads the NIS data with the watcher and serializes the messages in advance. This is run in an executor."""
+        self._set_network_data(self._watcher.load())
+        self._message_templates = self._create_message_templates()
+
+    def _create_message_templates(self) -> Optional[List[Tuple[str, MessageTemplate]]]:
+        """
+        Creates the bus and component messages as templates in which only the header attributes are filled in
+        when the messages are sent in the first epoch. This way the serialization of the arrays is done while
+        the connection to the message bus is being set up.
+        Returns None if the messages are not sent as JSON or the templates could not be created.
+        """
+        message_topics = ((NISBusMessage, self.BusDataTopic), (NISComponentMessage, self.ComponentDataTopic))
+        for message_class, topic in message_topics:
+            if not isinstance(CodecRegistry.select_codec(topic, message_class.CLASS_MESSAGE_TYPE), JsonCodec):
+                return None
+
+        header_attributes = {"EpochNumber": 1, "TriggeringMessageIds": [f"{self.component_name}-template"]}
+        templates = []
+        try:
+            for rows, chunk_attributes in self._get_chunks(self._network_tables.bus_count):
+                templates.append((self.BusDataTopic, self._message_generator.get_message_template(
+                    NISBusMessage, **header_attributes, **self._network_tables.bus_content(rows, float_arrays=True),
+                    **chunk_attributes)))
+            for rows, chunk_attributes in self._get_chunks(self._network_tables.branch_count):
+                templates.append((self.ComponentDataTopic, self._message_generator.get_message_template(
+                    NISComponentMessage, **header_attributes,
+                    **self._network_tables.component_content(rows, float_arrays=True),
+                    **chunk_attributes)))
+        except (ValueError, TypeError, MessageError) as message_error:
+            LOGGER.warning(f"Creating the messages when sending them: {type(message_error).__name__}: {message_error}")
+            return None
+        return templates
+
+    async def _load_network(self) -> None:
+        """Loads the NIS data in an executor and sets the initialization error if the loading fails."""
+        LOGGER.info(f"Loading the network data from {self._watcher.file_name}")
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._load_network_data)
+        except Exception as error:  # pylint: disable=broad-except
+            # any failure, e.g. a broken process pool, is reported with the error status instead of being raised
+            # again from each message handler that waits for the loading
+            LOGGER.error(f"Unable to load the network data: {type(error).__name__}: {error}")
+            self.initialization_error = f"Unable to load the network data: {error}"
+            return
+        LOGGER.info("The network data has been loaded")
+
+    async def _wait_for_network(self) -> None:
+        """Waits until the loading of the NIS data that was started with the component has finished."""
+        if self._load_task is not None:
+            await self._load_task
+
     def clear_epoch_variables(self) -> None:
         """Clears all the variables that are used to store information about the received input within the
            current epoch. This method is called automatically after receiving an epoch message for a new epoch.
@@ -85,16 +225,88 @@ class NIS(AbstractSimulationComponent): # the NIS class inherits from AbstractSi
         Otherwise, returns True, which indicates that the epoch processing was fully completed.
         This also indicated that the component is ready to send a Status Ready message to the Simulation Manager.
         """
-        # create and send NISBusMessage
-        if self._latest_epoch==1:      # NISBusMessage is only needed to be published in the first epoch
+        await self._wait_for_network()
+        if self._network_tables is None:
+            await self.send_error_message(self.initialization_error or "The network data is not available.")
+            return False
+
+        network_diff = None
+        if self._watch_file and self._watcher.has_changed():
+            network_diff = await self._reload_network()
+
+        if self._latest_epoch > 1 and network_diff is not None and not network_diff.is_empty:
+            return await self._send_delta_message(network_diff)
+
+        # NISBusMessage and NISComponentMessage are only needed to be published in the first epoch
+        if self._latest_epoch==1 and self._message_templates is not None:
+            if not await self._send_message_templates():
+                return False
+        elif self._latest_epoch==1:
+            if not await self._send_bus_messages():
+                return False
+            if not await self._send_component_messages():
+                return False
+
+        # return True to indicate that the component is finished with the current epoch
+        return True
+
+
+    def _get_chunks(self, row_count: int) -> List[Tuple[range, Dict[str, Any]]]:
+        """
+        Returns the row ranges for the messages and the chunk attributes for each of them.
+        If the data fits into one message, there are no chunk attributes.
+        """
+        row_ranges = get_chunk_ranges(row_count, self._chunk_size)
+        if len(row_ranges) == 1:
+            return [(row_ranges[0], {})]
+        dataset_hash = self._network_tables.content_hash
+        return [
+            (rows, {"ChunkIndex": chunk_index, "ChunkCount": len(row_ranges), "DatasetHash": dataset_hash})
+            for chunk_index, rows in enumerate(row_ranges)
+        ]
+
+    async def _send_message_templates(self) -> bool:
+        """
+        Sends the bus and component messages that were serialized when the data was loaded.
+        The templates are released after sending since they are only needed in the first epoch.
+        Returns False if the header attributes were not valid.
+        """
+        message_templates, self._message_templates = self._message_templates, None
+        messages = []
+        for topic, template in message_templates:
+            try:
+                _, message_bytes = self._message_generator.get_template_bytes(
+                    template,
+                    EpochNumber=self._latest_epoch,
+                    TriggeringMessageIds=self._triggering_message_ids
+                )
+            except (ValueError, TypeError, MessageError) as message_error:
+                LOGGER.error(f"{type(message_error).__name__}: {message_error}")
+                await self.send_error_message("Internal error when creating NIS message.")
+                return False
+
+            messages.append((topic, message_bytes))
+
+        # all the messages are queued at once so that they are published in as few batches as possible
+        await self._rabbitmq_client.send_messages(messages)
+        return True
+
+    async def _send_bus_messages(self) -> bool:
+        """
+        Creates and sends the NISBusMessages, one for each chunk of buses.
+        Returns False if a message could not be created.
+        """
+        for rows, chunk_attributes in self._get_chunks(self._network_tables.bus_count):
             try:
-                bus_message = self._message_generator.get_message(
+                bus_data = self._network_tables.bus_content(rows, float_arrays=True)
+                bus_message = self._get_message(
                     NISBusMessage,
                     EpochNumber=self._latest_epoch,
                     TriggeringMessageIds=self._triggering_message_ids,
-                    BusName=self._bus_data["BusName"],
-                    BusType=self._bus_data["BusType"],
-                    BusVoltageBase=self._bus_data["BusVoltageBase"]
+                    BusName=bus_data["BusName"],
+                    BusType=bus_data["BusType"],
+                    BusVoltageBase=bus_data["BusVoltageBase"],
+                    **chunk_attributes
                 )
             except (ValueError, TypeError, MessageError) as message_error:
                 # When there is an exception while creating the message, it is in most cases a serious error.
@@ -103,22 +315,30 @@ class NIS(AbstractSimulationComponent): # the NIS class inherits from AbstractSi
                 return False
 
             await self._send_message(bus_message, self.BusDataTopic)
+        return True
 
-            # create and send NISComponentMessage
+    async def _send_component_messages(self) -> bool:
+        """
+        Creates and sends the NISComponentMessages, one for each chunk of branches.
+        Returns False if a message could not be created.
+        """
+        for rows, chunk_attributes in self._get_chunks(self._network_tables.branch_count):
             try:
-                component_message = self._message_generator.get_message(
+                component_data = self._network_tables.component_content(rows, float_arrays=True)
+                component_message = self._get_message(
                     NISComponentMessage,
                     EpochNumber=self._latest_epoch,
                     TriggeringMessageIds=self._triggering_message_ids,
-                    PowerBase=self._component_data["PowerBase"],
-                    SendingEndBus=self._component_data["SendingEndBus"],
-                    ReceivingEndBus=self._component_data["ReceivingEndBus"],
-                    DeviceId=self._component_data["DeviceId"],
-                    Resistance=self._component_data["Resistance"],
-                    Reactance=self._component_data["Reactance"],
-                    ShuntAdmittance=self._component_data["ShuntAdmittance"],
-                    ShuntConductance=self._component_data["ShuntConductance"],
-                    RatedCurrent=self._component_data["RatedCurrent"]
+                    PowerBase=component_data["PowerBase"],
+                    SendingEndBus=component_data["SendingEndBus"],
+                    ReceivingEndBus=component_data["ReceivingEndBus"],
+                    DeviceId=component_data["DeviceId"],
+                    Resistance=component_data["Resistance"],
+                    Reactance=component_data["Reactance"],
+                    ShuntAdmittance=component_data["ShuntAdmittance"],
+                    ShuntConductance=component_data["ShuntConductance"],
+                    RatedCurrent=component_data["RatedCurrent"],
+                    **chunk_attributes
                 )
             except (ValueError, TypeError, MessageError) as message_error:
                 # When there is an exception while creating the message, it is in most cases a serious error.
@@ -127,15 +347,87 @@ class NIS(AbstractSimulationComponent): # the NIS class inherits from AbstractSi
                 return False
 
             await self._send_message(component_message, self.ComponentDataTopic)
+        return True
 
-        # return True to indicate that the component is finished with the current epoch
+    async def _reload_network(self) -> Union[NetworkDiff, None]:
+        """
+        Load the changed json file and replace the network data with it.
+        Returns the differences to the previous data or None if the new data could not be loaded,
+        in which case the previous data is kept.
+        """
+        LOGGER.info(f"The json file {self._watcher.file_name} has changed, loading the network data again.")
+        try:
+            network_diff = await asyncio.get_running_loop().run_in_executor(None, self._reload_network_data)
+        except Exception as error:  # pylint: disable=broad-except
+            LOGGER.error(f"Keeping the previous network data: {type(error).__name__}: {error}")
+            return None
+
+        LOGGER.info(f"Network data changes: {network_diff}")
+        return network_diff
+
+    def _reload_network_data(self) -> NetworkDiff:
+        """
+        Loads the changed NIS data with the watcher, compares it to the previous data and starts using it.
+        This is run in an executor, so that the message handling is not blocked while a large network is
+        loaded, validated and indexed. The previous data is kept if anything fails.
+        """
+        network_tables = self._watcher.load()
+        network_diff = diff_network_tables(self._network_tables, network_tables)
+        self._set_network_data(network_tables)
+        if self._message_templates is not None:
+            # the templates for the first epoch have not been sent yet, so they must be created from the new data
+            self._message_templates = self._create_message_templates()
+        return network_diff
+
+    async def _send_delta_message(self, network_diff: NetworkDiff) -> bool:
+        """
+        Send only the changed rows of the network data.
+        Returns False if the message could not be created.
+        """
+        try:
+            component_data = network_diff.component_content()
+            bus_data = network_diff.bus_content()
+            delta_message = self._get_message(
+                NISDeltaMessage,
+                EpochNumber=self._latest_epoch,
+                TriggeringMessageIds=self._triggering_message_ids,
+                PowerBase=component_data["PowerBase"] if network_diff.power_base_changed else None,
+                DeviceId=component_data["DeviceId"],
+                SendingEndBus=component_data["SendingEndBus"],
+                ReceivingEndBus=component_data["ReceivingEndBus"],
+                Resistance=component_data["Resistance"],
+                Reactance=component_data["Reactance"],
+                ShuntAdmittance=component_data["ShuntAdmittance"],
+                ShuntConductance=component_data["ShuntConductance"],
+                RatedCurrent=component_data["RatedCurrent"],
+                RemovedDeviceId=network_diff.removed_device_ids,
+                BusName=bus_data["BusName"],
+                BusType=bus_data["BusType"],
+                BusVoltageBase=bus_data["BusVoltageBase"],
+                RemovedBusName=network_diff.removed_bus_names
+            )
+        except (ValueError, TypeError, MessageError) as message_error:
+            LOGGER.error(f"{type(message_error).__name__}: {message_error}")
+            await self.send_error_message("Internal error when creating delta message.")
+            return False
+
+        await self._send_message(delta_message, self.DeltaDataTopic)
         return True
 
+    def _get_message(self, message_class, **kwargs):
+        """
+        Creates a new message of the given class. The network data that passed the validation at load time
+        is trusted, so the arrays are not checked again item by item.
+        """
+        if self._network_tables.trusted:
+            return self._message_generator.get_trusted_message(message_class, **kwargs)
+        return self._message_generator.get_message(message_class, **kwargs)
 
     async def _send_message(self, MessageContent, Topic):
+        # the message object is given as it is so that the client encodes it with the codec for the message type
         await self._rabbitmq_client.send_message(
             topic_name=Topic,
-            message_bytes=MessageContent.bytes())
+            message_bytes=MessageContent)
 
 
 def create_component() -> NIS:         # Factory function. making instance of the class
@@ -143,14 +435,30 @@ def create_component() -> NIS:         # Factory function. making instance of th
     Creates and returns a NIS Component based on the environment variables.
     """
     env_variables = load_environmental_variables(
-        (NIS_JSON_FILE, str, None )
+        (NIS_JSON_FILE, str, None ),
+        (NIS_USE_CACHE, bool, True),
+        (NIS_MEMORY_MAP, bool, False),
+        (NIS_WATCH_FILE, bool, False),
+        (NIS_SHARED_ROOT, bool, True),
+        (NIS_LOAD_WORKERS, int, None),
+        (NIS_CHUNK_SIZE, int, 0),
+        (NIS_MESSAGE_CODEC, str, None)
     )
-    LOGGER.warning("before opening the file")
 
-    json_file = JsonFileNIS(env_variables[NIS_JSON_FILE])
-    LOGGER.warning("after opening the file")
-    component_content, bus_content = json_file.get_data()
-    return NIS(component_content, bus_content)    # the birth of the NIS object
+    # the feeders that keep their own roots are checked to have at least one root
+    try:
+        single_root = env_variables[NIS_SHARED_ROOT] or len(find_feeder_files(env_variables[NIS_JSON_FILE])) == 1
+    except JsonFileError:
+        # the error is reported when the loading of the data fails
+        single_root = True
+    watcher = NetworkFileWatcher(
+        env_variables[NIS_JSON_FILE], env_variables[NIS_USE_CACHE], env_variables[NIS_MEMORY_MAP],
+        env_variables[NIS_SHARED_ROOT], env_variables[NIS_LOAD_WORKERS])
+
+    # the NIS data is loaded when the component is started
+    return NIS(    # the birth of the NIS object
+        watcher, env_variables[NIS_WATCH_FILE], single_root, chunk_size=env_variables[NIS_CHUNK_SIZE],
+        message_codec=env_variables[NIS_MESSAGE_CODEC])
 
 
 async def start_component():
@@ -12,9 +12,19 @@ Contains classes related to reading the NIS data from a JSON file.
 # from dataclasses import dataclass
 
 # import csv
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import glob
+import hashlib
 import json
+import os
+import re
+from typing import List, Optional, Tuple
 from tools.tools import FullLogger
 
+from NetworkStore import NetworkStoreError, open_network_store, read_network_store, write_network_store
+from NetworkTables import BusNameIndex, NetworkTables
+
 
 LOGGER = FullLogger(__name__)
 
@@ -44,6 +54,196 @@ class JsonFileError(Exception):
     '''
 
 
+class _JsonStream():
+    '''
+    Incremental reader for a JSON document stored in a text file.
+    The file is read in fixed-size chunks and only the chunk that is currently being parsed is kept in memory.
+    '''
+    WHITESPACE_PATTERN = re.compile(r'[ \t\n\r]*')
+    NUMBER_CHARACTERS = '0123456789.eE+-'
+
+    def __init__(self, json_file, chunk_size: int):
+        self._file = json_file
+        self._chunk_size = chunk_size
+        self._scan = json.JSONDecoder().scan_once
+        self._buffer = ''
+        self._position = 0
+        # the position of the beginning of the buffer in the whole file
+        self._offset = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        '''
+        Drop the already parsed part of the buffer and append the next chunk from the file to it.
+        Returns False if the end of the file has been reached.
+        '''
+        if self._eof:
+            return False
+
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+
+        self._buffer = self._buffer[self._position:] + chunk
+        self._offset += self._position
+        self._position = 0
+        return True
+
+    def _skip_whitespace(self) -> int:
+        '''
+        Move to the next non-whitespace character, reading more chunks when needed.
+        Returns the new position or -1 at the end of the file.
+        '''
+        while True:
+            position = _JsonStream.WHITESPACE_PATTERN.match(self._buffer, self._position).end()
+            self._position = position
+            if position < len(self._buffer):
+                return position
+            if not self._fill():
+                return -1
+
+    def peek(self) -> str:
+        '''
+        Return the next non-whitespace character without consuming it or an empty string at the end of the file.
+        '''
+        position = self._skip_whitespace()
+        return self._buffer[position] if position >= 0 else ''
+
+    def consume(self, character: str) -> bool:
+        '''
+        Consume the next non-whitespace character if it is the given one.
+        '''
+        if self.peek() == character:
+            self._position += 1
+            return True
+        return False
+
+    def expect(self, character: str):
+        '''
+        Consume the given character. Raises JsonFileError if the next non-whitespace character is something else.
+        '''
+        if not self.consume(character):
+            raise JsonFileError(f'Expected "{character}" but found "{self.peek()}" in the json file.')
+
+    def read_value(self):
+        '''
+        Decode the next complete JSON value. Intended for scalars and other small values.
+        '''
+        if self._skip_whitespace() < 0:
+            raise JsonFileError('Unexpected end of the json file.')
+        while True:
+            try:
+                value, end = self._scan(self._buffer, self._position)
+            except (StopIteration, json.JSONDecodeError) as error:
+                # the value can continue in the next chunk
+                if self._fill():
+                    continue
+                raise JsonFileError(f'Invalid json content at position {self._offset + self._position}.') from error
+
+            # a number at the end of the buffer can also continue in the next chunk
+            if self._at_buffer_end(end) and self._fill():
+                continue
+
+            self._position = end
+            return value
+
+    def read_array(self, extend):
+        '''
+        Decode the next JSON array and give its items to the given extend function in batches.
+        Each batch covers the complete items in the buffer and it is decoded with a single call to the json module.
+        Items are decoded one at a time only when the batch boundary cannot be determined, e.g. at a comma
+        inside a string value.
+        '''
+        self.expect('[')
+        if self.consume(']'):
+            return
+
+        # items before this position must be decoded one at a time
+        single_items_until = -1
+        while True:
+            buffer = self._buffer
+            position = self._position
+            array_end = buffer.find(']', position)
+            batch_end = array_end if array_end >= 0 else buffer.rfind(',', position)
+
+            if batch_end < 0 and self._fill():
+                continue
+
+            if batch_end > position and self._offset + position > single_items_until:
+                try:
+                    items = json.loads('[' + buffer[position:batch_end] + ']')
+                except json.JSONDecodeError:
+                    items = []
+                # an empty batch would mean a missing item, e.g. "[1, ]", which is handled by the single item case
+                if items:
+                    extend(items)
+                    self._position = batch_end + 1
+                    if array_end >= 0:
+                        return
+                    continue
+                single_items_until = self._offset + batch_end
+
+            extend([self.read_value()])
+            if not self.consume(','):
+                self.expect(']')
+                return
+
+    def _at_buffer_end(self, position: int) -> bool:
+        '''
+        Return True if the buffer ends at the given position when the number characters are skipped.
+        '''
+        buffer = self._buffer
+        buffer_length = len(buffer)
+        while position < buffer_length and buffer[position] in _JsonStream.NUMBER_CHARACTERS:
+            position += 1
+        return position == buffer_length
+
+    def iter_array(self):
+        '''
+        Iterate over the next JSON array. Yields once for each item and the caller must consume the item.
+        '''
+        self.expect('[')
+        if self.consume(']'):
+            return
+        while True:
+            yield
+            if not self.consume(','):
+                self.expect(']')
+                return
+
+    def iter_object(self):
+        '''
+        Iterate over the next JSON object. Yields the attribute names and the caller must consume the values.
+        '''
+        self.expect('{')
+        if self.consume('}'):
+            return
+        while True:
+            key = self.read_value()
+            if not isinstance(key, str):
+                raise JsonFileError(f'Invalid attribute name {key} in the json file.')
+            self.expect(':')
+            yield key
+            if not self.consume(','):
+                self.expect('}')
+                return
+
+    def skip_value(self):
+        '''
+        Consume the next JSON value without building it in memory.
+        '''
+        character = self.peek()
+        if character == '[':
+            for _ in self.iter_array():
+                self.skip_value()
+        elif character == '{':
+            for _ in self.iter_object():
+                self.skip_value()
+        else:
+            self.read_value()
+
+
 class JsonFileNIS():
     '''
     Class for getting the network information data from a JSON file.
@@ -66,41 +266,349 @@ class JsonFileNIS():
     }
     REQUIRED_FIELDS = COMPONENT_KEYS.union(BUS_KEYS)
 
+    # attributes that are stored as arrays of floats, the values can also be given as quantity array blocks
+    FLOAT_ARRAY_KEYS = {
+        'Resistance',
+        'Reactance',
+        'ShuntAdmittance',
+        'ShuntConductance',
+        'RatedCurrent',
+        'BusVoltageBase'
+    }
+    # attributes that are stored as lists of strings
+    STRING_ARRAY_KEYS = {
+        'DeviceId',
+        'BusName',
+        'BusType'
+    }
+    # attributes that contain bus names and are stored as arrays of bus indices
+    BUS_INDEX_KEYS = {
+        'SendingEndBus',
+        'ReceivingEndBus'
+    }
+    VALUES_ATTRIBUTE = 'Values'
+    UNIT_OF_MEASURE_ATTRIBUTE = 'UnitOfMeasure'
+
+    # number of characters read from the file at a time
+    CHUNK_SIZE = 1 << 16
+
+    # increase this when a change in the loader changes the produced tables, it invalidates the cache files
+    LOADER_VERSION = 2
+
     def __init__(self, file_name: str):
         '''
-        Create object which uses the given json file that uses the given delimiter.
+        Create object which reads the network information from the given json file.
+        The file is parsed incrementally and it is closed as soon as the parsing has ended.
         Raises JsonFileError if file cannot be read e.g. file not found, or it is missing required attributes.
         '''
-        #LOGGER.warning("beginning of the file opener")
-        self._file = None  # required if there is no file and the __del__ method is executed
-        try:
-            self._file = open(file_name, newline="", encoding="utf-8")
+        self._arrays = {}
+        self._units = {}
+        self._power_base = None
+        self._bus_index = None
+        # True if the end point names were interned before the bus names were known
+        self._provisional_index = False
 
+        try:
+            json_file = open(file_name, newline="", encoding="utf-8")
         except Exception as e:
             raise JsonFileError(f'Unable to read json file {file_name}: {str( e )}.')
 
-        #LOGGER.warning("after openning the json file")
-        try:
-            self._pythonComponent = json.load(self._file)
-        except Exception as e:
-            LOGGER.error(f"error of the json loading{e} - {file_name}")
+        with json_file:
+            try:
+                fields = self._parse(_JsonStream(json_file, JsonFileNIS.CHUNK_SIZE))
+            except JsonFileError as error:
+                LOGGER.error(f"error of the json loading {error} - {file_name}")
+                raise
+            except (OSError, UnicodeDecodeError) as error:
+                raise JsonFileError(f'Unable to read json file {file_name}: {str( error )}.')
 
-        # check that self._json.keys has required attributes
-        fields = set(self._pythonComponent.keys())           # .keys are attributes of the json file
         # missing contains fields that do not exist or is empty if all fields exist.
         missing = JsonFileNIS.REQUIRED_FIELDS.difference(fields)
         if len(missing) > 0:
             raise JsonFileError(f'Resource state source json file missing required attribute: {",".join( missing )}.')
-        self._component_content = {key: self._pythonComponent[key] for key in JsonFileNIS.COMPONENT_KEYS}
-        self._bus_content = {key: self._pythonComponent[key] for key in JsonFileNIS.BUS_KEYS}
+
+        self._tables = self._create_tables()
+        # the tables own the parsed arrays from now on
+        self._arrays = {}
+        self._bus_index = None
+
+    def _parse(self, stream: _JsonStream) -> set:
+        '''
+        Read the required attributes from the stream into typed storage and skip all the other attributes.
+        Returns the names of the attributes found in the json file.
+        '''
+        fields = set()
+        for key in stream.iter_object():
+            fields.add(key)
+            if key in JsonFileNIS.FLOAT_ARRAY_KEYS:
+                self._arrays[key] = self._read_float_array(stream, key)
+            elif key in JsonFileNIS.BUS_INDEX_KEYS:
+                self._arrays[key] = self._read_bus_indices(stream, key)
+            elif key in JsonFileNIS.STRING_ARRAY_KEYS:
+                self._arrays[key] = self._read_string_array(stream, key)
+                if key == 'BusName' and self._bus_index is None:
+                    self._bus_index = BusNameIndex(self._arrays[key])
+            elif key == 'PowerBase':
+                self._power_base = stream.read_value()
+            else:
+                stream.skip_value()
+
+        if stream.peek() != '':
+            raise JsonFileError('Unexpected content after the end of the json object.')
+        return fields
+
+    def _read_float_array(self, stream: _JsonStream, key: str) -> array:
+        '''
+        Read a list of floats or a quantity array block into an array of doubles.
+        '''
+        if stream.peek() == '{':
+            values = None
+            for block_key in stream.iter_object():
+                if block_key == JsonFileNIS.VALUES_ATTRIBUTE:
+                    values = self._read_float_array(stream, key)
+                elif block_key == JsonFileNIS.UNIT_OF_MEASURE_ATTRIBUTE:
+                    self._units[key] = stream.read_value()
+                else:
+                    stream.skip_value()
+            if values is None:
+                raise JsonFileError(f'The attribute {key} is missing the {JsonFileNIS.VALUES_ATTRIBUTE} array.')
+            return values
+
+        values = array('d')
+        try:
+            stream.read_array(values.extend)
+        except (TypeError, OverflowError) as error:
+            # an integer too large for a double raises OverflowError
+            raise JsonFileError(f'The attribute {key} must contain only numbers.') from error
+        return values
+
+    @staticmethod
+    def _read_string_array(stream: _JsonStream, key: str) -> list:
+        '''
+        Read a list of strings.
+        '''
+        values = []
+        stream.read_array(values.extend)
+        if not all(isinstance(value, str) for value in values):
+            raise JsonFileError(f'The attribute {key} must contain only strings.')
+        return values
+
+    def _read_bus_indices(self, stream: _JsonStream, key: str) -> array:
+        '''
+        Read a list of bus names directly into an array of bus indices.
+        If the bus names have not been read yet, the names are indexed in the order they are first seen
+        and the indices are remapped once the bus names are known.
+        '''
+        if self._bus_index is None:
+            self._bus_index = BusNameIndex()
+            self._provisional_index = True
+
+        indices = array(NetworkTables.INDEX_TYPECODE)
+        extend_indices = self._bus_index.extend_indices
+
+        def extend(names: list):
+            for name in names:
+                if not isinstance(name, str):
+                    raise JsonFileError(f'The attribute {key} must contain only strings.')
+            extend_indices(indices, names)
+
+        stream.read_array(extend)
+        return indices
+
+    def _create_tables(self) -> NetworkTables:
+        '''Create the network tables from the parsed arrays.'''
+        bus_name = self._arrays['BusName']
+        sending_end_bus = self._arrays['SendingEndBus']
+        receiving_end_bus = self._arrays['ReceivingEndBus']
+        bus_index = self._bus_index
+        if self._provisional_index:
+            # the end point names were indexed before the bus names were read, give the buses their own indices
+            bus_index = BusNameIndex(bus_name)
+            remap = [bus_index.intern(name) for name in self._bus_index.names]
+            sending_end_bus = array(NetworkTables.INDEX_TYPECODE, map(remap.__getitem__, sending_end_bus))
+            receiving_end_bus = array(NetworkTables.INDEX_TYPECODE, map(remap.__getitem__, receiving_end_bus))
+
+        bus_type, bus_type_names = NetworkTables.intern_bus_types(self._arrays['BusType'])
+        return NetworkTables(
+            power_base=self._power_base,
+            device_id=self._arrays['DeviceId'],
+            sending_end_bus=sending_end_bus,
+            receiving_end_bus=receiving_end_bus,
+            float_arrays={key: self._arrays[key] for key in JsonFileNIS.FLOAT_ARRAY_KEYS},
+            bus_name=bus_name,
+            bus_type=bus_type,
+            bus_type_names=bus_type_names,
+            units=dict(self._units),
+            bus_index=bus_index
+        )
+
+    def get_tables(self) -> NetworkTables:
+        '''Return the data parsed from the JSON file as network tables.'''
+        return self._tables
 
     def get_data(self):
         '''Return the data parsed from the JSON file.'''
-        return self._component_content, self._bus_content
+        return self._tables.component_content(), self._tables.bus_content()
+
+
+CACHE_FILE_SUFFIX = '.cache'
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def get_source_key(file_name: str) -> str:
+    '''
+    Return the key that identifies the content of the given json file and the loader version.
+    Raises JsonFileError if the file cannot be read.
+    '''
+    file_hash = hashlib.sha256()
+    try:
+        with open(file_name, 'rb') as source_file:
+            for chunk in iter(lambda: source_file.read(HASH_CHUNK_SIZE), b''):
+                file_hash.update(chunk)
+    except OSError as error:
+        raise JsonFileError(f'Unable to read json file {file_name}: {str( error )}.')
+
+    return f'{JsonFileNIS.LOADER_VERSION}-{file_hash.hexdigest()}'
+
+
+def load_network_tables(file_name: str, use_cache: bool = True, memory_map: bool = False) -> NetworkTables:
+    '''
+    Return the network tables for the given json file.
+    If use_cache is True, the tables are read from the cache file next to the json file when the cache was
+    created from the same file content with the same loader version. Otherwise, the json file is parsed and
+    the cache file is rewritten. Problems with the cache file are only logged.
+    If also memory_map is True, the cache file is opened as a read-only memory map instead of reading it,
+    which allows all the processes using the same json file to share the array data.
+    Raises JsonFileError if the json file cannot be read.
+    '''
+    if not use_cache:
+        return JsonFileNIS(file_name).get_tables()
+
+    read_cache = open_network_store if memory_map else read_network_store
+    cache_file_name = file_name + CACHE_FILE_SUFFIX
+    source_key = get_source_key(file_name)
+    try:
+        tables = read_cache(cache_file_name, source_key)
+        LOGGER.info(f"Network data loaded from the cache file {cache_file_name}")
+        return tables
+    except NetworkStoreError as error:
+        LOGGER.info(f"Cache file not used: {error}")
+
+    tables = JsonFileNIS(file_name).get_tables()
+    try:
+        write_network_store(tables, cache_file_name, source_key)
+    except OSError as error:
+        LOGGER.warning(f"Unable to write the cache file {cache_file_name}: {error}")
+        return tables
+
+    if memory_map:
+        # use the shared mapping also in the process that created the cache file
+        try:
+            return open_network_store(cache_file_name, source_key)
+        except NetworkStoreError as error:
+            LOGGER.warning(f"Unable to open the cache file {cache_file_name}: {error}")
+    return tables
+
+
+FEEDER_FILE_PATTERN = '*.json'
+
+
+def find_feeder_files(source: Optional[str]) -> List[str]:
+    '''
+    Return the json files for the given source in sorted order.
+    The source can be a single file, a directory whose json files are used or a glob pattern.
+    Raises JsonFileError if the source is not given or no files are found.
+    '''
+    if not isinstance(source, str) or not source:
+        raise JsonFileError(f'No json file given: {source}')
+    if os.path.isdir(source):
+        file_names = sorted(glob.glob(os.path.join(source, FEEDER_FILE_PATTERN)))
+    elif glob.has_magic(source):
+        file_names = sorted(file_name for file_name in glob.glob(source) if os.path.isfile(file_name))
+    else:
+        return [source]
+
+    if not file_names:
+        raise JsonFileError(f'No json files found for {source}.')
+    return file_names
+
+
+def load_feeders(file_names: List[str], use_cache: bool = True, memory_map: bool = False,
+                 shared_root: bool = True, max_workers: Optional[int] = None) -> NetworkTables:
+    '''
+    Return the network tables for the given feeder files.
+    A single file is loaded with load_network_tables. Several files are parsed in parallel in a process pool
+    and merged into one set of tables, see NetworkTables.merge for how the buses and roots are combined.
+    The merged tables are always held in memory, so memory_map only applies to a single file.
+    max_workers is the number of processes, by default the number of processors.
+    Raises JsonFileError if any of the files cannot be read or the feeders cannot be merged.
+    '''
+    if len(file_names) == 1:
+        return load_network_tables(file_names[0], use_cache, memory_map)
+
+    workers = min(len(file_names), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        tables_list = list(executor.map(
+            load_network_tables, file_names, [use_cache] * len(file_names), [False] * len(file_names)))
+
+    try:
+        tables = NetworkTables.merge(tables_list, shared_root)
+    except ValueError as error:
+        raise JsonFileError(f'Unable to merge the feeder files: {error}')
+    LOGGER.info(f"Merged {len(file_names)} feeders into {tables.branch_count} branches and {tables.bus_count} buses")
+    return tables
+
+
+class NetworkFileWatcher():
+    '''
+    Watches the NIS json files and loads the network tables again when the files have changed.
+    A change is detected from the modification times and the sizes of the files, so checking is cheap and
+    the files are only parsed when they have actually been modified. For a directory or a glob pattern,
+    added and removed feeder files are also detected.
+    '''
+
+    def __init__(self, source: Optional[str], use_cache: bool = True, memory_map: bool = False,
+                 shared_root: bool = True, max_workers: Optional[int] = None):
+        self._source = source
+        self._use_cache = use_cache
+        self._memory_map = memory_map
+        self._shared_root = shared_root
+        self._max_workers = max_workers
+        self._signature = None
+
+    @property
+    def file_name(self) -> Optional[str]:
+        '''The watched json file, directory or glob pattern or None if it was not given.'''
+        return self._source
+
+    def _get_signature(self) -> Optional[Tuple[Tuple[str, int, int], ...]]:
+        '''
+        Return the names, modification times and sizes of the files or None if a file cannot be accessed.
+        '''
+        try:
+            file_names = find_feeder_files(self._source)
+            return tuple(
+                (file_name, file_stat.st_mtime_ns, file_stat.st_size)
+                for file_name, file_stat in ((file_name, os.stat(file_name)) for file_name in file_names)
+            )
+        except (OSError, JsonFileError):
+            return None
+
+    def has_changed(self) -> bool:
+        '''
+        Return True if the files have changed since they were last loaded.
+        Files that cannot be accessed, e.g. while they are being replaced, are not considered changed.
+        '''
+        signature = self._get_signature()
+        return signature is not None and signature != self._signature
 
-    def __del__(self):
+    def load(self) -> NetworkTables:
         '''
-        Close the json file when this object is destroyed.
+        Load the network tables from the files and remember their state for has_changed.
+        Raises JsonFileError if the json files cannot be read.
         '''
-        if self._file is not None:
-            self._file.close()
+        signature = self._get_signature()
+        tables = load_feeders(
+            find_feeder_files(self._source), self._use_cache, self._memory_map, self._shared_root, self._max_workers)
+        self._signature = signature
+        return tables
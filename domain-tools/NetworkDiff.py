@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This software was developed as a part of doctroal studies of Mehdi Attar, funded by Fortum and Neste Foundation.
+#  This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Mehdi Attar <mehdi.attar@tuni.fi>
+
+'''
+Contains the structural comparison of two versions of the network tables.
+'''
+
+from typing import Any, Dict, List
+
+from NetworkTables import NetworkTables
+
+
+class NetworkDiff():
+    '''
+    The differences between an old and a new version of the network tables.
+    Branches are matched by DeviceId and buses by BusName. The added and changed rows are given as
+    indices to the new tables and the removed rows by their names.
+    '''
+
+    def __init__(self, new_tables: NetworkTables):
+        self.new_tables = new_tables
+        self.added_branches = []
+        self.changed_branches = []
+        self.removed_device_ids = []
+        self.added_buses = []
+        self.changed_buses = []
+        self.removed_bus_names = []
+        self.power_base_changed = False
+
+    @property
+    def is_empty(self) -> bool:
+        '''True if the tables are the same.'''
+        return not (
+            self.added_branches or self.changed_branches or self.removed_device_ids or
+            self.added_buses or self.changed_buses or self.removed_bus_names or self.power_base_changed
+        )
+
+    @property
+    def branch_rows(self) -> List[int]:
+        '''The indices of the added and changed branches in the new tables.'''
+        return sorted(self.added_branches + self.changed_branches)
+
+    @property
+    def bus_rows(self) -> List[int]:
+        '''The indices of the added and changed buses in the new tables.'''
+        return sorted(self.added_buses + self.changed_buses)
+
+    def component_content(self) -> Dict[str, Any]:
+        '''Return the added and changed branches with the NISComponentMessage attribute names.'''
+        return self.new_tables.component_content(self.branch_rows)
+
+    def bus_content(self) -> Dict[str, Any]:
+        '''Return the added and changed buses with the NISBusMessage attribute names.'''
+        return self.new_tables.bus_content(self.bus_rows)
+
+    def __str__(self) -> str:
+        return (
+            f'branches: {len(self.added_branches)} added, {len(self.changed_branches)} changed, '
+            f'{len(self.removed_device_ids)} removed; buses: {len(self.added_buses)} added, '
+            f'{len(self.changed_buses)} changed, {len(self.removed_bus_names)} removed'
+        )
+
+
+def _first_indices(names: List[str]) -> Dict[str, int]:
+    '''Return a mapping from each name to the index of its first occurrence.'''
+    indices = {}
+    for index, name in enumerate(names):
+        indices.setdefault(name, index)
+    return indices
+
+
+def diff_network_tables(old_tables: NetworkTables, new_tables: NetworkTables) -> NetworkDiff:
+    '''
+    Compare the new tables to the old ones.
+    A branch has changed if its end points or any of its parameters have changed and a bus has changed
+    if its type or voltage base has changed. The end points are compared by bus name since the bus indices
+    of the two versions need not be the same.
+    '''
+    diff = NetworkDiff(new_tables)
+    diff.power_base_changed = old_tables.power_base != new_tables.power_base
+
+    old_branches = _first_indices(old_tables.device_id)
+    old_names = old_tables.node_names
+    new_names = new_tables.node_names
+    branch_columns = [
+        (old_tables.float_arrays[key], new_tables.float_arrays[key]) for key in NetworkTables.BRANCH_FLOAT_KEYS
+    ]
+    for new_row, device_id in enumerate(new_tables.device_id):
+        old_row = old_branches.pop(device_id, None)
+        if old_row is None:
+            diff.added_branches.append(new_row)
+        elif (old_names[old_tables.sending_end_bus[old_row]] != new_names[new_tables.sending_end_bus[new_row]] or
+              old_names[old_tables.receiving_end_bus[old_row]] != new_names[new_tables.receiving_end_bus[new_row]] or
+              any(old_values[old_row] != new_values[new_row] for old_values, new_values in branch_columns)):
+            diff.changed_branches.append(new_row)
+    diff.removed_device_ids = list(old_branches)
+
+    old_buses = _first_indices(old_tables.bus_name)
+    bus_columns = [
+        (old_tables.float_arrays[key], new_tables.float_arrays[key]) for key in NetworkTables.BUS_FLOAT_KEYS
+    ]
+    for new_row, bus_name in enumerate(new_tables.bus_name):
+        old_row = old_buses.pop(bus_name, None)
+        if old_row is None:
+            diff.added_buses.append(new_row)
+        elif (old_tables.bus_type_names[old_tables.bus_type[old_row]] !=
+              new_tables.bus_type_names[new_tables.bus_type[new_row]] or
+              any(old_values[old_row] != new_values[new_row] for old_values, new_values in bus_columns)):
+            diff.changed_buses.append(new_row)
+    diff.removed_bus_names = list(old_buses)
+
+    return diff
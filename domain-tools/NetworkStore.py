@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This software was developed as a part of doctroal studies of Mehdi Attar, funded by Fortum and Neste Foundation.
+#  This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Mehdi Attar <mehdi.attar@tuni.fi>
+
+'''
+Contains the binary file format for storing the network tables.
+
+The file starts with a magic string and the length of a JSON header. The header describes the sections
+that follow it. Each section starts at an 8-byte aligned offset and contains either the raw bytes of an
+array or a JSON encoded list of strings. Because of the raw array sections, the file can also be opened
+as a read-only memory map which several processes can share through the page cache.
+'''
+
+from array import array
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from typing import Any, Dict, Optional
+
+from tools.tools import FullLogger
+
+from NetworkTables import NetworkTables
+
+LOGGER = FullLogger(__name__)
+
+MAGIC = b'NISTBL01'
+HEADER_LENGTH_FORMAT = '<Q'
+ALIGNMENT = 8
+
+# the array attributes of the network tables and their type codes
+ARRAY_SECTIONS = {
+    'sending_end_bus': NetworkTables.INDEX_TYPECODE,
+    'receiving_end_bus': NetworkTables.INDEX_TYPECODE,
+    'bus_type': NetworkTables.BUS_TYPE_TYPECODE,
+    **{key: NetworkTables.FLOAT_TYPECODE for key in NetworkTables.BRANCH_FLOAT_KEYS + NetworkTables.BUS_FLOAT_KEYS}
+}
+# the string list attributes of the network tables
+STRING_SECTIONS = ('device_id', 'bus_name', 'extra_node_names')
+
+
+class NetworkStoreError(Exception):
+    '''
+    The network store file could not be read or it did not match the expected key.
+    '''
+
+
+def _aligned(offset: int) -> int:
+    '''Return the given offset rounded up to the next aligned offset.'''
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _get_array(tables: NetworkTables, name: str):
+    '''Return the array for the given section name.'''
+    if name in tables.float_arrays:
+        return tables.float_arrays[name]
+    return getattr(tables, name)
+
+
+def write_network_store(tables: NetworkTables, file_name: str, key: str):
+    '''
+    Write the network tables to the given file. The key is stored in the header and it can be used to check
+    that the file was created from the expected source data.
+    The file is first written to a temporary file which then replaces the target file.
+    '''
+    sections = {}
+    contents = []
+    offset = 0
+    for name, typecode in ARRAY_SECTIONS.items():
+        values = _get_array(tables, name)
+        # arrays and memoryviews with the right item type are written without copying
+        if getattr(values, 'typecode', getattr(values, 'format', None)) != typecode:
+            values = array(typecode, values)
+        sections[name] = {'typecode': typecode, 'offset': offset, 'length': len(values)}
+        contents.append((offset, values))
+        offset = _aligned(offset + len(values) * values.itemsize)
+
+    string_lists = {
+        'device_id': tables.device_id,
+        'bus_name': tables.bus_name,
+        'extra_node_names': tables.node_names[len(tables.bus_name):]
+    }
+    for name in STRING_SECTIONS:
+        encoded = json.dumps(list(string_lists[name])).encode('utf-8')
+        sections[name] = {'offset': offset, 'size': len(encoded)}
+        contents.append((offset, encoded))
+        offset = _aligned(offset + len(encoded))
+
+    header = json.dumps({
+        'key': key,
+        'byteorder': sys.byteorder,
+        'itemsizes': {typecode: array(typecode).itemsize for typecode in set(ARRAY_SECTIONS.values())},
+        'power_base': tables.power_base,
+        'units': tables.units,
+        'bus_type_names': tables.bus_type_names,
+        'sections': sections
+    }).encode('utf-8')
+    data_start = _aligned(len(MAGIC) + struct.calcsize(HEADER_LENGTH_FORMAT) + len(header))
+
+    directory = os.path.dirname(os.path.abspath(file_name))
+    file_descriptor, temporary_name = tempfile.mkstemp(dir=directory, prefix='.nis-store-')
+    try:
+        with os.fdopen(file_descriptor, 'wb') as store_file:
+            store_file.write(MAGIC)
+            store_file.write(struct.pack(HEADER_LENGTH_FORMAT, len(header)))
+            store_file.write(header)
+            for section_offset, content in contents:
+                store_file.seek(data_start + section_offset)
+                store_file.write(content)
+            store_file.truncate(data_start + offset)
+        os.replace(temporary_name, file_name)
+    except BaseException:
+        if os.path.exists(temporary_name):
+            os.remove(temporary_name)
+        raise
+
+
+def read_header(store_file) -> Dict[str, Any]:
+    '''
+    Read and check the header from the given binary file object.
+    The absolute start position of the sections is added to the header as "data_start".
+    The lengths in the file are checked against the file size before anything is read with them,
+    so a corrupted file cannot cause huge allocations.
+    '''
+    file_size = os.fstat(store_file.fileno()).st_size
+    prefix_length = len(MAGIC) + struct.calcsize(HEADER_LENGTH_FORMAT)
+    prefix = store_file.read(prefix_length)
+    if len(prefix) != prefix_length or not prefix.startswith(MAGIC):
+        raise NetworkStoreError('The file is not a network store file.')
+
+    header_length = struct.unpack(HEADER_LENGTH_FORMAT, prefix[len(MAGIC):])[0]
+    if header_length > file_size - prefix_length:
+        raise NetworkStoreError('The network store header is truncated.')
+    try:
+        header = json.loads(store_file.read(header_length).decode('utf-8'))
+    except ValueError as error:
+        raise NetworkStoreError(f'Invalid network store header: {error}') from error
+    if not isinstance(header, dict) or not isinstance(header.get('sections'), dict):
+        raise NetworkStoreError('Invalid network store header.')
+
+    if header.get('byteorder') != sys.byteorder or any(
+            array(typecode).itemsize != itemsize for typecode, itemsize in header.get('itemsizes', {}).items()):
+        raise NetworkStoreError('The network store was created on an incompatible platform.')
+
+    header['data_start'] = _aligned(prefix_length + header_length)
+    for name, section in header['sections'].items():
+        if name in ARRAY_SECTIONS:
+            if section['typecode'] != ARRAY_SECTIONS[name]:
+                raise NetworkStoreError(f'The network store section {name} has an invalid type.')
+            section_size = section['length'] * array(section['typecode']).itemsize
+        else:
+            section_size = section['size']
+        if section['offset'] < 0 or section_size < 0 or \
+                header['data_start'] + section['offset'] + section_size > file_size:
+            raise NetworkStoreError(f'The network store section {name} is truncated.')
+    return header
+
+
+def _check_indices(header: Dict[str, Any], arrays: Dict[str, Any], string_lists: Dict[str, list]):
+    '''
+    Check that the index sections only refer to existing names, so that a corrupted file is noticed
+    when it is read instead of when the indices are used.
+    '''
+    node_count = len(string_lists['bus_name']) + len(string_lists['extra_node_names'])
+    for name, limit in (
+            ('sending_end_bus', node_count),
+            ('receiving_end_bus', node_count),
+            ('bus_type', len(header['bus_type_names']))):
+        indices = arrays[name]
+        if len(indices) > 0 and (min(indices) < 0 or max(indices) >= limit):
+            raise NetworkStoreError(f'The network store section {name} contains invalid indices.')
+
+
+def tables_from_sections(header: Dict[str, Any], arrays: Dict[str, Any], string_lists: Dict[str, list]) \
+        -> NetworkTables:
+    '''
+    Create network tables from the header and the section contents.
+    Raises NetworkStoreError if the sections contain indices that are out of range.
+    '''
+    _check_indices(header, arrays, string_lists)
+    return NetworkTables(
+        power_base=header['power_base'],
+        device_id=string_lists['device_id'],
+        sending_end_bus=arrays['sending_end_bus'],
+        receiving_end_bus=arrays['receiving_end_bus'],
+        float_arrays={
+            key: arrays[key]
+            for key in NetworkTables.BRANCH_FLOAT_KEYS + NetworkTables.BUS_FLOAT_KEYS
+        },
+        bus_name=string_lists['bus_name'],
+        bus_type=arrays['bus_type'],
+        bus_type_names=header['bus_type_names'],
+        node_names=string_lists['bus_name'] + string_lists['extra_node_names'],
+        units=header['units']
+    )
+
+
+def read_network_store(file_name: str, key: Optional[str] = None) -> NetworkTables:
+    '''
+    Read the network tables from the given file into memory.
+    Raises NetworkStoreError if the file is invalid or if key is given and it does not match the stored key.
+    '''
+    try:
+        with open(file_name, 'rb') as store_file:
+            header = read_header(store_file)
+            if key is not None and header.get('key') != key:
+                raise NetworkStoreError('The network store key does not match.')
+
+            arrays = {}
+            string_lists = {}
+            for name, section in header['sections'].items():
+                store_file.seek(header['data_start'] + section['offset'])
+                if name in ARRAY_SECTIONS:
+                    values = array(section['typecode'])
+                    values.fromfile(store_file, section['length'])
+                    arrays[name] = values
+                else:
+                    string_lists[name] = json.loads(store_file.read(section['size']).decode('utf-8'))
+
+    except (OSError, EOFError, KeyError, ValueError, TypeError, AttributeError) as error:
+        raise NetworkStoreError(f'Unable to read network store {file_name}: {error}') from error
+
+    try:
+        return tables_from_sections(header, arrays, string_lists)
+    except KeyError as error:
+        raise NetworkStoreError(f'The network store {file_name} is missing the section {error}.') from error
+    except TypeError as error:
+        raise NetworkStoreError(f'Invalid network store {file_name}: {error}') from error
+
+
+def open_network_store(file_name: str, key: Optional[str] = None) -> NetworkTables:
+    '''
+    Open the network tables from the given file as a read-only memory map.
+    The arrays of the returned tables are memoryviews to the mapped file, so no array data is copied and
+    processes that open the same file share the same physical memory. Only the string lists are decoded
+    into memory. The map is closed when the arrays are no longer referenced.
+    Raises NetworkStoreError if the file is invalid or if key is given and it does not match the stored key.
+    '''
+    try:
+        with open(file_name, 'rb') as store_file:
+            header = read_header(store_file)
+            if key is not None and header.get('key') != key:
+                raise NetworkStoreError('The network store key does not match.')
+            memory_map = mmap.mmap(store_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        data = memoryview(memory_map)
+        arrays = {}
+        string_lists = {}
+        for name, section in header['sections'].items():
+            start = header['data_start'] + section['offset']
+            if name in ARRAY_SECTIONS:
+                end = start + section['length'] * array(section['typecode']).itemsize
+                if end > len(data):
+                    raise NetworkStoreError(f'The network store section {name} is truncated.')
+                arrays[name] = data[start:end].cast(section['typecode'])
+            else:
+                string_lists[name] = json.loads(bytes(data[start:start + section['size']]).decode('utf-8'))
+
+    except (OSError, KeyError, ValueError, TypeError, AttributeError) as error:
+        raise NetworkStoreError(f'Unable to open network store {file_name}: {error}') from error
+
+    try:
+        return tables_from_sections(header, arrays, string_lists)
+    except KeyError as error:
+        raise NetworkStoreError(f'The network store {file_name} is missing the section {error}.') from error
+    except TypeError as error:
+        raise NetworkStoreError(f'Invalid network store {file_name}: {error}') from error
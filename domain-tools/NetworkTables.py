@@ -0,0 +1,463 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This software was developed as a part of doctroal studies of Mehdi Attar, funded by Fortum and Neste Foundation.
+#  This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Mehdi Attar <mehdi.attar@tuni.fi>
+
+'''
+Contains the columnar in-memory representation of the network information data.
+'''
+
+from array import array
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional
+
+# the type code for the bus index arrays (32-bit integers)
+INDEX_TYPECODE = 'i'
+
+
+class BusNameIndex():
+    '''
+    Two-way mapping between bus names and integer bus indices.
+    The indices of the buses are their positions in the BusName list. Names that are not bus names,
+    e.g. unknown branch end points, are given the indices after the buses.
+    Both lookups are O(1), so the names only need to be hashed when the index is built.
+    '''
+
+    def __init__(self, bus_names: Iterable[str] = ()):
+        self._names = []
+        self._indices = {}
+        self._bus_count = 0
+        for name in bus_names:
+            self.add_bus(name)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @property
+    def names(self) -> List[str]:
+        '''The names for all the indices.'''
+        return self._names
+
+    @property
+    def bus_count(self) -> int:
+        '''The number of indices that belong to the buses.'''
+        return self._bus_count
+
+    def add_bus(self, name: str) -> int:
+        '''
+        Add the next bus and return its index. A duplicate bus name gets its own index but the name
+        is mapped to the index of its first occurrence.
+        '''
+        if self._bus_count != len(self._names):
+            raise ValueError('Buses must be added before the other names.')
+        index = len(self._names)
+        self._names.append(name)
+        self._indices.setdefault(name, index)
+        self._bus_count += 1
+        return index
+
+    def intern(self, name: str) -> int:
+        '''Return the index for the given name and add the name as a non-bus name if it is unknown.'''
+        index = self._indices.get(name)
+        if index is None:
+            index = len(self._names)
+            self._names.append(name)
+            self._indices[name] = index
+        return index
+
+    def index_of(self, name: str) -> Optional[int]:
+        '''Return the index for the given name or None if the name is unknown.'''
+        return self._indices.get(name)
+
+    def name_of(self, index: int) -> str:
+        '''Return the name for the given index.'''
+        return self._names[index]
+
+    def is_bus(self, index: int) -> bool:
+        '''Return True if the given index belongs to a bus in the BusName list.'''
+        return 0 <= index < self._bus_count
+
+    def to_indices(self, names: Iterable[str]) -> array:
+        '''Return the indices for the given names, unknown names are interned.'''
+        indices = array(INDEX_TYPECODE)
+        self.extend_indices(indices, names)
+        return indices
+
+    def extend_indices(self, indices: array, names: Iterable[str]):
+        '''Append the indices for the given names to the given index array, unknown names are interned.'''
+        get_index = self._indices.get
+        intern = self.intern
+        append = indices.append
+        for name in names:
+            index = get_index(name)
+            append(index if index is not None else intern(name))
+
+    def to_names(self, indices: Iterable[int]) -> List[str]:
+        '''Return the names for the given indices.'''
+        names = self._names
+        return [names[index] for index in indices]
+
+
+class NetworkTables():
+    '''
+    Structure-of-arrays representation of the NIS data.
+    Branch and bus parameters are stored as arrays of doubles, bus types as interned integer codes and
+    the branch end points as 32-bit integer indices to the bus list. All processing should use the indices;
+    the bus names are only needed in the JSON form used by the NIS messages which is produced by
+    component_content and bus_content.
+    '''
+    # the type codes for the stored arrays
+    FLOAT_TYPECODE = 'd'
+    INDEX_TYPECODE = INDEX_TYPECODE
+    BUS_TYPE_TYPECODE = 'i'
+
+    # the known bus types, other bus types are given the next free codes
+    BUS_TYPES = ('root', 'dummy', 'usage-point')
+
+    BRANCH_FLOAT_KEYS = (
+        'Resistance',
+        'Reactance',
+        'ShuntAdmittance',
+        'ShuntConductance',
+        'RatedCurrent'
+    )
+    BUS_FLOAT_KEYS = (
+        'BusVoltageBase',
+    )
+
+    VALUES_ATTRIBUTE = 'Values'
+    UNIT_OF_MEASURE_ATTRIBUTE = 'UnitOfMeasure'
+
+    def __init__(self, power_base: Any, device_id: List[str], sending_end_bus: array, receiving_end_bus: array,
+                 float_arrays: Dict[str, array], bus_name: List[str], bus_type: array,
+                 bus_type_names: Optional[List[str]] = None, node_names: Optional[List[str]] = None,
+                 units: Optional[Dict[str, str]] = None, bus_index: Optional[BusNameIndex] = None):
+        '''
+        Create the tables from already converted arrays.
+        sending_end_bus and receiving_end_bus are indices to node_names which starts with bus_name and
+        can continue with the end point names that are not found in bus_name. Instead of node_names,
+        an already built bus_index can be given.
+        bus_type contains indices to bus_type_names.
+        units contains the units of measure for those float arrays that were given as quantity array blocks.
+        The tables are not trusted until they have passed the validation in the Validation module.
+        '''
+        self.power_base = power_base
+        self.device_id = device_id
+        self.sending_end_bus = sending_end_bus
+        self.receiving_end_bus = receiving_end_bus
+        self.float_arrays = float_arrays
+        self.bus_name = bus_name
+        self.bus_type = bus_type
+        self.bus_type_names = list(NetworkTables.BUS_TYPES) if bus_type_names is None else bus_type_names
+        self.units = {} if units is None else units
+        self._bus_index = bus_index
+        self._node_names = node_names
+        self._content_hash = None
+        self.trusted = False
+
+    @property
+    def bus_index(self) -> BusNameIndex:
+        '''The mapping between the bus names and the bus indices. It is built on the first use.'''
+        if self._bus_index is None:
+            self._bus_index = BusNameIndex(self.bus_name)
+            if self._node_names is not None:
+                for name in self._node_names[len(self.bus_name):]:
+                    self._bus_index.intern(name)
+            self._node_names = None
+        return self._bus_index
+
+    @property
+    def node_names(self) -> List[str]:
+        '''The names for all the bus indices used in the tables.'''
+        if self._bus_index is None and self._node_names is not None:
+            return self._node_names
+        return self.bus_index.names
+
+    @property
+    def branch_count(self) -> int:
+        '''The number of branches in the network.'''
+        return len(self.device_id)
+
+    @property
+    def bus_count(self) -> int:
+        '''The number of buses in the network.'''
+        return len(self.bus_name)
+
+    @property
+    def resistance(self) -> array:
+        '''The branch resistances.'''
+        return self.float_arrays['Resistance']
+
+    @property
+    def reactance(self) -> array:
+        '''The branch reactances.'''
+        return self.float_arrays['Reactance']
+
+    @property
+    def shunt_admittance(self) -> array:
+        '''The branch shunt admittances.'''
+        return self.float_arrays['ShuntAdmittance']
+
+    @property
+    def shunt_conductance(self) -> array:
+        '''The branch shunt conductances.'''
+        return self.float_arrays['ShuntConductance']
+
+    @property
+    def rated_current(self) -> array:
+        '''The branch rated currents.'''
+        return self.float_arrays['RatedCurrent']
+
+    @property
+    def bus_voltage_base(self) -> array:
+        '''The bus voltage bases.'''
+        return self.float_arrays['BusVoltageBase']
+
+    @property
+    def content_hash(self) -> str:
+        '''
+        The SHA-256 hex digest of the network data. It identifies the data set, for example in the chunks of
+        the NIS messages. It is calculated on the first use, so the tables should not be modified after that.
+        '''
+        if self._content_hash is None:
+            content_hash = hashlib.sha256()
+            content_hash.update(repr(self.power_base).encode('utf-8'))
+            for names in (self.device_id, self.bus_name, self.node_names, self.bus_type_names):
+                content_hash.update('\0'.join(names).encode('utf-8'))
+                content_hash.update(b'\1')
+            for indices in (self.sending_end_bus, self.receiving_end_bus, self.bus_type):
+                content_hash.update(array(NetworkTables.INDEX_TYPECODE, indices).tobytes())
+            for key in NetworkTables.BRANCH_FLOAT_KEYS + NetworkTables.BUS_FLOAT_KEYS:
+                content_hash.update(self.float_arrays[key].tobytes())
+                content_hash.update(self.units.get(key, '').encode('utf-8'))
+            self._content_hash = content_hash.hexdigest()
+        return self._content_hash
+
+    @classmethod
+    def from_content(cls, component_content: Dict[str, Any], bus_content: Dict[str, Any]) -> 'NetworkTables':
+        '''
+        Create the tables from the component and bus data in the form that is used in the NIS JSON file.
+        The float attributes can be lists, arrays or quantity array blocks given as dictionaries.
+        '''
+        units = {}
+        float_arrays = {}
+        for key in cls.BRANCH_FLOAT_KEYS:
+            float_arrays[key] = cls._to_float_array(key, component_content[key], units)
+        for key in cls.BUS_FLOAT_KEYS:
+            float_arrays[key] = cls._to_float_array(key, bus_content[key], units)
+
+        bus_index = BusNameIndex(bus_content['BusName'])
+        sending_end_bus = bus_index.to_indices(component_content['SendingEndBus'])
+        receiving_end_bus = bus_index.to_indices(component_content['ReceivingEndBus'])
+        bus_type, bus_type_names = cls.intern_bus_types(bus_content['BusType'])
+
+        return cls(
+            power_base=component_content['PowerBase'],
+            device_id=list(component_content['DeviceId']),
+            sending_end_bus=sending_end_bus,
+            receiving_end_bus=receiving_end_bus,
+            float_arrays=float_arrays,
+            bus_name=list(bus_content['BusName']),
+            bus_type=bus_type,
+            bus_type_names=bus_type_names,
+            units=units,
+            bus_index=bus_index
+        )
+
+    @classmethod
+    def merge(cls, tables_list: List['NetworkTables'], shared_root: bool = True) -> 'NetworkTables':
+        '''
+        Merge the tables of several feeders into one set of tables.
+        Buses with the same name in different feeders are the same bus and the attributes of the first feeder
+        are used for it. The bus indices are assigned in the order the buses are first seen.
+        If shared_root is True, the root buses of all the feeders are merged into the root bus of the first
+        feeder. Otherwise, each feeder keeps its own root bus.
+        Raises ValueError if the feeders have different power bases or units.
+        '''
+        if not tables_list:
+            raise ValueError('No network tables to merge.')
+        first = tables_list[0]
+        for tables in tables_list[1:]:
+            if tables.power_base != first.power_base:
+                raise ValueError(f'The feeders have different power bases: {first.power_base}, {tables.power_base}.')
+            for key, unit in tables.units.items():
+                if first.units.get(key, unit) != unit:
+                    raise ValueError(f'The feeders have different units for {key}: {first.units[key]}, {unit}.')
+
+        bus_index = BusNameIndex()
+        bus_type_names = list(cls.BUS_TYPES)
+        type_codes = {name: code for code, name in enumerate(bus_type_names)}
+        bus_type = array(cls.BUS_TYPE_TYPECODE)
+        bus_floats = {key: array(cls.FLOAT_TYPECODE) for key in cls.BUS_FLOAT_KEYS}
+        root_code = type_codes['root']
+        root = None
+        remaps = []
+        for tables in tables_list:
+            feeder_start = len(bus_index)
+            remap = []
+            for row, name in enumerate(tables.bus_name):
+                type_name = tables.bus_type_names[tables.bus_type[row]]
+                existing = bus_index.index_of(name)
+                if existing is not None and existing < feeder_start:
+                    remap.append(existing)
+                    continue
+                if shared_root and type_name == 'root' and root is not None:
+                    remap.append(root)
+                    continue
+                index = bus_index.add_bus(name)
+                remap.append(index)
+                code = type_codes.get(type_name)
+                if code is None:
+                    code = len(bus_type_names)
+                    type_codes[type_name] = code
+                    bus_type_names.append(type_name)
+                bus_type.append(code)
+                if code == root_code and root is None:
+                    root = index
+                for key, values in bus_floats.items():
+                    values.append(tables.float_arrays[key][row])
+            remaps.append(remap)
+
+        # the names that are not buses in any feeder are given the indices after all the buses
+        for tables, remap in zip(tables_list, remaps):
+            remap.extend(bus_index.intern(name) for name in tables.node_names[tables.bus_count:])
+
+        device_id = []
+        sending_end_bus = array(cls.INDEX_TYPECODE)
+        receiving_end_bus = array(cls.INDEX_TYPECODE)
+        float_arrays = {key: array(cls.FLOAT_TYPECODE) for key in cls.BRANCH_FLOAT_KEYS}
+        for tables, remap in zip(tables_list, remaps):
+            device_id.extend(tables.device_id)
+            sending_end_bus.extend(map(remap.__getitem__, tables.sending_end_bus))
+            receiving_end_bus.extend(map(remap.__getitem__, tables.receiving_end_bus))
+            for key, values in float_arrays.items():
+                values.extend(tables.float_arrays[key])
+        float_arrays.update(bus_floats)
+
+        units = {}
+        for tables in tables_list:
+            units.update(tables.units)
+
+        return cls(
+            power_base=first.power_base,
+            device_id=device_id,
+            sending_end_bus=sending_end_bus,
+            receiving_end_bus=receiving_end_bus,
+            float_arrays=float_arrays,
+            bus_name=bus_index.names[:bus_index.bus_count],
+            bus_type=bus_type,
+            bus_type_names=bus_type_names,
+            units=units,
+            bus_index=bus_index
+        )
+
+    @classmethod
+    def intern_bus_types(cls, bus_types: Iterable[str]):
+        '''
+        Return the integer codes for the given bus types and the list of bus type names for the codes.
+        The known bus types always get the same codes.
+        '''
+        bus_type_names = list(cls.BUS_TYPES)
+        type_codes = {name: code for code, name in enumerate(bus_type_names)}
+        codes = array(cls.BUS_TYPE_TYPECODE)
+        for type_name in bus_types:
+            code = type_codes.get(type_name)
+            if code is None:
+                code = len(bus_type_names)
+                type_codes[type_name] = code
+                bus_type_names.append(type_name)
+            codes.append(code)
+        return codes, bus_type_names
+
+    @classmethod
+    def _to_float_array(cls, key: str, values: Any, units: Dict[str, str]) -> array:
+        '''Return the given values as an array of doubles and store the unit if the values were a block.'''
+        if isinstance(values, dict):
+            units[key] = values[cls.UNIT_OF_MEASURE_ATTRIBUTE]
+            values = values[cls.VALUES_ATTRIBUTE]
+        if isinstance(values, array) and values.typecode == cls.FLOAT_TYPECODE:
+            return values
+        return array(cls.FLOAT_TYPECODE, values)
+
+    def _float_json(self, key: str, rows: Optional[Iterable[int]] = None, float_arrays: bool = False) -> Any:
+        '''
+        Return the float attribute, or the given rows of it, in the form it had in the source data.
+        If float_arrays is True, the values are given as an array of doubles instead of a list. All the rows
+        are given without copying the array.
+        '''
+        values = self.float_arrays[key]
+        if rows is None:
+            values = values if float_arrays else values.tolist()
+        elif isinstance(rows, range) and rows.step == 1:
+            values = values[rows.start:rows.stop]
+            values = values if float_arrays else values.tolist()
+        elif float_arrays:
+            values = array(NetworkTables.FLOAT_TYPECODE, (values[row] for row in rows))
+        else:
+            values = [values[row] for row in rows]
+        if key in self.units:
+            return {NetworkTables.UNIT_OF_MEASURE_ATTRIBUTE: self.units[key], NetworkTables.VALUES_ATTRIBUTE: values}
+        return values
+
+    def bus_index_of(self, name: str) -> Optional[int]:
+        '''Return the bus index for the given bus name or None if the name is unknown.'''
+        return self.bus_index.index_of(name)
+
+    def bus_name_of(self, index: int) -> str:
+        '''Return the bus name for the given bus index.'''
+        return self.node_names[index]
+
+    def names_of(self, indices: Iterable[int]) -> List[str]:
+        '''Return the bus names for the given bus indices.'''
+        node_names = self.node_names
+        return [node_names[index] for index in indices]
+
+    def bus_types(self, rows: Optional[Iterable[int]] = None) -> List[str]:
+        '''Return the bus types, or the types of the given buses, as strings.'''
+        bus_type_names = self.bus_type_names
+        bus_type = self.bus_type
+        return [bus_type_names[bus_type[row]] for row in (range(len(bus_type)) if rows is None else rows)]
+
+    def component_content(self, rows: Optional[Iterable[int]] = None, float_arrays: bool = False) -> Dict[str, Any]:
+        '''
+        Return the component data as a dictionary with the NISComponentMessage attribute names.
+        If rows is given, only the branches with the given indices are included.
+        If float_arrays is True, the float attributes are given as arrays of doubles instead of lists.
+        '''
+        if rows is None:
+            device_id = list(self.device_id)
+            sending_end_bus = self.sending_end_bus
+            receiving_end_bus = self.receiving_end_bus
+        elif isinstance(rows, range) and rows.step == 1:
+            # the contiguous row ranges used for the chunks can be sliced
+            device_id = self.device_id[rows.start:rows.stop]
+            sending_end_bus = self.sending_end_bus[rows.start:rows.stop]
+            receiving_end_bus = self.receiving_end_bus[rows.start:rows.stop]
+        else:
+            device_id = [self.device_id[row] for row in rows]
+            sending_end_bus = [self.sending_end_bus[row] for row in rows]
+            receiving_end_bus = [self.receiving_end_bus[row] for row in rows]
+        content = {
+            'PowerBase': self.power_base,
+            'DeviceId': device_id,
+            'SendingEndBus': self.names_of(sending_end_bus),
+            'ReceivingEndBus': self.names_of(receiving_end_bus)
+        }
+        for key in NetworkTables.BRANCH_FLOAT_KEYS:
+            content[key] = self._float_json(key, rows, float_arrays)
+        return content
+
+    def bus_content(self, rows: Optional[Iterable[int]] = None, float_arrays: bool = False) -> Dict[str, Any]:
+        '''
+        Return the bus data as a dictionary with the NISBusMessage attribute names.
+        If rows is given, only the buses with the given indices are included.
+        If float_arrays is True, the float attributes are given as arrays of doubles instead of lists.
+        '''
+        content = {
+            'BusName': list(self.bus_name) if rows is None else [self.bus_name[row] for row in rows],
+            'BusType': self.bus_types(rows)
+        }
+        for key in NetworkTables.BUS_FLOAT_KEYS:
+            content[key] = self._float_json(key, rows, float_arrays)
+        return content
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This software was developed as a part of doctroal studies of Mehdi Attar, funded by Fortum and Neste Foundation.
+#  This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Mehdi Attar <mehdi.attar@tuni.fi>
+
+'''
+Contains the topology index of a radial distribution network.
+'''
+
+from array import array
+from typing import List, Optional, Tuple
+
+from NetworkTables import NetworkTables
+
+INDEX_TYPECODE = NetworkTables.INDEX_TYPECODE
+# the index used for a missing bus or branch, e.g. the parent of the root bus
+NO_INDEX = -1
+
+
+class TopologyIndex():
+    '''
+    Topology of the network built once from the network tables.
+    The adjacency is stored in the compressed sparse row (CSR) form over the bus indices: the neighbours of
+    the bus i are neighbours[offsets[i]:offsets[i + 1]] and the branches connecting them are
+    branches[offsets[i]:offsets[i + 1]].
+    The trees are formed by breadth-first traversals from the root buses, normally there is only one root
+    but merged feeders can keep their own roots. The buses that cannot be reached from any root are islands
+    and the branches that close a cycle are loops. A radial network has neither.
+    '''
+
+    def __init__(self, tables: NetworkTables):
+        '''
+        Build the index from the given network tables.
+        The buses with the bus type "root" are used as the roots.
+        '''
+        # the unknown branch end points are included as nodes after the buses
+        self.node_count = len(tables.node_names)
+        self.branch_count = tables.branch_count
+        self.roots = self._find_roots(tables)
+        # the first root, or NO_INDEX if there are no roots
+        self.root = self.roots[0] if self.roots else NO_INDEX
+
+        self.offsets, self.neighbours, self.branches = self._build_adjacency(
+            self.node_count, tables.sending_end_bus, tables.receiving_end_bus)
+
+        self.parent_bus = array(INDEX_TYPECODE, [NO_INDEX]) * self.node_count
+        self.parent_branch = array(INDEX_TYPECODE, [NO_INDEX]) * self.node_count
+        self.depth = array(INDEX_TYPECODE, [NO_INDEX]) * self.node_count
+        # the connected component of each bus, the components of the roots are numbered first
+        self.component = array(INDEX_TYPECODE, [NO_INDEX]) * self.node_count
+        self.bfs_order = array(INDEX_TYPECODE)
+        self.islands = []
+        self.loop_branches = array(INDEX_TYPECODE)
+
+        in_tree = bytearray(self.branch_count)
+        component_count = 0
+        for root in self.roots:
+            if self.component[root] == NO_INDEX:
+                self.bfs_order.extend(self._traverse(root, component_count, in_tree))
+                component_count += 1
+        # the number of components that contain a root
+        self.tree_count = component_count
+        for bus in range(self.node_count):
+            if self.component[bus] == NO_INDEX:
+                self.islands.append(self._traverse(bus, component_count, in_tree))
+                component_count += 1
+
+        self.loop_branches = array(
+            INDEX_TYPECODE, (branch for branch in range(self.branch_count) if not in_tree[branch]))
+        self.dfs_order = self._depth_first_order()
+
+    @staticmethod
+    def _find_roots(tables: NetworkTables) -> List[int]:
+        '''Return the indices of the root buses.'''
+        root_code = tables.bus_type_names.index('root')
+        return [bus for bus, code in enumerate(tables.bus_type) if code == root_code]
+
+    @staticmethod
+    def _build_adjacency(node_count: int, sending_end_bus, receiving_end_bus) -> Tuple[array, array, array]:
+        '''Return the CSR offsets, neighbour buses and connecting branches for the given branches.'''
+        degree = [0] * (node_count + 1)
+        for bus in sending_end_bus:
+            degree[bus + 1] += 1
+        for bus in receiving_end_bus:
+            degree[bus + 1] += 1
+        for bus in range(node_count):
+            degree[bus + 1] += degree[bus]
+        offsets = array(INDEX_TYPECODE, degree)
+
+        positions = degree[:-1]
+        neighbours = array(INDEX_TYPECODE, [0]) * offsets[-1]
+        branches = array(INDEX_TYPECODE, [0]) * offsets[-1]
+        for branch, (sending, receiving) in enumerate(zip(sending_end_bus, receiving_end_bus)):
+            position = positions[sending]
+            neighbours[position] = receiving
+            branches[position] = branch
+            positions[sending] = position + 1
+            position = positions[receiving]
+            neighbours[position] = sending
+            branches[position] = branch
+            positions[receiving] = position + 1
+        return offsets, neighbours, branches
+
+    def _traverse(self, start: int, component: int, in_tree: bytearray) -> array:
+        '''
+        Traverse the component containing the start bus in breadth-first order.
+        Fills the parent, depth and component arrays, marks the tree branches and returns the visit order.
+        '''
+        offsets, neighbours, branches = self.offsets, self.neighbours, self.branches
+        parent_bus, parent_branch, depth = self.parent_bus, self.parent_branch, self.depth
+        component_of = self.component
+
+        order = array(INDEX_TYPECODE, [start])
+        component_of[start] = component
+        depth[start] = 0
+        position = 0
+        while position < len(order):
+            bus = order[position]
+            position += 1
+            next_depth = depth[bus] + 1
+            for slot in range(offsets[bus], offsets[bus + 1]):
+                neighbour = neighbours[slot]
+                if component_of[neighbour] == NO_INDEX:
+                    component_of[neighbour] = component
+                    parent_bus[neighbour] = bus
+                    parent_branch[neighbour] = branches[slot]
+                    depth[neighbour] = next_depth
+                    in_tree[branches[slot]] = 1
+                    order.append(neighbour)
+        return order
+
+    def _depth_first_order(self) -> array:
+        '''Return the buses reachable from the roots in depth-first pre-order along the tree branches.'''
+        order = array(INDEX_TYPECODE)
+        offsets, neighbours, branches = self.offsets, self.neighbours, self.branches
+        parent_branch = self.parent_branch
+        # the roots of the trees in reverse so that the first tree is visited first
+        stack = [root for root in self.bfs_order if parent_branch[root] == NO_INDEX][::-1]
+        while stack:
+            bus = stack.pop()
+            order.append(bus)
+            # push the children in reverse so that they are visited in the adjacency order
+            for slot in range(offsets[bus + 1] - 1, offsets[bus] - 1, -1):
+                neighbour = neighbours[slot]
+                if parent_branch[neighbour] == branches[slot]:
+                    stack.append(neighbour)
+        return order
+
+    @property
+    def is_radial(self) -> bool:
+        '''True if every bus is in a tree starting from a root bus.'''
+        return self.root != NO_INDEX and not self.islands and not self.loop_branches
+
+    def neighbours_of(self, bus: int) -> array:
+        '''Return the buses connected to the given bus.'''
+        return self.neighbours[self.offsets[bus]:self.offsets[bus + 1]]
+
+    def branches_of(self, bus: int) -> array:
+        '''Return the branches connected to the given bus.'''
+        return self.branches[self.offsets[bus]:self.offsets[bus + 1]]
+
+    def children_of(self, bus: int) -> List[int]:
+        '''Return the child buses of the given bus in the tree.'''
+        parent_branch = self.parent_branch
+        return [
+            neighbour
+            for neighbour, branch in zip(self.neighbours_of(bus), self.branches_of(bus))
+            if parent_branch[neighbour] == branch
+        ]
+
+    def path_to_root(self, bus: int) -> Optional[List[int]]:
+        '''Return the buses from the given bus up to its root or None if the bus is not connected to a root.'''
+        if self.component[bus] >= self.tree_count:
+            return None
+        path = [bus]
+        while self.parent_bus[bus] != NO_INDEX:
+            bus = self.parent_bus[bus]
+            path.append(bus)
+        return path
+
+    def backward_sweep_order(self) -> array:
+        '''Return the buses connected to the roots from the leaves towards the roots.'''
+        order = array(INDEX_TYPECODE, self.bfs_order)
+        order.reverse()
+        return order
+
+    def describe_problems(self, tables: NetworkTables) -> List[str]:
+        '''Return human readable descriptions of the problems that make the network non-radial.'''
+        problems = []
+        if self.root == NO_INDEX:
+            problems.append('The network has no root bus.')
+        for island in self.islands:
+            names = tables.names_of(island[:5])
+            more = '' if len(island) <= 5 else f' and {len(island) - 5} more'
+            problems.append(f'Island of {len(island)} buses not connected to the root: {", ".join(names)}{more}.')
+        if self.loop_branches:
+            device_ids = [tables.device_id[branch] for branch in self.loop_branches[:5]]
+            more = '' if len(self.loop_branches) <= 5 else f' and {len(self.loop_branches) - 5} more'
+            problems.append(f'{len(self.loop_branches)} branches form loops: {", ".join(device_ids)}{more}.')
+        return problems
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This software was developed as a part of doctroal studies of Mehdi Attar, funded by Fortum and Neste Foundation.
+#  This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Mehdi Attar <mehdi.attar@tuni.fi>
+
+'''
+Contains the validation of the whole network data set at load time.
+'''
+
+from collections import Counter
+from dataclasses import dataclass, field
+import math
+from typing import List
+
+from NetworkTables import NetworkTables
+
+# the maximum number of offending values listed in a validation issue
+MAX_EXAMPLES = 5
+
+
+@dataclass
+class ValidationIssue():
+    '''
+    A single failed check: the name of the check, a description, the number of offending items and
+    some of the offending values.
+    '''
+    check: str
+    message: str
+    count: int = 0
+    examples: List = field(default_factory=list)
+
+    def __str__(self) -> str:
+        if not self.examples:
+            return f'{self.check}: {self.message}'
+        more = '' if self.count <= len(self.examples) else f' and {self.count - len(self.examples)} more'
+        return f'{self.check}: {self.message} ({", ".join(str(example) for example in self.examples)}{more})'
+
+
+@dataclass
+class ValidationReport():
+    '''
+    The result of validating the network tables. The data set is valid if there are no issues.
+    '''
+    branch_count: int
+    bus_count: int
+    issues: List[ValidationIssue] = field(default_factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        '''True if all the checks passed.'''
+        return not self.issues
+
+    def add(self, check: str, message: str, offending: List = None):
+        '''Add an issue with the given offending values.'''
+        offending = [] if offending is None else offending
+        self.issues.append(ValidationIssue(check, message, len(offending), list(offending[:MAX_EXAMPLES])))
+
+    def __str__(self) -> str:
+        if self.is_valid:
+            return f'The network data with {self.branch_count} branches and {self.bus_count} buses is valid.'
+        return '\n'.join(str(issue) for issue in self.issues)
+
+
+def _duplicates(values) -> List:
+    '''Return the values that occur more than once.'''
+    if len(set(values)) == len(values):
+        return []
+    return [value for value, count in Counter(values).items() if count > 1]
+
+
+def validate_network_tables(tables: NetworkTables, single_root: bool = True) -> ValidationReport:
+    '''
+    Validate the whole network data set in one pass over each array and return a report of the found issues.
+    If all the checks pass the tables are marked as trusted, which allows the message construction to skip
+    validating the same values again.
+    The checks are:
+    - all the branch arrays and all the bus arrays have equal lengths
+    - every branch end point is found in BusName
+    - DeviceId and BusName do not contain duplicates
+    - there is exactly one root bus, or at least one if single_root is False, and all bus types are known
+    - all the float parameters are finite and non-negative
+    '''
+    branch_count = tables.branch_count
+    bus_count = tables.bus_count
+    report = ValidationReport(branch_count, bus_count)
+
+    branch_lengths = {
+        'DeviceId': len(tables.device_id),
+        'SendingEndBus': len(tables.sending_end_bus),
+        'ReceivingEndBus': len(tables.receiving_end_bus),
+        **{key: len(tables.float_arrays[key]) for key in NetworkTables.BRANCH_FLOAT_KEYS}
+    }
+    bus_lengths = {
+        'BusName': len(tables.bus_name),
+        'BusType': len(tables.bus_type),
+        **{key: len(tables.float_arrays[key]) for key in NetworkTables.BUS_FLOAT_KEYS}
+    }
+    for lengths, expected, name in ((branch_lengths, branch_count, 'DeviceId'), (bus_lengths, bus_count, 'BusName')):
+        different = [f'{key}={length}' for key, length in lengths.items() if length != expected]
+        if different:
+            report.add('length', f'The arrays must have the same length as {name} ({expected})', different)
+
+    for key, indices in (('SendingEndBus', tables.sending_end_bus), ('ReceivingEndBus', tables.receiving_end_bus)):
+        # the indices from bus_count onwards belong to the names that are not in BusName
+        if indices and max(indices) >= bus_count:
+            unknown = sorted({index for index in indices if index >= bus_count})
+            report.add('endpoint', f'{key} contains buses that are not in BusName', tables.names_of(unknown))
+
+    for key, values in (('DeviceId', tables.device_id), ('BusName', tables.bus_name)):
+        duplicates = _duplicates(values)
+        if duplicates:
+            report.add('duplicate', f'{key} contains duplicate values', duplicates)
+
+    type_counts = Counter(tables.bus_type)
+    root_count = type_counts.get(tables.bus_type_names.index('root'), 0)
+    if single_root and root_count != 1:
+        report.add('bus_type', f'There must be exactly one root bus, found {root_count}')
+    elif root_count < 1:
+        report.add('bus_type', 'There must be at least one root bus')
+    unknown_types = [
+        tables.bus_type_names[code]
+        for code in sorted(type_counts)
+        if tables.bus_type_names[code] not in NetworkTables.BUS_TYPES
+    ]
+    if unknown_types:
+        report.add('bus_type', f'BusType must be one of {", ".join(NetworkTables.BUS_TYPES)}', unknown_types)
+
+    for key in NetworkTables.BRANCH_FLOAT_KEYS + NetworkTables.BUS_FLOAT_KEYS:
+        values = tables.float_arrays[key]
+        # NaN fails both comparisons, so a single chained comparison covers all the cases
+        invalid = [index for index, value in enumerate(values) if not 0.0 <= value < math.inf]
+        if invalid:
+            report.add('value', f'{key} must contain finite non-negative numbers',
+                       [f'{index}: {values[index]}' for index in invalid])
+
+    tables.trusted = report.is_valid
+    return report
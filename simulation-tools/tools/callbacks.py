@@ -9,11 +9,13 @@
 import asyncio
 import inspect
 import json
-from typing import Awaitable, Callable, Union
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Union
 
 import aio_pika.message
 
-from tools.exceptions.messages import MessageError
+from tools.exceptions.messages import MessageCodecError, MessageError
+from tools.message.codec import CodecRegistry, UNCOMPRESSED_CONTENT_ENCODINGS, decompress_message
 from tools.messages import (
     AbstractMessage, AbstractResultMessage, BaseMessage, EpochMessage, GeneralMessage,
     SimulationStateMessage, StatusMessage, MessageFactory)
@@ -44,6 +46,10 @@ class MessageCallback():
            AbstractMessage object. In case the received message was not in JSON format, a string containing the message
            is used as the first parameter for the callback_function instead.
 
+           The received bytes are decoded with the codec registered in CodecRegistry for the content type of
+           the message. Messages without a known content type are decoded as JSON. Compressed messages are
+           decompressed first according to their content encoding.
+
            If message_type is None, the actual type for the transformed message is determined by the "Type" attribute.
            Otherwise, the given message type is used for as transformed message type.
            The legal string for the parameter message_type are defined in tools.messages.MESSAGE_TYPES
@@ -107,14 +113,20 @@ class MessageCallback():
     async def callback(self, message: aio_pika.message.IncomingMessage) -> None:
         """Callback function for the received messages from the message bus.
            Transforms the message to an instance of AbstractMessage and sends it to the callback_function.
+           Returns after the callback_function has finished handling the message.
         """
-        # Use a lock to be able to handle each incoming message one at a time.
+        # Use a lock to be able to transform each incoming message one at a time.
+        # The callback function is called after the lock has been released, so that the messages can be handled
+        # concurrently in the order they were received.
         async with self.__lock:
-            message_str = ""
             message_json = {}
             try:
-                message_str = message.body.decode(MessageCallback.MESSAGE_CODING)
-                message_json = json.loads(message_str)
+                message_body = message.body
+                if message.content_encoding not in UNCOMPRESSED_CONTENT_ENCODINGS:
+                    # zlib releases the GIL, so decompressing large messages does not block the event loop
+                    message_body = await asyncio.get_running_loop().run_in_executor(
+                        None, decompress_message, message_body, message.content_encoding)
+                message_json = CodecRegistry.decode(message_body, message.content_type)
 
                 if self.__message_type is None:
                     # Convert the message to the specified special cases if possible.
@@ -131,9 +143,9 @@ class MessageCallback():
                     **message_json,
                 )
 
-            except json.decoder.JSONDecodeError:
+            except MessageCodecError:
                 LOGGER.warning("Received message could not be decoded into JSON format.")
-                message_object = message_str
+                message_object = message.body.decode(MessageCallback.MESSAGE_CODING, errors="replace")
             except (TypeError, ValueError, MessageError) as message_error:
                 # The message did not conform to the simulation platform message schema or
                 # the message type was not supported by the message factory.
@@ -146,8 +158,138 @@ class MessageCallback():
             self.__last_topic = message.routing_key
             self.log_last_message()
 
-            if inspect.iscoroutinefunction(self.__callback_function):
-                asyncio.create_task(self.__callback_function(message_object, message.routing_key))
+        if inspect.iscoroutinefunction(self.__callback_function):
+            await self.__callback_function(message_object, message.routing_key)
+        else:
+            LOGGER.error("Callback function '{:s}' is not awaitable.".format(
+                str(getattr(self.__callback_function, "__name__", None))))
+
+
+class MessageDispatcher():
+    """Dispatcher that hands the received messages of one topic listener to a MessageCallback object
+       with a limit on the number of messages that are handled at the same time.
+       A message is acknowledged only after the callback has finished handling it. When the limit has been reached,
+       dispatch waits for a free slot, so the listener stops taking new messages from the queue and the unacknowledged
+       messages are left to the message bus according to the prefetch count of the channel.
+    """
+    def __init__(self, callback_class: MessageCallback, max_in_flight: int = 0):
+        """Sets up a dispatcher for the given callback object.
+           max_in_flight is the maximum number of messages handled at the same time, 0 for no limit."""
+        self.__callback_class = callback_class
+        self.__max_in_flight = max(max_in_flight, 0)
+        self.__semaphore = asyncio.Semaphore(self.__max_in_flight) if self.__max_in_flight > 0 else None
+        # references to the running tasks, so that they are not garbage collected before they are finished
+        self.__tasks: Set[asyncio.Task] = set()
+
+        self.__received = 0
+        self.__processed = 0
+        self.__failed = 0
+        self.__waiting = 0
+        self.__peak_in_flight = 0
+        self.__wait_time = 0.0
+
+    @property
+    def callback_class(self) -> MessageCallback:
+        """The callback object that handles the messages."""
+        return self.__callback_class
+
+    @property
+    def max_in_flight(self) -> int:
+        """The maximum number of messages handled at the same time, 0 for no limit."""
+        return self.__max_in_flight
+
+    @property
+    def in_flight(self) -> int:
+        """The number of messages that are currently being handled."""
+        return len(self.__tasks)
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        """Returns the counters for the dispatched messages as a dictionary:
+           - received: the number of messages received from the message bus
+           - processed: the number of messages whose handling has finished
+           - failed: the number of messages whose handling ended with an exception
+           - in_flight: the number of messages that are currently being handled
+           - peak_in_flight: the largest number of messages that have been handled at the same time
+           - waiting: the number of messages that are waiting for a free slot
+           - wait_time: the total time in seconds that the messages have waited for a free slot
+        """
+        return {
+            "max_in_flight": self.__max_in_flight,
+            "received": self.__received,
+            "processed": self.__processed,
+            "failed": self.__failed,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.__peak_in_flight,
+            "waiting": self.__waiting,
+            "wait_time": self.__wait_time
+        }
+
+    async def dispatch(self, message: aio_pika.message.IncomingMessage) -> None:
+        """Starts the handling of the given message in a new task.
+           If the maximum number of messages are already being handled, waits until one of them has finished."""
+        self.__received += 1
+        if self.__semaphore is not None:
+            if self.__semaphore.locked():
+                self.__waiting += 1
+                wait_start_time = time.perf_counter()
+                try:
+                    await self.__semaphore.acquire()
+                finally:
+                    self.__waiting -= 1
+                    self.__wait_time += time.perf_counter() - wait_start_time
             else:
-                LOGGER.error("Callback function '{:s}' is not awaitable.".format(
-                    str(getattr(self.__callback_function, "__name__", None))))
+                await self.__semaphore.acquire()
+
+        handler_task = asyncio.create_task(self.__handle_message(message))
+        self.__tasks.add(handler_task)
+        handler_task.add_done_callback(self.__task_done)
+        self.__peak_in_flight = max(self.__peak_in_flight, len(self.__tasks))
+
+    async def wait_until_idle(self, timeout: Optional[float] = None,
+                              ignored_task: Optional[asyncio.Task] = None) -> bool:
+        """Waits until all the dispatched messages have been handled or until timeout seconds have passed.
+           The handler task given as ignored_task is not waited for, e.g. a handler that is closing the listener.
+           Returns True if all the messages have been handled and False if the timeout was reached."""
+        loop = asyncio.get_running_loop()
+        end_time = None if timeout is None else loop.time() + timeout
+        while True:
+            handler_tasks = [handler_task for handler_task in self.__tasks if handler_task is not ignored_task]
+            if not handler_tasks:
+                return True
+            remaining_time = None if end_time is None else end_time - loop.time()
+            if remaining_time is not None and remaining_time <= 0:
+                return False
+            await asyncio.wait(handler_tasks, timeout=remaining_time)
+
+    async def cancel_all(self, ignored_task: Optional[asyncio.Task] = None) -> None:
+        """Cancels the handling of the dispatched messages and waits until the tasks have finished.
+           The handler task given as ignored_task is left running. The cancelled messages are not acknowledged."""
+        handler_tasks = [handler_task for handler_task in self.__tasks if handler_task is not ignored_task]
+        for handler_task in handler_tasks:
+            handler_task.cancel()
+        if handler_tasks:
+            await asyncio.wait(handler_tasks)
+
+    async def __handle_message(self, message: aio_pika.message.IncomingMessage) -> None:
+        """Calls the callback for the message and acknowledges the message after the callback has finished.
+           If the callback raises an exception, the error is logged and the message is rejected.
+           Nothing is sent for the message if its channel has already been closed."""
+        try:
+            await self.__callback_class.callback(message)
+        except Exception as error:  # pylint: disable=broad-except
+            self.__failed += 1
+            LOGGER.error("{:s} error when handling a message from topic '{:s}': {:s}".format(
+                type(error).__name__, str(message.routing_key), str(error)))
+            if not message.processed and not message.channel.is_closed:
+                await message.reject()
+        else:
+            self.__processed += 1
+            if not message.processed and not message.channel.is_closed:
+                await message.ack()
+
+    def __task_done(self, handler_task: asyncio.Task) -> None:
+        """Frees the slot of a finished task. Also called for tasks that were cancelled before they started."""
+        self.__tasks.discard(handler_task)
+        if self.__semaphore is not None:
+            self.__semaphore.release()
@@ -7,12 +7,13 @@
 """This module contains a client class for sending and listening to messages using a RabbitMQ message bus."""
 
 import asyncio
-from typing import Dict, List, Optional, Tuple, Union, cast
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Tuple, Union, cast
 
 import aio_pika
 from aio_pika.exceptions import CONNECTION_EXCEPTIONS
 
-from tools.callbacks import CallbackFunctionType, MessageCallback
+from tools.callbacks import CallbackFunctionType, MessageCallback, MessageDispatcher
+from tools.message.codec import CONTENT_ENCODING_DEFLATE, CodecRegistry, JsonCodec, compress_message
 from tools.messages import AbstractMessage
 from tools.tools import (
     FullLogger, handle_async_exception, load_environmental_variables,
@@ -24,6 +25,11 @@ aio_pika.robust_connection.log = LOGGER.logger
 RECONNECT_INTERVAL = 30
 CONNECTION_CREATION_INTERVAL = 5
 MAX_CONNECTION_TRIES = 18
+# the time in seconds that a closing listener waits for the messages that are still being handled
+LISTENER_CLOSE_TIMEOUT = 10
+
+# a message ready to be published: (topic_name, message)
+OutgoingMessageType = Tuple[str, aio_pika.Message]
 
 
 def default_env_variable_definitions() -> List[Tuple[str, EnvironmentVariableType, EnvironmentVariableValue]]:
@@ -40,7 +46,14 @@ def default_env_variable_definitions() -> List[Tuple[str, EnvironmentVariableTyp
         (env_variable_name("ssl_version"), str, "PROTOCOL_TLS"),
         (env_variable_name("exchange"), str, ""),
         (env_variable_name("exchange_autodelete"), bool, False),
-        (env_variable_name("exchange_durable"), bool, False)
+        (env_variable_name("exchange_durable"), bool, False),
+        (env_variable_name("compression_level"), int, 1),
+        (env_variable_name("compression_threshold"), int, 0),
+        (env_variable_name("prefetch_count"), int, 100),
+        (env_variable_name("max_in_flight"), int, 100),
+        (env_variable_name("publish_channels"), int, 1),
+        (env_variable_name("publish_batch_size"), int, 100),
+        (env_variable_name("publisher_confirms"), bool, True)
     ]
 
 
@@ -62,21 +75,40 @@ def validate_message(topic_name: str, message_to_publish: Union[bytes, AbstractM
     """Validates the message received from a queue for publishing.
        Returns a tuple (topic_name: str, message_to_publish: bytes) if the message is valid.
        Otherwise, returns (None, None)."""
+    validated_topic_name, validated_message, _ = validate_message_with_content_type(topic_name, message_to_publish)
+    if validated_topic_name is None or validated_message is None:
+        return None, None
+    return validated_topic_name, validated_message
+
+
+def validate_message_with_content_type(topic_name: str, message_to_publish: Union[bytes, AbstractMessage],
+                                       content_type: Optional[str] = None) \
+        -> Union[Tuple[None, None, None], Tuple[str, bytes, str]]:
+    """Validates the message received from a queue for publishing and encodes message objects with the codec
+       selected for the topic and the message type by CodecRegistry.
+       Returns a tuple (topic_name: str, message_to_publish: bytes, content_type: str) if the message is valid.
+       The content type for bytes is the given content type or JSON if it is not given.
+       Otherwise, returns (None, None, None)."""
     # Note: no checking for the contents of the message are done currently.
     if not isinstance(topic_name, str):
         topic_name = str(topic_name)
     if isinstance(message_to_publish, AbstractMessage):
-        message_to_publish = message_to_publish.bytes()
+        if content_type is None:
+            message_to_publish, content_type = CodecRegistry.encode(topic_name, message_to_publish.json())
+        else:
+            message_to_publish = CodecRegistry.get_codec(content_type).encode(message_to_publish.json())
+    elif content_type is None:
+        content_type = JsonCodec.CONTENT_TYPE
 
     if topic_name == "":
         LOGGER.warning("Topic name for the message to publish was empty.")
-        return None, None
+        return None, None, None
 
     if not isinstance(message_to_publish, bytes):
         LOGGER.warning("Wrong message type ('{:s}') for publishing.".format(str(type(message_to_publish))))
-        return None, None
+        return None, None, None
 
-    return topic_name, message_to_publish
+    return topic_name, message_to_publish, content_type
 
 
 class RabbitmqExchangeParameters:
@@ -104,6 +136,8 @@ class RabbitmqExchangeParameters:
 
 class RabbitmqConnection:
     """Class for holding a RabbitMQ connection including the channel and exchange.
+       The connection can be shared by several users that each open their own channels with open_channel.
+       The connection is robust, so after a connection failure it is restored together with all its channels.
        This is mainly intended for the use of RabbitmqClient objects.
     """
     def __init__(self, connection_parameters: dict, exchange_parameters: RabbitmqExchangeParameters):
@@ -114,9 +148,20 @@ class RabbitmqConnection:
         self.__rabbitmq_channel = None
         self.__rabbitmq_exchange = None
 
+        # prevents the users of a shared connection from creating several connections at the same time
+        self.__connection_lock = asyncio.Lock()
+
     async def get_connection(self) -> Optional[aio_pika.connection.ConnectionType]:
         """Returns a RabbitMQ connection. Creates the connection on the first call.
            If the connection has been closed, tries to create a new connection."""
+        if self.__rabbitmq_connection is None or self.__rabbitmq_connection.is_closed:
+            async with self.__connection_lock:
+                await self.__create_connection()
+
+        return self.__rabbitmq_connection
+
+    async def __create_connection(self) -> None:
+        """Creates a new RabbitMQ connection unless another caller has already created it."""
         if self.__rabbitmq_connection is None or self.__rabbitmq_connection.is_closed:
             connection_created = False
             connection_creation_interval = 0.0
@@ -160,24 +205,52 @@ class RabbitmqConnection:
             self.__rabbitmq_channel = None
             self.__rabbitmq_exchange = None
 
-        return self.__rabbitmq_connection  # pyright: reportGeneralTypeIssues=false
+    async def open_channel(self, publisher_confirms: bool = True) -> Optional[aio_pika.channel.Channel]:
+        """Opens and returns a new channel for the RabbitMQ connection. Creates the connection if needed.
+           If publisher_confirms is True, publishing a message on the channel waits for the confirmation
+           from the message bus. The caller is responsible for closing the channel, e.g. with close_channel.
+           Returns None if the channel could not be opened."""
+        connection = await self.get_connection()
+        if connection is None:
+            LOGGER.warning("No RabbitMQ connection found, cannot open a channel")
+            return None
+
+        try:
+            return await connection.channel(  # pyright: ignore[reportGeneralTypeIssues]
+                publisher_confirms=publisher_confirms)
+        except CONNECTION_EXCEPTIONS as channel_error:
+            LOGGER.warning("When creating RabbitMQ channel, received: {} : {}".format(
+                type(channel_error).__name__, channel_error))
+            return None
+
+    async def declare_exchange(self, channel: aio_pika.channel.Channel) -> Optional[aio_pika.exchange.Exchange]:
+        """Declares the exchange for the given channel of the connection and returns it.
+           Returns None if the exchange could not be declared."""
+        try:
+            return await channel.declare_exchange(
+                name=self.__exchange_parameters.exchange_name,
+                type=aio_pika.exchange.ExchangeType.TOPIC,
+                auto_delete=self.__exchange_parameters.auto_delete,
+                durable=self.__exchange_parameters.durable)
+        except CONNECTION_EXCEPTIONS as exchange_error:
+            LOGGER.warning("When creating RabbitMQ exchange, received: {} : {}".format(
+                type(exchange_error).__name__, exchange_error))
+            return None
+
+    @staticmethod
+    async def close_channel(channel: Optional[aio_pika.channel.Channel]) -> None:
+        """Closes the given channel without closing the connection."""
+        if channel is not None and not channel.is_closed:
+            try:
+                await channel.close()
+            except CONNECTION_EXCEPTIONS as closing_error:
+                LOGGER.warning("When closing RabbitMQ channel, received: {} : {}".format(
+                    type(closing_error).__name__, closing_error))
 
     async def get_channel(self) -> Optional[aio_pika.channel.Channel]:
         """Returns a channel for a RabbitMQ connection. Creates the channel on the first call."""
         if self.__rabbitmq_channel is None or self.__rabbitmq_channel.is_closed:
-            connection = await self.get_connection()
-            if connection is None:
-                LOGGER.warning("No RabbitMQ connection found, setting channel to None")
-                self.__rabbitmq_channel = None
-
-            else:
-                try:
-                    self.__rabbitmq_channel = await connection.channel()
-                except CONNECTION_EXCEPTIONS as channel_error:
-                    LOGGER.warning("When creating RabbitMQ channel, received: {} : {}".format(
-                        type(channel_error).__name__, channel_error))
-                    self.__rabbitmq_channel = None
-
+            self.__rabbitmq_channel = await self.open_channel()
             self.__rabbitmq_exchange = None
 
         return self.__rabbitmq_channel
@@ -192,16 +265,7 @@ class RabbitmqConnection:
                 self.__rabbitmq_exchange = None
 
             else:
-                try:
-                    self.__rabbitmq_exchange = await channel.declare_exchange(
-                        name=self.__exchange_parameters.exchange_name,
-                        type=aio_pika.exchange.ExchangeType.TOPIC,
-                        auto_delete=self.__exchange_parameters.auto_delete,
-                        durable=self.__exchange_parameters.durable)
-                except CONNECTION_EXCEPTIONS as exchange_error:
-                    LOGGER.warning("When creating RabbitMQ channel, received: {} : {}".format(
-                        type(exchange_error).__name__, exchange_error))
-                    self.__rabbitmq_exchange = None
+                self.__rabbitmq_exchange = await self.declare_exchange(channel)
 
         return self.__rabbitmq_exchange
 
@@ -219,6 +283,192 @@ class RabbitmqConnection:
         self.__rabbitmq_exchange = None
 
 
+class RabbitmqChannelPool:
+    """Class for holding a fixed size pool of channels, and their exchanges, opened from a shared RabbitMQ connection.
+       The channels are opened when they are first needed and are used in turns.
+       RabbitMQ keeps the order of the messages only within a channel, so with more than one channel
+       the messages published using different channels can arrive in a different order than they were published.
+       This is mainly intended for publishing messages by RabbitmqClient objects.
+    """
+    def __init__(self, connection_class: RabbitmqConnection, pool_size: int, publisher_confirms: bool = True):
+        self.__connection_class = connection_class
+        self.__pool_size = max(pool_size, 1)
+        self.__publisher_confirms = publisher_confirms
+        self.__channels: List[Optional[aio_pika.channel.Channel]] = [None] * self.__pool_size
+        self.__exchanges: List[Optional[aio_pika.exchange.Exchange]] = [None] * self.__pool_size
+        self.__next_index = 0
+
+    @property
+    def pool_size(self) -> int:
+        """Returns the number of channels in the pool."""
+        return self.__pool_size
+
+    async def get_exchange(self) -> Optional[aio_pika.exchange.Exchange]:
+        """Returns the exchange for the next channel in the pool. Opens the channel if it is not open.
+           Returns None if the channel could not be opened or the exchange could not be declared."""
+        pool_index = self.__next_index
+        self.__next_index = (pool_index + 1) % self.__pool_size
+
+        channel = self.__channels[pool_index]
+        if channel is None or channel.is_closed or self.__exchanges[pool_index] is None:
+            await RabbitmqConnection.close_channel(channel)
+            channel = await self.__connection_class.open_channel(self.__publisher_confirms)
+            self.__channels[pool_index] = channel
+            self.__exchanges[pool_index] = (
+                await self.__connection_class.declare_exchange(channel) if channel is not None else None)
+
+        return self.__exchanges[pool_index]
+
+    async def close(self) -> None:
+        """Closes the channels in the pool without closing the connection."""
+        for channel in self.__channels:
+            await RabbitmqConnection.close_channel(channel)
+        self.__channels = [None] * self.__pool_size
+        self.__exchanges = [None] * self.__pool_size
+
+
+class RabbitmqPublisher:
+    """Class for publishing messages through an outgoing queue.
+       One publisher task takes the queued messages in order and publishes up to batch_size of them at a time
+       using one channel from the channel pool. The messages in a batch are published without waiting for each other,
+       so when publisher confirms are used, the whole batch waits for the confirmations only once.
+       The next batch uses the next channel in the pool, so the publishing order is kept only with one channel.
+       This is mainly intended for the use of RabbitmqClient objects.
+    """
+    def __init__(self, channel_pool: RabbitmqChannelPool, batch_size: int):
+        self.__channel_pool = channel_pool
+        self.__batch_size = max(batch_size, 1)
+
+        # the queue and the publisher task are created when the first message is published
+        self.__queue: Optional[asyncio.Queue] = None
+        self.__publisher_task: Optional[asyncio.Task] = None
+        self.__is_closed = False
+
+        self.__published = 0
+        self.__failed = 0
+        self.__batches = 0
+
+    @property
+    def batch_size(self) -> int:
+        """Returns the maximum number of messages published at a time."""
+        return self.__batch_size
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        """Returns the counters for the publisher as a dictionary:
+           - queued: the number of messages waiting in the outgoing queue
+           - published: the number of published messages
+           - failed: the number of messages that could not be published
+           - batches: the number of published batches
+        """
+        return {
+            "queued": self.__queue.qsize() if self.__queue is not None else 0,
+            "published": self.__published,
+            "failed": self.__failed,
+            "batches": self.__batches
+        }
+
+    async def publish(self, outgoing_messages: List[Union[OutgoingMessageType, Awaitable[OutgoingMessageType]]]) \
+            -> None:
+        """Adds the given messages to the outgoing queue and waits until they have been published.
+           A message can also be given as an awaitable, e.g. a task compressing the message, and it is
+           awaited by the publisher task, so that the message keeps its place in the queue."""
+        if self.__is_closed:
+            LOGGER.warning("Messages not sent because the publisher is closed.")
+            return
+
+        if self.__publisher_task is None:
+            self.__queue = asyncio.Queue()
+            self.__publisher_task = asyncio.create_task(self.__publish_from_queue())
+
+        loop = asyncio.get_running_loop()
+        done_futures = []
+        for outgoing_message in outgoing_messages:
+            done_future = loop.create_future()
+            self.__queue.put_nowait((outgoing_message, done_future))  # type: ignore
+            done_futures.append(done_future)
+        await asyncio.gather(*done_futures)
+
+    async def close(self) -> None:
+        """Publishes the messages that are already in the queue and stops the publisher task."""
+        self.__is_closed = True
+        if self.__publisher_task is not None and self.__queue is not None:
+            self.__queue.put_nowait(None)
+            await self.__publisher_task
+            self.__publisher_task = None
+
+    async def __publish_from_queue(self) -> None:
+        """Publishes the messages from the outgoing queue in batches until None is received from the queue."""
+        queue = cast(asyncio.Queue, self.__queue)
+        queue_item = 0
+        while queue_item is not None:
+            batch = []
+            queue_item = await queue.get()
+            while queue_item is not None:
+                batch.append(queue_item)
+                if len(batch) >= self.__batch_size or queue.empty():
+                    break
+                queue_item = queue.get_nowait()
+
+            if batch:
+                try:
+                    await self.__publish_batch(batch)
+                except Exception as error:  # pylint: disable=broad-except
+                    # the publisher task must keep running so that the later messages are not left in the queue
+                    LOGGER.error("{}: '{}' when trying to publish messages.".format(type(error).__name__, error))
+
+    async def __publish_batch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        """Publishes the given batch of messages using one channel and marks the messages as done."""
+        try:
+            outgoing_messages: List[OutgoingMessageType] = []
+            for outgoing_message, _ in batch:
+                if not isinstance(outgoing_message, tuple):
+                    try:
+                        outgoing_message = await outgoing_message
+                    except (OSError, ValueError, TypeError) as error:
+                        LOGGER.warning("{}: '{}' when trying to prepare message.".format(type(error).__name__, error))
+                        self.__failed += 1
+                        continue
+                outgoing_messages.append(outgoing_message)
+
+            send_exchange = await self.__channel_pool.get_exchange()
+            if send_exchange is None:
+                LOGGER.warning("Cannot publish message because there is no connection")
+                self.__failed += len(outgoing_messages)
+                return
+
+            publish_results = await asyncio.gather(
+                *(
+                    send_exchange.publish(message, routing_key=topic_name)
+                    for topic_name, message in outgoing_messages
+                ),
+                return_exceptions=True)
+            self.__batches += 1
+
+            for (topic_name, message), publish_result in zip(outgoing_messages, publish_results):
+                if isinstance(publish_result, BaseException):
+                    self.__failed += 1
+                    LOGGER.warning("{}: '{}' when trying to publish message.".format(
+                        type(publish_result).__name__, publish_result))
+                    continue
+
+                self.__published += 1
+                if message.content_encoding is None:
+                    LOGGER.debug("Message '{:s}' send to topic: '{:s}'".format(
+                        message.body.decode(RabbitmqClient.MESSAGE_ENCODING, errors="replace"), topic_name))
+                else:
+                    LOGGER.debug("Compressed message of {:d} bytes send to topic: '{:s}'".format(
+                        len(message.body), topic_name))
+
+        except CONNECTION_EXCEPTIONS as error:
+            LOGGER.warning("{}: '{}' when trying to publish message.".format(type(error).__name__, error))
+
+        finally:
+            for _, done_future in batch:
+                if not done_future.done():
+                    done_future.set_result(None)
+
+
 class RabbitmqClient:
     """RabbitMQ client that can be used to send messages and to create topic listeners."""
     DEFAULT_ENV_VARIABLE_PREFIX = "RABBITMQ_"
@@ -231,7 +481,22 @@ class RabbitmqClient:
     EXCHANGE_ATTRIBUTE_DURABLE = "exchange_durable"
     EXCHANGE_PARAMETERS = [EXCHANGE_ATTRIBUTE_NAME, EXCHANGE_ATTRIBUTE_AUTODELETE, EXCHANGE_ATTRIBUTE_DURABLE]
 
-    FULL_ATTRIBUTE_NAME_LIST = CONNECTION_PARAMTERS + [OPTIONAL_SSL_PARAMETER] + EXCHANGE_PARAMETERS
+    COMPRESSION_ATTRIBUTE_LEVEL = "compression_level"
+    COMPRESSION_ATTRIBUTE_THRESHOLD = "compression_threshold"
+    COMPRESSION_PARAMETERS = [COMPRESSION_ATTRIBUTE_LEVEL, COMPRESSION_ATTRIBUTE_THRESHOLD]
+
+    LISTENER_ATTRIBUTE_PREFETCH_COUNT = "prefetch_count"
+    LISTENER_ATTRIBUTE_MAX_IN_FLIGHT = "max_in_flight"
+    LISTENER_PARAMETERS = [LISTENER_ATTRIBUTE_PREFETCH_COUNT, LISTENER_ATTRIBUTE_MAX_IN_FLIGHT]
+
+    PUBLISH_ATTRIBUTE_CHANNELS = "publish_channels"
+    PUBLISH_ATTRIBUTE_BATCH_SIZE = "publish_batch_size"
+    PUBLISH_ATTRIBUTE_CONFIRMS = "publisher_confirms"
+    PUBLISH_PARAMETERS = [PUBLISH_ATTRIBUTE_CHANNELS, PUBLISH_ATTRIBUTE_BATCH_SIZE, PUBLISH_ATTRIBUTE_CONFIRMS]
+
+    FULL_ATTRIBUTE_NAME_LIST = (
+        CONNECTION_PARAMTERS + [OPTIONAL_SSL_PARAMETER] + EXCHANGE_PARAMETERS + COMPRESSION_PARAMETERS +
+        LISTENER_PARAMETERS + PUBLISH_PARAMETERS)
 
     MESSAGE_ENCODING = "UTF-8"
 
@@ -246,6 +511,19 @@ class RabbitmqClient:
            - exchange     : the name for the exchange used by the client
            - exchange_autodelete  : whether to automatically delete the exchange after use
            - exchange_durable     : whether to setup the exchange to survive message bus restarts
+           - compression_level    : the zlib compression level (0-9) for the compressed messages
+           - compression_threshold: the messages larger than this many bytes are compressed, 0 disables compression
+           - prefetch_count       : the maximum number of unacknowledged messages the message bus delivers to
+                                    each listener, 0 for no limit
+           - max_in_flight        : the maximum number of messages each listener handles at the same time,
+                                    0 for no limit
+           - publish_channels     : the number of channels used for publishing messages, with more than one channel
+                                    the messages from the client are not guaranteed to arrive in the sending order
+           - publish_batch_size   : the maximum number of queued messages that are published at a time
+           - publisher_confirms   : whether to wait for the message bus to confirm the published messages
+
+           All the listeners and the publishing share one connection to the RabbitMQ server
+           and each listener uses its own channel.
 
            If a value for attribute is missing from kwargs, the value is read from
            the corresponding environmental variable with the given default value as a backup.
@@ -258,6 +536,13 @@ class RabbitmqClient:
            - RABBITMQ_EXCHANGE (default value: "")
            - RABBITMQ_EXCHANGE_AUTODELETE (default value: False)
            - RABBITMQ_EXCHANGE_DURABLE (default value: False)
+           - RABBITMQ_COMPRESSION_LEVEL (default value: 1)
+           - RABBITMQ_COMPRESSION_THRESHOLD (default value: 0)
+           - RABBITMQ_PREFETCH_COUNT (default value: 100)
+           - RABBITMQ_MAX_IN_FLIGHT (default value: 100)
+           - RABBITMQ_PUBLISH_CHANNELS (default value: 1)
+           - RABBITMQ_PUBLISH_BATCH_SIZE (default value: 100)
+           - RABBITMQ_PUBLISHER_CONFIRMS (default value: True)
         """
         kwargs_env = load_config_from_env_variables()
         kwargs = {
@@ -271,9 +556,24 @@ class RabbitmqClient:
             exchange_autodelete=cast(bool, kwargs[RabbitmqClient.EXCHANGE_ATTRIBUTE_AUTODELETE]),
             exchange_durable=cast(bool, kwargs[RabbitmqClient.EXCHANGE_ATTRIBUTE_DURABLE]))
 
-        self.__send_connection = RabbitmqConnection(self.__connection_parameters, self.__exchange_parameters)
+        self.__compression_level = cast(int, kwargs[RabbitmqClient.COMPRESSION_ATTRIBUTE_LEVEL])
+        self.__compression_threshold = cast(int, kwargs[RabbitmqClient.COMPRESSION_ATTRIBUTE_THRESHOLD])
+        self.__prefetch_count = cast(int, kwargs[RabbitmqClient.LISTENER_ATTRIBUTE_PREFETCH_COUNT])
+        self.__max_in_flight = cast(int, kwargs[RabbitmqClient.LISTENER_ATTRIBUTE_MAX_IN_FLIGHT])
+
+        # one robust connection is shared by the listeners and the publishing
+        self.__connection = RabbitmqConnection(self.__connection_parameters, self.__exchange_parameters)
+        self.__publish_channels = RabbitmqChannelPool(
+            self.__connection,
+            cast(int, kwargs[RabbitmqClient.PUBLISH_ATTRIBUTE_CHANNELS]),
+            cast(bool, kwargs[RabbitmqClient.PUBLISH_ATTRIBUTE_CONFIRMS]))
+        self.__publisher = RabbitmqPublisher(
+            self.__publish_channels, cast(int, kwargs[RabbitmqClient.PUBLISH_ATTRIBUTE_BATCH_SIZE]))
         self.__listened_topics = set()
         self.__listener_tasks = []
+        self.__listener_dispatchers: List[Tuple[List[str], MessageDispatcher]] = []
+        # the task that is removing the listeners, e.g. a message handler that closes the client
+        self.__closing_task: Optional[asyncio.Task] = None
 
         self.__lock = asyncio.Lock()
         self.__is_closed = False
@@ -283,10 +583,12 @@ class RabbitmqClient:
         asyncio.get_event_loop().set_exception_handler(handle_async_exception)
 
     async def close(self) -> None:
-        """Closes the sender connection and all the listener connections."""
+        """Closes all the listeners, the publishing channels and the shared connection."""
         async with self.__lock:
             await self.remove_listeners()
-            await self.__send_connection.close()
+            await self.__publisher.close()
+            await self.__publish_channels.close()
+            await self.__connection.close()
             self.__is_closed = True
 
     @property
@@ -304,6 +606,20 @@ class RabbitmqClient:
         """Returns a list of the topics the client is currently listening."""
         return list(self.__listened_topics)
 
+    @property
+    def listener_metrics(self) -> List[Dict[str, Any]]:
+        """Returns the message handling metrics for each topic listener, see MessageDispatcher.metrics.
+           The listened topics are included in the attribute "topics"."""
+        return [
+            {"topics": list(topic_names), **dispatcher.metrics}
+            for topic_names, dispatcher in self.__listener_dispatchers
+        ]
+
+    @property
+    def publish_metrics(self) -> Dict[str, int]:
+        """Returns the counters for the published messages, see RabbitmqPublisher.metrics."""
+        return self.__publisher.metrics
+
     def add_listener(self, topic_names: Union[str, List[str]], callback_function: CallbackFunctionType) -> None:
         """Adds a new topic listener to the client for the given topic(s). One listener can listen to multiple topics.
            Each topic name should be an acceptable routing key for RabbitMQ.
@@ -316,6 +632,9 @@ class RabbitmqClient:
            a dictionary containing the received message is send to the callback_function instead of
            AbstractMessage object. In case the received message was not in JSON format, a string containing the message
            is used as the first parameter for the callback_function instead.
+
+           A received message is acknowledged after the callback_function has finished handling it.
+           At most max_in_flight messages are handled at the same time by the listener.
         """
         if self.is_closed:
             LOGGER.warning("Client is closed, no topic listener added.")
@@ -324,61 +643,95 @@ class RabbitmqClient:
         if isinstance(topic_names, str):
             topic_names = [topic_names]
 
-        new_connection = RabbitmqConnection(self.__connection_parameters, self.__exchange_parameters)
+        dispatcher = MessageDispatcher(MessageCallback(callback_function), self.__max_in_flight)
         listener_task = asyncio.create_task(self.__listen_to_topics(
-            connection_class=new_connection,
+            connection_class=self.__connection,
             topic_names=topic_names,
-            callback_class=MessageCallback(callback_function)
+            dispatcher=dispatcher
         ))
 
         self.__listener_tasks.append(listener_task)
+        self.__listener_dispatchers.append((topic_names, dispatcher))
         for topic_name in topic_names:
             self.__listened_topics.add(topic_name)
 
     async def remove_listeners(self) -> None:
-        """Removes all topic listeners from the client."""
-        for listener_task in self.__listener_tasks:
-            listener_task.cancel()
-            try:
-                await listener_task
-            except asyncio.CancelledError:
-                pass
+        """Removes all topic listeners from the client.
+           If this is called from a message handler, the listeners do not wait for or cancel that handler."""
+        self.__closing_task = asyncio.current_task()
+        try:
+            for listener_task in self.__listener_tasks:
+                listener_task.cancel()
+                try:
+                    await listener_task
+                except asyncio.CancelledError:
+                    pass
+        finally:
+            self.__closing_task = None
 
         self.__listener_tasks = []
+        self.__listener_dispatchers = []
         self.__listened_topics = set()
 
-    async def send_message(self, topic_name: str, message_bytes: bytes) -> None:
-        """Sends the given message to the given topic. Assumes that the message is in bytes format."""
-        async with self.__lock:
-            if self.is_closed:
-                LOGGER.warning("Message not sent because the client is closed.")
-                return
-
-            validated_topic_name, message_to_publish = validate_message(topic_name, message_bytes)
-            if validated_topic_name is None or message_to_publish is None:
-                return
-
-            try:
-                send_exchange = await self.__send_connection.get_exchange()
-                if send_exchange is None:
-                    LOGGER.warning("Cannot publish message because there is no connection")
-                    return
-
-                await send_exchange.publish(aio_pika.Message(message_to_publish), routing_key=topic_name)
-                LOGGER.debug("Message '{:s}' send to topic: '{:s}'".format(
-                    message_to_publish.decode(RabbitmqClient.MESSAGE_ENCODING), topic_name))
+    async def send_message(self, topic_name: str, message_bytes: Union[bytes, AbstractMessage],
+                           content_type: Optional[str] = None) -> None:
+        """Sends the given message to the given topic.
+           The message can be given in bytes format or as a message object. A message object is encoded with
+           the codec that is selected for the topic or the message type in CodecRegistry, JSON by default.
+           The content type of the codec is set as the AMQP content type so that the receivers can decode
+           the message. For messages given in bytes format, content_type tells the codec that was used and
+           JSON is assumed if it is not given.
+           If compression is enabled and the message is larger than the compression threshold, the message
+           is compressed with zlib and the AMQP content encoding is set to "deflate".
+           The message is added to the outgoing queue of the client and it is published together with the other
+           queued messages. Returns after the message has been published."""
+        await self.send_messages([(topic_name, message_bytes)], content_type)
+
+    async def send_messages(self, messages: Iterable[Tuple[str, Union[bytes, AbstractMessage]]],
+                            content_type: Optional[str] = None) -> None:
+        """Sends the given messages given as (topic_name, message_bytes) tuples, see send_message.
+           The messages are added to the outgoing queue at once and are published in the given order in as few
+           batches as possible. Returns after all the messages have been published."""
+        if self.is_closed:
+            LOGGER.warning("Message not sent because the client is closed.")
+            return
 
-            except SystemExit:
-                LOGGER.debug("SystemExit received when trying to publish message.")
-                await self.__send_connection.close()
-                raise
-            except CONNECTION_EXCEPTIONS as error:
-                LOGGER.warning("{}: '{}' when trying to publish message.".format(type(error).__name__, error))
-            except GeneratorExit:
-                LOGGER.warning("GeneratorExit received when trying to publish message.")
+        outgoing_messages = []
+        for topic_name, message_bytes in messages:
+            outgoing_message = self.__prepare_message(topic_name, message_bytes, content_type)
+            if outgoing_message is not None:
+                outgoing_messages.append(outgoing_message)
+
+        if outgoing_messages:
+            await self.__publisher.publish(outgoing_messages)
+
+    def __prepare_message(self, topic_name: str, message_bytes: Union[bytes, AbstractMessage],
+                          content_type: Optional[str]) \
+            -> Union[None, OutgoingMessageType, Awaitable[OutgoingMessageType]]:
+        """Returns the message ready to be published or None if the message is not valid.
+           If the message is compressed, returns a task that compresses the message."""
+        validated_topic_name, message_to_publish, validated_content_type = validate_message_with_content_type(
+            topic_name, message_bytes, content_type)
+        if validated_topic_name is None or message_to_publish is None or validated_content_type is None:
+            return None
+
+        if 0 < self.__compression_threshold < len(message_to_publish):
+            return asyncio.create_task(
+                self.__compress_message(validated_topic_name, message_to_publish, validated_content_type))
+
+        return validated_topic_name, aio_pika.Message(message_to_publish, content_type=validated_content_type)
+
+    async def __compress_message(self, topic_name: str, message_to_publish: bytes,
+                                 content_type: str) -> OutgoingMessageType:
+        """Returns the compressed message ready to be published."""
+        # zlib releases the GIL, so compressing large messages does not block the event loop
+        compressed_message = await asyncio.get_running_loop().run_in_executor(
+            None, compress_message, message_to_publish, self.__compression_level)
+        return topic_name, aio_pika.Message(
+            compressed_message, content_type=content_type, content_encoding=CONTENT_ENCODING_DEFLATE)
 
     async def __listen_to_topics(self, connection_class: RabbitmqConnection, topic_names: Union[str, List[str]],
-                                 callback_class: MessageCallback) -> None:
+                                 dispatcher: MessageDispatcher) -> None:
         """Starts a RabbitMQ message bus listener for the given topics."""
         if isinstance(topic_names, str):
             topic_names = [topic_names]
@@ -394,26 +747,26 @@ class RabbitmqClient:
             LOGGER.info("Opening RabbitMQ listener for the topics: '{:s}'".format(", ".join(topic_names)))
 
             try:
-                rabbitmq_connection = await connection_class.get_connection()
-                if rabbitmq_connection is None:
+                # each listener uses its own channel from the shared connection
+                rabbitmq_channel = await connection_class.open_channel()
+                if rabbitmq_channel is None:
                     reconnect_listeners = True
                     await wait_before_reconnecting()
                     continue
 
-                async with rabbitmq_connection:
-                    rabbitmq_channel = await connection_class.get_channel()
-                    if rabbitmq_channel is not None:
-                        rabbitmq_queue = await rabbitmq_channel.declare_queue(
-                            auto_delete=True,  # Delete the queue when no one uses it anymore
-                            exclusive=True     # No other application can access the queue; delete on exit
-                        )
-                        rabbitmq_exchange = await connection_class.get_exchange()
-                    else:
-                        rabbitmq_queue = None
-                        rabbitmq_exchange = None
-                        reconnect_listeners = True
+                try:
+                    if self.__prefetch_count > 0:
+                        # limits the number of unacknowledged messages delivered to the listener
+                        await rabbitmq_channel.set_qos(prefetch_count=self.__prefetch_count)
+                    rabbitmq_queue = await rabbitmq_channel.declare_queue(
+                        auto_delete=True,  # Delete the queue when no one uses it anymore
+                        exclusive=True     # No other application can access the queue; delete on exit
+                    )
+                    rabbitmq_exchange = await connection_class.declare_exchange(rabbitmq_channel)
 
-                    if rabbitmq_queue is not None and rabbitmq_exchange is not None:
+                    if rabbitmq_exchange is None:
+                        reconnect_listeners = True
+                    else:
                         # Binding the queue to the given topics
                         for topic_name in topic_names:
                             await rabbitmq_queue.bind(rabbitmq_exchange, routing_key=topic_name)
@@ -422,10 +775,26 @@ class RabbitmqClient:
 
                         async with rabbitmq_queue.iterator() as queue_iter:
                             async for message in queue_iter:
-                                async with message.process():
-                                    LOGGER.debug("Message '{}' received from topic: '{}'".format(
-                                        message.body.decode(RabbitmqClient.MESSAGE_ENCODING), message.routing_key))
-                                    asyncio.create_task(callback_class.callback(message))
+                                LOGGER.debug("Message '{}' received from topic: '{}'".format(
+                                    message.body.decode(RabbitmqClient.MESSAGE_ENCODING, errors="replace"),
+                                    message.routing_key))
+                                # waits if the listener is already handling the maximum number of messages
+                                # the message is acknowledged after it has been handled
+                                await dispatcher.dispatch(message)
+
+                finally:
+                    try:
+                        # the messages still being handled must finish or be cancelled before their channel is closed
+                        # the cancelled messages are not acknowledged, so the message bus will deliver them again
+                        # a handler that is closing the client is waiting for this listener, so it is left running
+                        closing_task = self.__closing_task
+                        if not await dispatcher.wait_until_idle(LISTENER_CLOSE_TIMEOUT, closing_task):
+                            LOGGER.warning("Cancelling the handling of messages from the topics: '{:s}'".format(
+                                ", ".join(topic_names)))
+                            await dispatcher.cancel_all(closing_task)
+                    finally:
+                        # only the channel of the listener is closed, the connection is shared
+                        await RabbitmqConnection.close_channel(rabbitmq_channel)
 
                 if reconnect_listeners:
                     await wait_before_reconnecting()
@@ -442,7 +811,6 @@ class RabbitmqClient:
                 await wait_before_reconnecting()
 
         LOGGER.info("Closing listener for topics: '{:s}'".format(", ".join(topic_names)))
-        await connection_class.close()
 
     @classmethod
     def __get_connection_parameters_only(cls, connection_config_dict: dict) -> dict:
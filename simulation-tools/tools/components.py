@@ -9,7 +9,7 @@
 
 import asyncio
 import json
-from typing import cast, Any, Dict, List, Optional, Union
+from typing import cast, Any, Dict, List, Optional, Tuple, Union
 
 from tools.clients import RabbitmqClient
 from tools.exceptions.messages import MessageError
@@ -186,6 +186,8 @@ class AbstractSimulationComponent:
         self._latest_epoch_message = None
 
         self._message_generator = MessageGenerator(self._simulation_id, self._component_name)
+        # the status ready messages differ only by the header attributes, so they are created from a template
+        self._status_message_template = None
         # include the message id generator separately to be compatible with older code created before
         # the message generator class was implemented
         self._message_id_generator = self._message_generator.message_id_generator
@@ -453,13 +455,14 @@ class AbstractSimulationComponent:
             await self.send_error_message(self._error_description)
             return
 
-        status_message = self._get_status_message()
+        status_message = self._get_status_message_bytes()
         if status_message is None:
             await self.send_error_message("Internal error when creating status message.")
         else:
-            await self._rabbitmq_client.send_message(self._status_topic, status_message.bytes())
+            status_message_id, status_message_bytes = status_message
+            await self._rabbitmq_client.send_message(self._status_topic, status_message_bytes)
             self._completed_epoch = self._latest_epoch
-            self._latest_status_message_id = status_message.message_id
+            self._latest_status_message_id = status_message_id
 
     async def send_error_message(self, description: str) -> None:
         """Sends an error message to the message bus."""
@@ -486,6 +489,34 @@ class AbstractSimulationComponent:
             LOGGER.error("Problem with creating a status message: {}".format(message_error))
             return None
 
+    def _get_status_message_bytes(self) -> Union[Tuple[str, bytes], None]:
+        """Creates a new status message and returns the message id and the message in bytes format.
+           The message is created from a template that is built from the first status message, so only
+           the header attributes are serialized again. If the component overrides _get_status_message,
+           the message is created by it instead. Returns None, if there was a problem creating the message."""
+        if type(self)._get_status_message is not AbstractSimulationComponent._get_status_message:
+            status_message = self._get_status_message()
+            if status_message is None:
+                return None
+            return status_message.message_id, status_message.bytes()
+
+        try:
+            if self._status_message_template is None:
+                self._status_message_template = self._message_generator.get_message_template(
+                    StatusMessage,
+                    Value=StatusMessage.STATUS_VALUES[0],  # should be "ready"
+                    EpochNumber=self._latest_epoch,
+                    TriggeringMessageIds=self._triggering_message_ids)
+
+            return self._message_generator.get_template_bytes(
+                self._status_message_template,
+                EpochNumber=self._latest_epoch,
+                TriggeringMessageIds=self._triggering_message_ids)
+
+        except (ValueError, TypeError, MessageError) as message_error:
+            LOGGER.error("Problem with creating a status message: {}".format(message_error))
+            return None
+
     def _get_error_message(self, description: str) -> Union[StatusMessage, None]:
         """Creates a new error message and returns the created message object.
            Returns None, if there was a problem creating the message."""
@@ -7,15 +7,31 @@
 """Module containing utility functions related to datetime values."""
 
 import datetime
-from typing import Union
+import functools
+from typing import Iterable, List, Optional, Union
 
 from tools.tools import FullLogger
 
 LOGGER = FullLogger(__name__)
 
 UTC_TIMEZONE_MARK = "Z"
+UTC_OFFSET = "+00:00"
 DIGITS_IN_MILLISECONDS = 3
 
+# the reference time for the epoch milliseconds
+UNIX_EPOCH = datetime.datetime(1970, 1, 1)
+UNIX_EPOCH_UTC = UNIX_EPOCH.replace(tzinfo=datetime.timezone.utc)
+ONE_MILLISECOND = datetime.timedelta(milliseconds=1)
+
+# the format used for the date times in the messages, e.g. 2020-05-25T15:24:59.987Z
+# the separator characters and their positions in the format
+CANONICAL_DATETIME_LENGTH = 24
+CANONICAL_DATETIME_SEPARATORS = ((4, "-"), (7, "-"), (10, "T"), (13, ":"), (16, ":"), (19, "."), (23, "Z"))
+CANONICAL_DATETIME_FORMAT = "{:04d}-{:02d}-{:02d}T{:02d}:{:02d}:{:02d}.{:03d}Z"
+
+# the maximum number of conversion results kept for each of the cached conversions
+DATETIME_CACHE_SIZE = 4096
+
 
 def get_utcnow_in_milliseconds() -> str:
     """Returns the current ISO 8601 format datetime string in UTC timezone."""
@@ -30,22 +46,77 @@ def get_utcnow_in_milliseconds() -> str:
 def to_iso_format_datetime_string(datetime_value: Union[str, datetime.datetime]) -> Union[str, None]:
     """Returns the given datetime value as ISO 8601 formatted string in UTC timezone.
        Accepts either datetime objects or strings.
-       Return None if the given values was invalid."""
+       Return None if the given values was invalid.
+       The results for the latest values are cached, so repeated conversions of the same values are fast."""
     if isinstance(datetime_value, datetime.datetime):
-        isoformat_with_milliseconds = isoformat_to_milliseconds(
-            datetime_value.astimezone(datetime.timezone.utc).isoformat())
-        if isoformat_with_milliseconds is None:
-            return None
-        return isoformat_with_milliseconds + UTC_TIMEZONE_MARK
+        return _datetime_to_iso_format(datetime_value)
     if isinstance(datetime_value, str):
-        datetime_object = to_utc_datetime_object(datetime_value)
-        return to_iso_format_datetime_string(datetime_object)
+        return _string_to_iso_format(datetime_value)
     return None
 
 
+def to_iso_format_datetime_strings(datetime_values: Iterable[Union[str, datetime.datetime]]) -> Optional[List[str]]:
+    """Returns the given datetime values as a list of ISO 8601 formatted strings in UTC timezone.
+       Accepts either datetime objects or strings.
+       Returns None if any of the given values was invalid."""
+    iso_format_strings: List[str] = []
+    try:
+        for datetime_value in datetime_values:
+            iso_format_string = to_iso_format_datetime_string(datetime_value)
+            if iso_format_string is None:
+                return None
+            iso_format_strings.append(iso_format_string)
+    except (ValueError, TypeError):
+        return None
+    return iso_format_strings
+
+
 def to_utc_datetime_object(datetime_str: str) -> datetime.datetime:
-    """Returns a datetime object corresponding to the given ISO 8601 formatted string."""
-    return datetime.datetime.fromisoformat(datetime_str.replace(UTC_TIMEZONE_MARK, "+00:00"))
+    """Returns a datetime object corresponding to the given ISO 8601 formatted string.
+       The results for the latest strings are cached."""
+    return _string_to_datetime_object(datetime_str)
+
+
+def to_utc_datetime_objects(datetime_strs: Iterable[str]) -> List[datetime.datetime]:
+    """Returns a list of datetime objects corresponding to the given ISO 8601 formatted strings.
+       Throws ValueError if any of the strings is not a valid date time."""
+    return list(map(_string_to_datetime_object, datetime_strs))
+
+
+def _is_canonical_datetime(datetime_str: str) -> bool:
+    """Returns True if the given string has the separators of the format YYYY-MM-DDTHH:MM:SS.mmmZ
+       at the fixed positions. The digits are not checked."""
+    if len(datetime_str) != CANONICAL_DATETIME_LENGTH or not datetime_str.isascii():
+        return False
+    for position, separator in CANONICAL_DATETIME_SEPARATORS:
+        if datetime_str[position] != separator:
+            return False
+    return True
+
+
+def _parse_datetime_string(datetime_str: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(datetime_str.replace(UTC_TIMEZONE_MARK, UTC_OFFSET))
+
+
+_string_to_datetime_object = functools.lru_cache(maxsize=DATETIME_CACHE_SIZE)(_parse_datetime_string)
+
+
+@functools.lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def _string_to_iso_format(datetime_str: str) -> Union[str, None]:
+    if _is_canonical_datetime(datetime_str):
+        # a string in the canonical format is already in the ISO 8601 format used in the messages,
+        # so it only has to be checked to be a valid date time
+        _parse_datetime_string(datetime_str)
+        return datetime_str
+    return _datetime_to_iso_format(_string_to_datetime_object(datetime_str))
+
+
+@functools.lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def _datetime_to_iso_format(datetime_object: datetime.datetime) -> str:
+    utc_datetime = datetime_object.astimezone(datetime.timezone.utc)
+    return CANONICAL_DATETIME_FORMAT.format(
+        utc_datetime.year, utc_datetime.month, utc_datetime.day,
+        utc_datetime.hour, utc_datetime.minute, utc_datetime.second, utc_datetime.microsecond // 1000)
 
 
 def isoformat_to_milliseconds(datetime_str: str) -> Union[str, None]:
@@ -72,3 +143,26 @@ def isoformat_to_milliseconds(datetime_str: str) -> Union[str, None]:
         )
 
     return datetime_str + "." + "0" * DIGITS_IN_MILLISECONDS
+
+
+def to_epoch_milliseconds(datetime_value: Union[str, datetime.datetime]) -> int:
+    """Returns the given datetime value as integer milliseconds since 1970-01-01T00:00:00Z.
+       Accepts either datetime objects or ISO 8601 formatted strings. Any sub-millisecond part is truncated.
+       Throws ValueError if the given value is not a valid datetime value."""
+    if isinstance(datetime_value, str):
+        # not cached since the values are usually the unique date times of a time index
+        datetime_value = _parse_datetime_string(datetime_value)
+    elif not isinstance(datetime_value, datetime.datetime):
+        raise ValueError("'{:s}' is not a valid date time value".format(str(datetime_value)))
+    if datetime_value.tzinfo is None:
+        # naive datetime values are interpreted in the local timezone like in to_iso_format_datetime_string
+        datetime_value = datetime_value.astimezone(datetime.timezone.utc)
+    return (datetime_value - UNIX_EPOCH_UTC) // ONE_MILLISECOND
+
+
+def from_epoch_milliseconds(epoch_milliseconds: int) -> str:
+    """Returns the given milliseconds since 1970-01-01T00:00:00Z as ISO 8601 formatted string in UTC timezone."""
+    return (
+        (UNIX_EPOCH + datetime.timedelta(milliseconds=epoch_milliseconds)).isoformat(timespec="milliseconds") +
+        UTC_TIMEZONE_MARK
+    )
@@ -53,3 +53,7 @@ class MessageUnitValueError(MessageValueError):
 
 class MessageBlockError(MessageError):
     """Exception class for errors related to invalid use of block attributes."""
+
+
+class MessageCodecError(MessageError):
+    """Exception class for errors related to encoding or decoding message bytes."""
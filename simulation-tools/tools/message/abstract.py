@@ -10,14 +10,16 @@
 from __future__ import annotations
 import datetime
 import json
-from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+import operator
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar, Union, cast
 
 from tools.datetime_tools import get_utcnow_in_milliseconds, to_iso_format_datetime_string
 from tools.exceptions.messages import (
     MessageDateError, MessageIdError, MessageSourceError, MessageTypeError,
-    MessageValueError, MessageEpochValueError, MessageBlockError)
-from tools.message.block import QuantityArrayBlock, QuantityBlock, TimeSeriesBlock
+    MessageValueError, MessageEpochValueError, MessageBlockError, MessageError)
+from tools.message.block import QuantityArrayBlock, QuantityBlock, TimeSeriesBlock, ValueArrayType, get_float_buffer
 from tools.message.factory import MessageFactory
+from tools.message.utils import get_storage_name
 from tools.tools import FullLogger
 
 LOGGER = FullLogger(__name__)
@@ -28,35 +30,81 @@ OPTIONALLY_GENERATED_ATTRIBUTES = [
 ]
 
 
+# The types of the message objects created by the class methods of the message classes.
+MessageType = TypeVar("MessageType", bound="BaseMessage")
+ResultMessageType = TypeVar("ResultMessageType", bound="AbstractResultMessage")
+
+# The value types that are used as such in the JSON message. The values of other types are converted
+# with their json() method if they have one.
+JSON_VALUE_TYPES = frozenset((str, int, float, bool, list, dict, type(None)))
+
+# The compiled serialization plans for the message classes.
+# Each plan is a tuple of (json attribute name, value getter, is the attribute optional).
+_SERIALIZATION_PLANS: Dict[type, Tuple[Tuple[str, Callable[[Any], Any], bool], ...]] = {}
+
+
+def _get_value_getter(message_class: Type[BaseMessage], json_attribute_name: str,
+                      object_attribute_name: str) -> Callable[[Any], Any]:
+    """Returns a function that reads the value of the given attribute from a message object.
+       If the class that defines the property lists the attribute in its STORED_VALUE_ATTRIBUTES,
+       the private storage attribute is read directly without calling the property."""
+    for base_class in message_class.__mro__:
+        if object_attribute_name in vars(base_class):
+            if json_attribute_name in vars(base_class).get("STORED_VALUE_ATTRIBUTES", ()):
+                return operator.attrgetter(message_class.ATTRIBUTE_STORAGE_NAMES[json_attribute_name])
+            break
+    return operator.attrgetter(object_attribute_name)
+
+
+def get_serialization_plan(message_class: Type[BaseMessage]) -> Tuple[Tuple[str, Callable[[Any], Any], bool], ...]:
+    """Returns the serialization plan for the given message class. The plan is compiled the first time
+       it is requested for the class and contains (json attribute name, value getter, is optional) for each
+       attribute in MESSAGE_ATTRIBUTES_FULL."""
+    plan = _SERIALIZATION_PLANS.get(message_class, None)
+    if plan is None:
+        optional_attributes = set(message_class.OPTIONAL_ATTRIBUTES_FULL)
+        plan = tuple(
+            (
+                json_attribute_name,
+                _get_value_getter(message_class, json_attribute_name, object_attribute_name),
+                json_attribute_name in optional_attributes
+            )
+            for json_attribute_name, object_attribute_name in message_class.MESSAGE_ATTRIBUTES_FULL.items()
+        )
+        _SERIALIZATION_PLANS[message_class] = plan
+    return plan
+
+
 def get_json(message_object: BaseMessage) -> Dict[str, Any]:
     """Returns a JSON based on the values of the given message_object and the attribute parameters."""
-    return {
-        json_attribute_name: (
-            getattr(message_object, object_attribute_name)
-            if not hasattr(getattr(message_object, object_attribute_name), 'json')
-            else getattr(message_object, object_attribute_name).json()
-        )
-        for json_attribute_name, object_attribute_name in message_object.__class__.MESSAGE_ATTRIBUTES_FULL.items()
-        if (json_attribute_name not in message_object.__class__.OPTIONAL_ATTRIBUTES_FULL or
-            getattr(message_object, object_attribute_name) is not None)
-    }
+    plan = _SERIALIZATION_PLANS.get(message_object.__class__, None)
+    if plan is None:
+        plan = get_serialization_plan(message_object.__class__)
+
+    json_message = {}
+    for json_attribute_name, value_getter, is_optional in plan:
+        value = value_getter(message_object)
+        if value is None:
+            if is_optional:
+                continue
+        elif value.__class__ not in JSON_VALUE_TYPES and hasattr(value, "json"):
+            value = value.json()
+        json_message[json_attribute_name] = value
+    return json_message
 
 
 def validate_json(message_class: Type[BaseMessage], json_message: Dict[str, Any]) -> bool:
     """Validates the given the given json object for the attributes covered in the given message class.
         Returns True if the message is ok. Otherwise, return False."""
-    for json_attribute_name, object_attribute_name in message_class.MESSAGE_ATTRIBUTES_FULL.items():
-        if json_attribute_name not in json_message and json_attribute_name in OPTIONALLY_GENERATED_ATTRIBUTES:
-            continue
-
-        if (json_attribute_name not in json_message and
-                json_attribute_name not in message_class.OPTIONAL_ATTRIBUTES_FULL):
-            LOGGER.warning("{:s} attribute is missing from the message".format(json_attribute_name))
-            return False
+    for json_attribute_name, attribute_check, is_optional, is_generated in message_class.VALIDATION_TABLE:
+        if json_attribute_name not in json_message:
+            if is_generated:
+                continue
+            if not is_optional:
+                LOGGER.warning("{:s} attribute is missing from the message".format(json_attribute_name))
+                return False
 
-        if not getattr(
-                message_class,
-                "_".join(["_check", object_attribute_name]))(json_message.get(json_attribute_name, None)):
+        if not attribute_check(json_message.get(json_attribute_name, None)):
             # TODO: handle checking for missing timezone information
             LOGGER.warning("'{:s}' is not valid message value for {:s}".format(
                 str(json_message[json_attribute_name]), json_attribute_name))
@@ -67,6 +115,7 @@ def validate_json(message_class: Type[BaseMessage], json_message: Dict[str, Any]
 
 class BaseMessage():
     """The base message class for all simulation platform messages."""
+    __slots__ = ("__message_type", "__simulation_id", "__timestamp")
     MESSAGE_ENCODING = "UTF-8"
     # The "Type" attribute is checked against CLASS_MESSAGE_TYPE if MESSAGE_TYPE_CHECK is True.
     # For example, for EpochMessage, "Type" must be "Epoch", but for AbstractMessage any string is acceptable.
@@ -81,6 +130,9 @@ class BaseMessage():
     }
     # Attributes that can be missing from the message. Missing attributes are set to value None.
     OPTIONAL_ATTRIBUTES = []
+    # Attributes whose property getter only returns the stored value, get_json reads these values directly.
+    # Only the properties defined in the class itself are affected, so each class lists its own attributes.
+    STORED_VALUE_ATTRIBUTES = list(MESSAGE_ATTRIBUTES)
 
     # attributes whose value is a QuantityBlock and the expected unit of measure.
     # https://simcesplatform.github.io/core_block-quantity/
@@ -91,6 +143,9 @@ class BaseMessage():
     # a list of attributes whose value is a TimeSeriesBlock.
     # https://simcesplatform.github.io/core_time-series/
     TIMESERIES_BLOCK_ATTRIBUTES = []
+    # the class used for the time series blocks given as dictionaries
+    # ArrayTimeSeriesBlock can be used for messages that contain long time series
+    TIMESERIES_BLOCK_CLASS: Type[TimeSeriesBlock] = TimeSeriesBlock
 
     # Full list af all attribute names, any subclass should update these with additional names.
     MESSAGE_ATTRIBUTES_FULL = MESSAGE_ATTRIBUTES
@@ -101,6 +156,47 @@ class BaseMessage():
 
     DEFAULT_SIMULATION_ID = "2000-01-01T00:00:00.000Z"
 
+    # Resolved once for each message class when the class is created, see _resolve_attribute_tables.
+    # The check functions and the private storage attribute names by the JSON attribute names.
+    ATTRIBUTE_CHECKS: Dict[str, Callable[[Any], bool]] = {}
+    ATTRIBUTE_STORAGE_NAMES: Dict[str, str] = {}
+    # (JSON attribute name, check function, is optional, is optionally generated) for each attribute
+    VALIDATION_TABLE: Tuple[Tuple[str, Callable[[Any], bool], bool, bool], ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._resolve_attribute_tables()
+
+    @classmethod
+    def _resolve_attribute_tables(cls):
+        """Resolves the check functions and the private storage attribute names for the attributes
+           in MESSAGE_ATTRIBUTES_FULL, so that validating and setting the attributes do not need to build
+           the names and look them up for each message."""
+        optional_attributes = set(cls.OPTIONAL_ATTRIBUTES_FULL)
+        attribute_checks: Dict[str, Optional[Callable[[Any], bool]]] = {
+            json_attribute_name: getattr(cls, "_check_" + object_attribute_name, None)
+            for json_attribute_name, object_attribute_name in cls.MESSAGE_ATTRIBUTES_FULL.items()
+        }
+        cls.ATTRIBUTE_STORAGE_NAMES = {
+            json_attribute_name: get_storage_name(cls, object_attribute_name)
+            for json_attribute_name, object_attribute_name in cls.MESSAGE_ATTRIBUTES_FULL.items()
+        }
+        missing_checks = [name for name, attribute_check in attribute_checks.items() if attribute_check is None]
+        if missing_checks:
+            LOGGER.warning("No check functions found for attributes {:s} in {:s}".format(
+                ", ".join(missing_checks), cls.__name__))
+        # the attributes without a check function fail only when they are validated
+        cls.ATTRIBUTE_CHECKS = cast(Dict[str, Callable[[Any], bool]], attribute_checks)
+        cls.VALIDATION_TABLE = tuple(
+            (
+                json_attribute_name,
+                attribute_check,
+                json_attribute_name in optional_attributes,
+                json_attribute_name in OPTIONALLY_GENERATED_ATTRIBUTES
+            )
+            for json_attribute_name, attribute_check in cls.ATTRIBUTE_CHECKS.items()
+        )
+
     def __init__(self, **kwargs):
         """Only arguments in MESSAGE_ATTRIBUTES_FULL of the message class are considered.
            If Timestamp is missing, it is added with a value corresponding to the current time.
@@ -206,9 +302,9 @@ class BaseMessage():
 
         if isinstance(value, (QuantityBlock, dict)):
             if isinstance(value, dict):
-                if not QuantityBlock.validate_json(value):
+                value = QuantityBlock.from_json(value)
+                if value is None:
                     return False
-                value = QuantityBlock(**value)
 
             return value.unit_of_measure == unit and (float_value_check is None or float_value_check(value.value))
 
@@ -244,11 +340,11 @@ class BaseMessage():
             quantity_value = QuantityBlock(Value=float(quantity_value), UnitOfMeasure=unit)
 
         # set value for the attribute
-        # Note: attribute name has to include the class name to be of use in subclasses since that is what
+        # Note: the storage name includes the name of the class that defines the property since that is what
         #       the Python interpreter actually uses for self.__attribute_name
         setattr(
             self,
-            "_" + self.__class__.__name__ + "__" + self.MESSAGE_ATTRIBUTES_FULL[message_attribute],
+            self.__class__.ATTRIBUTE_STORAGE_NAMES[message_attribute],
             quantity_value)
 
     @classmethod
@@ -262,6 +358,7 @@ class BaseMessage():
         value:             The value to be checked.
                            A dictionary has to in a form that can be used to construct a QuantityArrayBlock object.
                            A QuantityArrayBlock has to have the expected unit.
+                           A float buffer, e.g. array('d'), is accepted like a list of floats.
         unit:              The unit of measure expected.
         can_be_none:       Should a None value be accepted.
         value_array_check: Optional additional check for the quantity array. For example if it only positive values
@@ -273,7 +370,8 @@ class BaseMessage():
 
         # extra check to avoid illegal value types
         if not isinstance(value, (list, QuantityArrayBlock, dict)):
-            return False
+            # the float buffers contain only floats, so the items do not need to be checked
+            return get_float_buffer(value) is not None and (value_array_check is None or value_array_check(value))
 
         if isinstance(value, list):
             for list_item in value:
@@ -282,11 +380,14 @@ class BaseMessage():
             return value_array_check is None or value_array_check(value)
 
         if isinstance(value, dict):
-            if not QuantityArrayBlock.validate_json(value):
+            quantity_array_block = QuantityArrayBlock.from_json(value)
+            if quantity_array_block is None:
                 return False
-            value = QuantityArrayBlock(**value)  # pyright: reportGeneralTypeIssues=false
+            value = cast(QuantityArrayBlock, quantity_array_block)
 
-        return value.unit_of_measure == unit and (value_array_check is None or value_array_check(value.values))
+        if value.unit_of_measure != unit:
+            return False
+        return value_array_check is None or value_array_check(cast(List[float], value.values))
 
     def _set_quantity_array_block_value(
             self, message_attribute: str,
@@ -294,7 +395,8 @@ class BaseMessage():
         """Sets value for a quantity array block attribute.
 
         message_attribute:     Name of the message attribute e.g. RatedCurrent whose value is set.
-        quantity_array_value:  The value to be set which can be either a dictionary, QuantityArrayBlock or None.
+        quantity_array_value:  The value to be set which can be a list, a float buffer, a dictionary,
+                               QuantityArrayBlock or None.
         A dictionary should follow the definition of time series block and it is converted to a QuantityArrayBlock.
 
         Throws MessageBlockError if the message_attribute has not been included in QUANTITY_ARRAY_BLOCK_ATTRIBUTES_FULL.
@@ -305,19 +407,20 @@ class BaseMessage():
             raise MessageBlockError(
                 "Attribute {:s} is not registered as a quantity array block".format(message_attribute))
 
-        if isinstance(quantity_array_value, list):
+        if isinstance(quantity_array_value, list) or get_float_buffer(quantity_array_value) is not None:
             unit = self.QUANTITY_ARRAY_BLOCK_ATTRIBUTES_FULL[message_attribute]
-            quantity_array_value = QuantityArrayBlock(Values=quantity_array_value, UnitOfMeasure=unit)
+            quantity_array_value = QuantityArrayBlock(
+                Values=cast(ValueArrayType, quantity_array_value), UnitOfMeasure=unit)
 
         elif isinstance(quantity_array_value, dict):
             quantity_array_value = QuantityArrayBlock(**quantity_array_value)
 
         # set value for the attribute
-        # Note: attribute name has to include the class name to be of use in subclasses since that is what
+        # Note: the storage name includes the name of the class that defines the property since that is what
         #       the Python interpreter actually uses for self.__attribute_name
         setattr(
             self,
-            "_" + self.__class__.__name__ + "__" + self.MESSAGE_ATTRIBUTES_FULL[message_attribute],
+            self.__class__.ATTRIBUTE_STORAGE_NAMES[message_attribute],
             quantity_array_value)
 
     @classmethod
@@ -341,9 +444,9 @@ class BaseMessage():
             return False
 
         if isinstance(value, dict):
-            if not TimeSeriesBlock.validate_json(value):
+            value = cls.TIMESERIES_BLOCK_CLASS.from_json(value)
+            if value is None:
                 return False
-            value = TimeSeriesBlock(**value)
 
         return block_check is None or block_check(value)
 
@@ -364,14 +467,14 @@ class BaseMessage():
                 "Attribute {:s} is not registered as an time series block".format(message_attribute))
 
         if isinstance(timeseries_value, dict):
-            timeseries_value = TimeSeriesBlock(**timeseries_value)
+            timeseries_value = self.__class__.TIMESERIES_BLOCK_CLASS(**timeseries_value)
 
         # set value for the attribute
-        # Note: attribute name has to include the class name to be of use in subclasses since that is what
+        # Note: the storage name includes the name of the class that defines the property since that is what
         #       the Python interpreter actually uses for self.__attribute_name
         setattr(
             self,
-            "_" + self.__class__.__name__ + "__" + self.MESSAGE_ATTRIBUTES_FULL[message_attribute],
+            self.__class__.ATTRIBUTE_STORAGE_NAMES[message_attribute],
             timeseries_value)
 
     def json(self) -> Dict[str, Any]:
@@ -389,12 +492,38 @@ class BaseMessage():
         return validate_json(cls, json_message)
 
     @classmethod
-    def from_json(cls, json_message: Dict[str, Any]) -> Union[BaseMessage, None]:
+    def decode_json(cls: Type[MessageType], json_message: Dict[str, Any]) -> MessageType:
+        """Returns a class object created based on the given JSON attributes.
+           The block attributes given as dictionaries are converted to block objects only once and each attribute
+           is checked only once when it is set, so the constructor checks must cover everything validate_json checks.
+           Throws MessageError, ValueError or TypeError if the given JSON does not contain valid values."""
+        if not isinstance(json_message, dict):
+            raise TypeError("The JSON message must be a dictionary, not {:s}".format(type(json_message).__name__))
+
+        block_values = {}
+        for block_attributes, block_class in (
+                (cls.QUANTITY_BLOCK_ATTRIBUTES_FULL, QuantityBlock),
+                (cls.QUANTITY_ARRAY_BLOCK_ATTRIBUTES_FULL, QuantityArrayBlock),
+                (cls.TIMESERIES_BLOCK_ATTRIBUTES_FULL, cls.TIMESERIES_BLOCK_CLASS)):
+            for json_attribute_name in block_attributes:
+                value = json_message.get(json_attribute_name, None)
+                if isinstance(value, dict):
+                    block_values[json_attribute_name] = block_class(**value)
+
+        if block_values:
+            return cls(**{**json_message, **block_values})
+        return cls(**json_message)
+
+    @classmethod
+    def from_json(cls: Type[MessageType], json_message: Dict[str, Any]) -> Union[MessageType, None]:
         """Returns a class object created based on the given JSON attributes.
            If the given JSON does not contain valid values, returns None."""
-        if cls.validate_json(json_message):
-            return cls(**json_message)
-        return None
+        try:
+            return cls.decode_json(json_message)
+        except (MessageError, ValueError, TypeError) as message_error:
+            LOGGER.warning("{:s} error when creating {:s} from JSON: {:s}".format(
+                type(message_error).__name__, cls.__name__, str(message_error)))
+            return None
 
     @classmethod
     def register_to_factory(cls):
@@ -405,8 +534,12 @@ class BaseMessage():
             MessageFactory.register_message_type(cls)
 
 
+BaseMessage._resolve_attribute_tables()
+
+
 class AbstractMessage(BaseMessage):
     """The abstract message class that contains the attributes that all simulation specific messages should have."""
+    __slots__ = ("__source_process_id", "__message_id")
 
     # The relationships between the JSON attributes and the object properties
     MESSAGE_ATTRIBUTES = {
@@ -415,6 +548,7 @@ class AbstractMessage(BaseMessage):
     }
     # Attributes that can be missing from the message. Missing attributes are set to value None.
     OPTIONAL_ATTRIBUTES = []
+    STORED_VALUE_ATTRIBUTES = list(MESSAGE_ATTRIBUTES)
 
     # Full list af all attribute names, any subclass should update these with additional names.
     MESSAGE_ATTRIBUTES_FULL = {
@@ -466,13 +600,14 @@ class AbstractMessage(BaseMessage):
     def from_json(cls, json_message: Dict[str, Any]) -> Union[AbstractMessage, None]:
         """Returns a class object created based on the given JSON attributes.
            If the given JSON does not contain valid values, returns None."""
-        if cls.validate_json(json_message):
-            return cls(**json_message)
-        return None
+        return super().from_json(json_message)
 
 
 class AbstractResultMessage(AbstractMessage):
     """The abstract result message class that contains the attributes that all result messages have."""
+    __slots__ = (
+        "__epoch_number", "__last_updated_in_epoch", "__triggering_message_ids", "__warnings", "__iteration_status"
+    )
     CLASS_MESSAGE_TYPE = ""
 
     MESSAGE_ATTRIBUTES = {
@@ -483,6 +618,7 @@ class AbstractResultMessage(AbstractMessage):
         "IterationStatus": "iteration_status"
     }
     OPTIONAL_ATTRIBUTES = ["LastUpdatedInEpoch", "Warnings", "IterationStatus"]
+    STORED_VALUE_ATTRIBUTES = list(MESSAGE_ATTRIBUTES)
 
     MESSAGE_ATTRIBUTES_FULL = {
         **AbstractMessage.MESSAGE_ATTRIBUTES_FULL,
@@ -624,6 +760,41 @@ class AbstractResultMessage(AbstractMessage):
     def from_json(cls, json_message: Dict[str, Any]) -> Union[AbstractResultMessage, None]:
         """Returns a class object created based on the given JSON attributes.
            If the given JSON does not contain valid values, returns None."""
-        if cls.validate_json(json_message):
-            return cls(**json_message)
-        return None
+        return cast(Union[AbstractResultMessage, None], super().from_json(json_message))
+
+    @classmethod
+    def from_trusted(cls: Type[ResultMessageType], **kwargs) -> ResultMessageType:
+        """Returns a class object created from attribute values that have already been validated,
+           for example network data that was validated when it was loaded.
+           The common result message attributes and the scalar attributes are set normally. The list attributes
+           and the quantity array blocks specific to the message class are stored as they are without looping
+           over their items, so the caller is responsible for their validity.
+           Lists and float buffers given for quantity array block attributes get the default unit for the attribute
+           and the unit in a quantity array block given as a dictionary must be the default unit."""
+        message = cls.__new__(cls)
+        for json_attribute_name, object_attribute_name in cls.MESSAGE_ATTRIBUTES_FULL.items():
+            value = kwargs.get(json_attribute_name, None)
+            if (json_attribute_name in AbstractResultMessage.MESSAGE_ATTRIBUTES_FULL or
+                    not isinstance(getattr(cls, object_attribute_name, None), property)):
+                # attributes that are not properties have no checks and are set directly in any case
+                setattr(message, object_attribute_name, value)
+
+            elif (json_attribute_name in cls.QUANTITY_ARRAY_BLOCK_ATTRIBUTES_FULL and
+                  (isinstance(value, (list, dict)) or get_float_buffer(value) is not None)):
+                unit = cls.QUANTITY_ARRAY_BLOCK_ATTRIBUTES_FULL[json_attribute_name]
+                if isinstance(value, dict):
+                    # checking the unit does not depend on the number of values, so it is always done
+                    if value.get(QuantityArrayBlock.UNIT_OF_MEASURE_ATTRIBUTE) != unit:
+                        raise MessageValueError("Invalid unit of measure, {}, for attribute: {}".format(
+                            value.get(QuantityArrayBlock.UNIT_OF_MEASURE_ATTRIBUTE), json_attribute_name))
+                    value = value[QuantityArrayBlock.VALUES_ATTRIBUTE]
+                value = QuantityArrayBlock.from_trusted(cast(ValueArrayType, value), unit)
+                setattr(message, cls.ATTRIBUTE_STORAGE_NAMES[json_attribute_name], value)
+
+            elif isinstance(value, list):
+                setattr(message, cls.ATTRIBUTE_STORAGE_NAMES[json_attribute_name], value)
+
+            else:
+                setattr(message, object_attribute_name, value)
+
+        return message
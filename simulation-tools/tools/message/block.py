@@ -10,22 +10,31 @@ Defines various message attribute value blocks that different kinds of messages
 """
 
 from __future__ import annotations
+from array import array
 import datetime
 import json
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Mapping, Optional, Union
 
-from tools.datetime_tools import to_iso_format_datetime_string
+from tools.datetime_tools import from_epoch_milliseconds, to_epoch_milliseconds, to_iso_format_datetime_strings
 from tools.exceptions.messages import MessageDateError, MessageError, MessageValueError, MessageUnitValueError
 from tools.message.unit import UnitCode
 from tools.tools import FullLogger
 
 LOGGER = FullLogger(__name__)
 
+# the array type code for the float buffers that can be used as the values of value array blocks
+FLOAT_ARRAY_TYPECODE = "d"
+# the array type code for the epoch milliseconds in the time index of ArrayTimeSeriesBlock
+EPOCH_MILLISECONDS_TYPECODE = "q"
+
+ValueArrayType = Union[List[int], List[float], List[str], List[bool], array]
+
 
 class QuantityBlock():
     '''
     Represents a float type value and associated measurement unit.
     '''
+    __slots__ = ("_value", "_unit_of_measure")
 
     # name of block attribute which contains the number value
     VALUE_ATTRIBUTE = 'Value'
@@ -106,14 +115,7 @@ class QuantityBlock():
         '''
         Check if the given dictionary could be converted to a QuantityBlock.
         '''
-        try:
-            QuantityBlock(**json_quantity_block)
-            return True
-
-        except MessageValueError as err:
-            LOGGER.warning("{:s} error '{:s}' encountered when validating quantity block".format(
-                str(type(err)), str(err)))
-            return False
+        return cls.from_json(json_quantity_block) is not None
 
     @classmethod
     def from_json(cls, json_quantity_block: Dict[str, Any]):
@@ -121,17 +123,37 @@ class QuantityBlock():
         Convert the given dictionary to a QuantityBlock.
         If the conversion does not succeed returns None.
         '''
-        if cls.validate_json(json_quantity_block):
+        try:
             return QuantityBlock(**json_quantity_block)
 
+        except MessageValueError as err:
+            LOGGER.warning("{:s} error '{:s}' encountered when validating quantity block".format(
+                str(type(err)), str(err)))
+            return None
+
+
+def get_float_buffer(values: Any) -> Optional[memoryview]:
+    """Returns a memoryview of the given values if they are a one-dimensional contiguous buffer of 64-bit floats,
+       for example array('d') or a NumPy float64 array. Otherwise, returns None."""
+    if isinstance(values, (list, str, bytes)):
+        return None
+    try:
+        float_buffer = memoryview(values)
+    except TypeError:
         return None
+    if float_buffer.ndim != 1 or float_buffer.format != FLOAT_ARRAY_TYPECODE or not float_buffer.c_contiguous:
+        return None
+    return float_buffer
 
 
 class ValueArrayBlock:
     """
     Represents an array of values with an associated unit of measurement.
     The allowed value types are int, float, str and bool. The value array can contain only one type of values.
+    The values can also be given as a float buffer, e.g. array('d') or a NumPy float64 array, which is stored
+    without copying or checking the items. It is converted to a list only when the values property is used.
     """
+    __slots__ = ("__values", "__value_list", "__unit_of_measure")
     ALLOWED_VALUE_TYPES = [int, float, str, bool]
 
     # name of block attribute which contains the array of number values
@@ -142,7 +164,7 @@ class ValueArrayBlock:
     # By default the unit code validator is not in use.
     UNIT_CODE_VALIDATION = False
 
-    def __init__(self, Values: Union[List[int], List[float], List[str], List[bool]], UnitOfMeasure: str):
+    def __init__(self, Values: ValueArrayType, UnitOfMeasure: str):
         """Creates a new value array block. Throws an exception if parameters contain invalid values."""
         self.values = Values
         self.unit_of_measure = UnitOfMeasure
@@ -154,7 +176,26 @@ class ValueArrayBlock:
 
     @property
     def values(self) -> Union[List[bool], List[int], List[float], List[str]]:
-        """The values for the value array block"""
+        """The values for the value array block as a list.
+           Values given as a float buffer are converted to a list when this property is first used."""
+        value_list = self.__value_list
+        if value_list is None:
+            value_list = memoryview(self.__values).tolist()
+            self.__value_list = value_list
+        return value_list
+
+    @property
+    def value_count(self) -> int:
+        """The number of values in the value array block. Does not convert a float buffer to a list."""
+        return len(self.__values)
+
+    @property
+    def value_array(self) -> Any:
+        """The values as a float array for numeric work. Returns the float buffer given for the block without
+           copying or otherwise a new array('d') created from the value list.
+           Throws TypeError if the values are not numbers."""
+        if self.__values is self.__value_list:
+            return array(FLOAT_ARRAY_TYPECODE, self.__values)
         return self.__values
 
     @unit_of_measure.setter
@@ -164,10 +205,12 @@ class ValueArrayBlock:
         self.__unit_of_measure = unit_of_measure
 
     @values.setter
-    def values(self, values: Union[List[bool], List[int], List[float], List[str]]):
+    def values(self, values: ValueArrayType):
         if not self._check_values(values):
             raise MessageValueError("'{:s}' is not a valid for value array block".format(str(values)))
-        self.__values = values
+        # a list or a float buffer, e.g. array('d') or a NumPy float64 array
+        self.__values: Any = values
+        self.__value_list = values if isinstance(values, list) else None
 
     @classmethod
     def _check_unit_of_measure(cls, unit_of_measure: str) -> bool:
@@ -177,9 +220,10 @@ class ValueArrayBlock:
         )
 
     @classmethod
-    def _check_values(cls, values: Union[List[bool], List[int], List[float], List[str]]) -> bool:
+    def _check_values(cls, values: ValueArrayType) -> bool:
         if not isinstance(values, list):
-            return False
+            # the float buffers can only contain floats
+            return get_float_buffer(values) is not None
         if not values:  # accept empty list
             return True
 
@@ -201,9 +245,11 @@ class ValueArrayBlock:
 
     def json(self) -> Dict[str, Any]:
         """Returns the time series attribute as JSON object."""
+        # the list created from a float buffer is not stored, so that the block keeps using only the buffer
+        value_list = self.__value_list
         return {
             self.UNIT_OF_MEASURE_ATTRIBUTE: self.unit_of_measure,
-            self.VALUES_ATTRIBUTE: self.values
+            self.VALUES_ATTRIBUTE: value_list if value_list is not None else memoryview(self.__values).tolist()
         }
 
     def __eq__(self, other: Any) -> bool:
@@ -223,46 +269,47 @@ class ValueArrayBlock:
     def validate_json(cls, json_value_array_block: Dict[str, Any]) -> bool:
         """Validates if the given json object can be used to create a valid ValueArrayBlock instance.
         Returns True if the value array block is ok. Otherwise, returns False."""
+        return cls.from_json(json_value_array_block) is not None
+
+    @classmethod
+    def from_json(cls, json_value_array_block: Dict[str, Any]) -> Union[ValueArrayBlock, None]:
+        """Returns a class object created based on the given JSON attributes.
+           If the given JSON is contains invalid values, returns None."""
         if not isinstance(json_value_array_block, dict):
-            return False
+            return None
         try:
-            cls(**json_value_array_block)
-            return True
+            return cls(**json_value_array_block)
 
         except (MessageValueError, ValueError, TypeError) as message_error:
             LOGGER.warning("{:s} error '{:s}' encountered when validating value array block".format(
                 str(type(message_error)), str(message_error)))
-            return False
+            return None
 
     @classmethod
-    def from_json(cls, json_value_array_block: Dict[str, Any]) -> Union[ValueArrayBlock, None]:
-        """Returns a class object created based on the given JSON attributes.
-           If the given JSON is contains invalid values, returns None."""
-        if cls.validate_json(json_value_array_block):
-            return cls(**json_value_array_block)
-        return None
+    def from_trusted(cls, Values: ValueArrayType, UnitOfMeasure: str) -> ValueArrayBlock:
+        """Returns a new block without checking the values or the unit of measure.
+           Only to be used for values that have already been validated, since the values are not looped over.
+           The values can be a list or a float buffer."""
+        # pylint: disable=invalid-name
+        value_array_block = cls.__new__(cls)
+        value_array_block.__values = Values
+        value_array_block.__value_list = Values if isinstance(Values, list) else None
+        value_array_block.__unit_of_measure = UnitOfMeasure
+        return value_array_block
 
 
 class QuantityArrayBlock(ValueArrayBlock):
     """
     Represents an array of float values with an associated unit of measurement.
+    The values can be given as a list of floats or as a float buffer, e.g. array('d').
     """
+    __slots__ = ()
     ALLOWED_VALUE_TYPES = [float]
 
-    @property
-    def values(self) -> List[float]:
-        """The values for the value array block"""
-        return self.__values
-
-    @values.setter
-    def values(self, values: List[float]):
-        if not self._check_values(values):
-            raise MessageValueError("'{:s}' is not a valid for value array block".format(str(values)))
-        self.__values = values
-
 
 class TimeSeriesBlock():
     """Class for containing one time series block for a message in the simulation platform. """
+    __slots__ = ("__time_index", "__series")
     TIMEINDEX_ATTRIBUTE = "TimeIndex"
     SERIES_ATTRIBUTE = "Series"
 
@@ -290,69 +337,80 @@ class TimeSeriesBlock():
 
     @time_index.setter
     def time_index(self, time_index: List[Union[str, datetime.datetime]]):
-        if getattr(self, "series", None) is None:
-            expected_list_length = None
-        else:
-            # Check that the time series list is the same length as the first value series list.
-            expected_list_length = len(self.series[next(iter(self.series))].values)
-
-        if self._check_time_index(time_index, expected_list_length):
-            new_time_index_list = []
-            for datetime_value in time_index:
-                iso_format_string = to_iso_format_datetime_string(datetime_value)
-                if isinstance(iso_format_string, str):
-                    new_time_index_list.append(iso_format_string)
-                else:
-                    raise MessageDateError("'{:s}' is not a valid date time value".format(str(datetime_value)))
-            self.__time_index = new_time_index_list
+        # Check that the time series list is the same length as the first value series list.
+        expected_list_length = self._get_series_length()
+        if not isinstance(time_index, list) or (
+                expected_list_length is not None and len(time_index) != expected_list_length):
+            raise MessageDateError("'{:s}' is not a valid list of date times".format(str(time_index)))
 
-        else:
+        # the date times are checked while they are converted, so that each value is only parsed once
+        new_time_index_list = to_iso_format_datetime_strings(time_index)
+        if new_time_index_list is None:
             raise MessageDateError("'{:s}' is not a valid list of date times".format(str(time_index)))
+        self.__time_index = new_time_index_list
 
     @series.setter
     def series(self, series: Dict[str, Union[ValueArrayBlock, Dict[str, Any]]]):
-        if getattr(self, "time_index", None) is None:
-            expected_list_length = None
-        else:
-            # Check that all the values series lists are the same length as the time series list.
-            expected_list_length = len(self.time_index)
-
-        if not self._check_series(series, expected_list_length):
+        # Check that all the values series lists are the same length as the time series list.
+        series_blocks = self._get_series_blocks(series)
+        if series_blocks is None or not self._check_series(series_blocks, self._get_time_index_length()):
             raise MessageValueError("'{:s}' is not a valid dictionary of time series values".format(str(series)))
+        self.__series = series_blocks
+
+    def _get_time_index_length(self) -> Optional[int]:
+        """Returns the number of date times in the time index or None if the time index has not been set."""
+        try:
+            return len(self.__time_index)
+        except AttributeError:
+            return None
 
-        self.__series = {}
+    def _get_series_length(self) -> Optional[int]:
+        """Returns the number of values in the first value series or None if the series have not been set."""
+        try:
+            series = self.__series
+        except AttributeError:
+            return None
+        return series[next(iter(series))].value_count
+
+    @classmethod
+    def _get_series_blocks(cls, series: Dict[str, Union[ValueArrayBlock, Dict[str, Any]]]) \
+            -> Optional[Dict[str, ValueArrayBlock]]:
+        """Returns a new dictionary in which the series given as dictionaries are converted to ValueArrayBlocks.
+           Returns None if the series are not given as a dictionary or some series is not a valid block."""
+        if not isinstance(series, dict):
+            return None
+        series_blocks = {}
         for series_name, series_values in series.items():
             if isinstance(series_values, ValueArrayBlock):
-                self.__series[series_name] = series_values
+                series_blocks[series_name] = series_values
             else:
-                self.__series[series_name] = ValueArrayBlock(**series_values)
+                try:
+                    series_blocks[series_name] = ValueArrayBlock(**series_values)
+                except (MessageError, ValueError, TypeError):
+                    return None
+        return series_blocks
 
     def add_series(self, series_name: str, series_values: ValueArrayBlock):
         """Adds a new or replaces an old value series for the TimeSeriesBlock."""
-        if self._check_series({series_name: series_values}, len(self.__time_index)):
+        if self._check_series({series_name: series_values}, self._get_time_index_length()):
             self.series[series_name] = series_values
         else:
             raise MessageValueError("'{:s}' is not a valid value series for {:s}".format(
                 str(series_name), str(series_values)))
 
     @classmethod
-    def _check_time_index(cls, time_index: List[Union[str, datetime.datetime]], list_length: int = None) -> bool:
+    def _check_time_index(cls, time_index: List[Union[str, datetime.datetime]],
+                          list_length: Optional[int] = None) -> bool:
         if not isinstance(time_index, list):
             return False
         if list_length is not None and len(time_index) != list_length:
             return False
 
-        for datetime_value in time_index:
-            try:
-                if to_iso_format_datetime_string(datetime_value) is None:
-                    return False
-            except ValueError:
-                return False
-
-        return True
+        return to_iso_format_datetime_strings(time_index) is not None
 
     @classmethod
-    def _check_series(cls, series: Dict[str, Union[ValueArrayBlock, Dict[str, Any]]], list_length: int = None) -> bool:
+    def _check_series(cls, series: Mapping[str, Union[ValueArrayBlock, Dict[str, Any]]],
+                      list_length: Optional[int] = None) -> bool:
         # There must be at least one series
         if not isinstance(series, dict) or len(series) == 0:
             return False
@@ -362,7 +420,7 @@ class TimeSeriesBlock():
                 return False
 
             if isinstance(series_values, ValueArrayBlock):
-                if list_length is not None and len(series_values.values) != list_length:
+                if list_length is not None and series_values.value_count != list_length:
                     return False
             else:
                 try:
@@ -401,19 +459,117 @@ class TimeSeriesBlock():
     def validate_json(cls, json_timeseries_block: Dict[str, Any]) -> bool:
         """Validates the given the given json object for the attributes covered in TimeSeriesBlock class.
            Returns True if the time series block is ok. Otherwise, return False."""
+        return cls.from_json(json_timeseries_block) is not None
+
+    @classmethod
+    def from_json(cls, json_timeseries_block: Dict[str, Any]) -> Union[TimeSeriesBlock, None]:
+        """Returns a class object created based on the given JSON attributes.
+           If the given JSON is not validated returns None."""
         try:
-            _ = cls(**json_timeseries_block)
-            return True
+            return cls(**json_timeseries_block)
 
         except (MessageError, ValueError, TypeError) as time_series_error:
             LOGGER.warning("{:s} error '{:s}' encountered when validating time series block".format(
                 str(type(time_series_error)), str(time_series_error)))
-            return False
+            return None
+
+
+class ArrayTimeSeriesBlock(TimeSeriesBlock):
+    """Time series block that stores the time index as an array of epoch milliseconds and the float value series
+       as float buffers. Each date time is parsed once when the time index is set and the ISO 8601 strings are
+       created only when the block is converted to JSON or the time_index property is used. The value series
+       that contain only floats are stored as array('d'). Otherwise, the block works like TimeSeriesBlock.
+    """
+    __slots__ = ("__time_index_milliseconds", "__time_index_list")
+
+    @property
+    def time_index(self) -> List[str]:
+        """The list of date times for the time series in ISO 8601 format (UTC).
+           The list is created when this property is first used."""
+        time_index_list = self.__time_index_list
+        if time_index_list is None:
+            time_index_list = [
+                from_epoch_milliseconds(epoch_milliseconds) for epoch_milliseconds in self.__time_index_milliseconds
+            ]
+            self.__time_index_list = time_index_list
+        return time_index_list
+
+    @property
+    def time_index_milliseconds(self) -> array:
+        """The date times of the time index as an array of milliseconds since 1970-01-01T00:00:00Z."""
+        return self.__time_index_milliseconds
+
+    @time_index.setter
+    def time_index(self, time_index: Union[List[Union[str, datetime.datetime]], array]):
+        # Check that the time series list is the same length as the first value series list.
+        expected_list_length = self._get_series_length()
+        if (not isinstance(time_index, (list, array)) or
+                (expected_list_length is not None and len(time_index) != expected_list_length)):
+            raise MessageDateError("'{:s}' is not a valid list of date times".format(str(time_index)))
+
+        if isinstance(time_index, array):
+            # an array is taken to contain epoch milliseconds
+            if time_index.typecode != EPOCH_MILLISECONDS_TYPECODE:
+                raise MessageDateError("The time index array must have the type code '{:s}'".format(
+                    EPOCH_MILLISECONDS_TYPECODE))
+            time_index_milliseconds = time_index
+        else:
+            try:
+                time_index_milliseconds = array(
+                    EPOCH_MILLISECONDS_TYPECODE, map(to_epoch_milliseconds, time_index))
+            except (ValueError, TypeError, OverflowError) as date_error:
+                raise MessageDateError("'{:s}' is not a valid list of date times".format(
+                    str(time_index))) from date_error
+
+        self.__time_index_milliseconds = time_index_milliseconds
+        self.__time_index_list = None
 
     @classmethod
-    def from_json(cls, json_timeseries_block: Dict[str, Any]) -> Union[TimeSeriesBlock, None]:
-        """Returns a class object created based on the given JSON attributes.
-           If the given JSON is not validated returns None."""
-        if cls.validate_json(json_timeseries_block):
-            return cls(**json_timeseries_block)
-        return None
+    def _get_series_blocks(cls, series: Dict[str, Union[ValueArrayBlock, Dict[str, Any]]]) \
+            -> Optional[Dict[str, ValueArrayBlock]]:
+        """Returns the series as ValueArrayBlocks like TimeSeriesBlock but the series that are given as dictionaries
+           containing only float values are stored as float arrays."""
+        series_blocks = super()._get_series_blocks(series)
+        if series_blocks is None:
+            return None
+        for series_name, series_values in series.items():
+            if isinstance(series_values, ValueArrayBlock):
+                continue
+            series_block = series_blocks[series_name]
+            value_list = series_values.get(ValueArrayBlock.VALUES_ATTRIBUTE)
+            if isinstance(value_list, list) and value_list and all(isinstance(value, float) for value in value_list):
+                series_blocks[series_name] = series_block.__class__.from_trusted(
+                    array(FLOAT_ARRAY_TYPECODE, value_list), series_block.unit_of_measure)
+        return series_blocks
+
+    def _get_time_index_length(self) -> Optional[int]:
+        try:
+            return len(self.__time_index_milliseconds)
+        except AttributeError:
+            return None
+
+    def json(self) -> Dict[str, Any]:
+        """Returns the Time series block as a JSON object."""
+        # the ISO 8601 strings created for the JSON are not stored in the block
+        time_index_list = self.__time_index_list
+        if time_index_list is None:
+            time_index_list = list(map(from_epoch_milliseconds, self.__time_index_milliseconds))
+        return {
+            self.TIMEINDEX_ATTRIBUTE: time_index_list,
+            self.SERIES_ATTRIBUTE: {
+                attribute_name: attribute_value.json()
+                for attribute_name, attribute_value in self.series.items()
+            }
+        }
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, ArrayTimeSeriesBlock):
+            return (
+                self.__time_index_milliseconds == other.time_index_milliseconds and
+                self.series == other.series
+            )
+        return (
+            isinstance(other, TimeSeriesBlock) and
+            self.time_index == other.time_index and
+            self.series == other.series
+        )
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+
+"""This module contains tools for sending a large result message as several chunks and for reassembling them."""
+
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from tools.exceptions.messages import MessageValueError
+from tools.message.abstract import AbstractResultMessage
+from tools.message.block import QuantityArrayBlock
+from tools.tools import FullLogger
+
+LOGGER = FullLogger(__name__)
+
+CHUNK_INDEX_ATTRIBUTE = "ChunkIndex"
+CHUNK_COUNT_ATTRIBUTE = "ChunkCount"
+DATASET_HASH_ATTRIBUTE = "DatasetHash"
+CHUNK_ATTRIBUTES = (CHUNK_INDEX_ATTRIBUTE, CHUNK_COUNT_ATTRIBUTE, DATASET_HASH_ATTRIBUTE)
+
+
+def get_chunk_ranges(row_count: int, chunk_size: int) -> List[range]:
+    """Returns the row ranges for splitting the given number of rows into chunks of at most chunk_size rows.
+       There is always at least one chunk. If chunk_size is not positive, all the rows are in one chunk."""
+    if chunk_size <= 0 or row_count <= chunk_size:
+        return [range(row_count)]
+    return [range(start, min(start + chunk_size, row_count)) for start in range(0, row_count, chunk_size)]
+
+
+class ChunkedResultMessage(AbstractResultMessage):
+    """The abstract result message class for messages whose array attributes can be split into several chunks.
+       All the chunks of the same data set have the same DatasetHash, their own ChunkIndex and the total ChunkCount.
+       A message that is not split does not have the chunk attributes."""
+    __slots__ = ("__chunk_index", "__chunk_count", "__dataset_hash")
+    CLASS_MESSAGE_TYPE = ""
+
+    CHUNK_INDEX = CHUNK_INDEX_ATTRIBUTE
+    CHUNK_COUNT = CHUNK_COUNT_ATTRIBUTE
+    DATASET_HASH = DATASET_HASH_ATTRIBUTE
+
+    MESSAGE_ATTRIBUTES = {
+        CHUNK_INDEX: "chunk_index",
+        CHUNK_COUNT: "chunk_count",
+        DATASET_HASH: "dataset_hash"
+    }
+    OPTIONAL_ATTRIBUTES = list(CHUNK_ATTRIBUTES)
+    STORED_VALUE_ATTRIBUTES = list(MESSAGE_ATTRIBUTES)
+
+    MESSAGE_ATTRIBUTES_FULL = {
+        **AbstractResultMessage.MESSAGE_ATTRIBUTES_FULL,
+        **MESSAGE_ATTRIBUTES
+    }
+    OPTIONAL_ATTRIBUTES_FULL = AbstractResultMessage.OPTIONAL_ATTRIBUTES_FULL + OPTIONAL_ATTRIBUTES
+
+    @property
+    def chunk_index(self) -> Optional[int]:
+        """The index of this chunk starting from 0 or None if the message is not split into chunks."""
+        return self.__chunk_index
+
+    @property
+    def chunk_count(self) -> Optional[int]:
+        """The total number of chunks or None if the message is not split into chunks."""
+        return self.__chunk_count
+
+    @property
+    def dataset_hash(self) -> Optional[str]:
+        """The identifier of the data set that is shared by all the chunks."""
+        return self.__dataset_hash
+
+    @chunk_index.setter
+    def chunk_index(self, chunk_index: Optional[int]):
+        if not self._check_chunk_index(chunk_index):
+            raise MessageValueError("'{}' is not a valid chunk index".format(chunk_index))
+        self.__chunk_index = chunk_index
+
+    @chunk_count.setter
+    def chunk_count(self, chunk_count: Optional[int]):
+        if not self._check_chunk_count(chunk_count):
+            raise MessageValueError("'{}' is not a valid chunk count".format(chunk_count))
+        self.__chunk_count = chunk_count
+
+    @dataset_hash.setter
+    def dataset_hash(self, dataset_hash: Optional[str]):
+        if not self._check_dataset_hash(dataset_hash):
+            raise MessageValueError("'{}' is not a valid data set hash".format(dataset_hash))
+        self.__dataset_hash = dataset_hash
+
+    @property
+    def is_chunk(self) -> bool:
+        """True if the message is one chunk of a data set that was split into several messages."""
+        return self.chunk_count is not None
+
+    @classmethod
+    def _check_chunk_index(cls, chunk_index: Optional[int]) -> bool:
+        return chunk_index is None or (isinstance(chunk_index, int) and chunk_index >= 0)
+
+    @classmethod
+    def _check_chunk_count(cls, chunk_count: Optional[int]) -> bool:
+        return chunk_count is None or (isinstance(chunk_count, int) and chunk_count >= 1)
+
+    @classmethod
+    def _check_dataset_hash(cls, dataset_hash: Optional[str]) -> bool:
+        return dataset_hash is None or (isinstance(dataset_hash, str) and len(dataset_hash) > 0)
+
+
+def _merge_values(chunk_values: List[Any]) -> Any:
+    """Returns the attribute value of the full message from the attribute values of the chunks.
+       Lists and quantity array blocks are concatenated in the chunk order, other values are taken from
+       the first chunk."""
+    first_value = chunk_values[0]
+    if isinstance(first_value, list):
+        return [item for value in chunk_values for item in value]
+
+    if (isinstance(first_value, dict) and
+            QuantityArrayBlock.VALUES_ATTRIBUTE in first_value and
+            QuantityArrayBlock.UNIT_OF_MEASURE_ATTRIBUTE in first_value):
+        return {
+            QuantityArrayBlock.UNIT_OF_MEASURE_ATTRIBUTE: first_value[QuantityArrayBlock.UNIT_OF_MEASURE_ATTRIBUTE],
+            QuantityArrayBlock.VALUES_ATTRIBUTE: [
+                item for value in chunk_values for item in value[QuantityArrayBlock.VALUES_ATTRIBUTE]
+            ]
+        }
+
+    return first_value
+
+
+class ChunkAssembler:
+    """Collects the chunks of chunked result messages and rebuilds the full messages.
+       The chunks can arrive in any order and duplicate chunks are ignored. Each chunk can be handled as soon as it
+       arrives, only the JSON content of the chunks is kept until the data set is complete."""
+
+    def __init__(self):
+        # (message type, source process id, dataset hash) => {chunk index => chunk json}
+        self.__chunks: Dict[Tuple[str, str, str], Dict[int, Dict[str, Any]]] = {}
+
+    @staticmethod
+    def _get_json(message: Union[ChunkedResultMessage, Dict[str, Any]]) -> Dict[str, Any]:
+        if isinstance(message, AbstractResultMessage):
+            return message.json()
+        return message
+
+    def add(self, message: Union[ChunkedResultMessage, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Adds a chunk given either as a message object or as a JSON dictionary.
+           Returns the JSON of the full message without the chunk attributes when all the chunks of the data set
+           have been received, otherwise returns None. A message that is not a chunk is returned as it is.
+           Throws MessageValueError if the chunk attributes are not consistent."""
+        message_json = self._get_json(message)
+        chunk_count = message_json.get(CHUNK_COUNT_ATTRIBUTE, None)
+        if chunk_count is None:
+            return message_json
+
+        chunk_index = message_json.get(CHUNK_INDEX_ATTRIBUTE, None)
+        dataset_hash = message_json.get(DATASET_HASH_ATTRIBUTE, None)
+        if not isinstance(chunk_index, int) or not 0 <= chunk_index < chunk_count or dataset_hash is None:
+            raise MessageValueError("Invalid chunk {} of {} for data set {}".format(
+                chunk_index, chunk_count, dataset_hash))
+
+        key = (message_json.get("Type", ""), message_json.get("SourceProcessId", ""), dataset_hash)
+        chunks = self.__chunks.setdefault(key, {})
+        if any(chunk[CHUNK_COUNT_ATTRIBUTE] != chunk_count for chunk in chunks.values()):
+            raise MessageValueError("The chunks of the data set {} have different chunk counts".format(dataset_hash))
+        if chunk_index in chunks:
+            LOGGER.debug("Ignoring duplicate chunk {} of data set {}".format(chunk_index, dataset_hash))
+        chunks.setdefault(chunk_index, message_json)
+
+        if len(chunks) < chunk_count:
+            return None
+
+        del self.__chunks[key]
+        return self.assemble([chunks[index] for index in range(chunk_count)])
+
+    @staticmethod
+    def assemble(chunk_jsons: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Returns the JSON of the full message from the JSON of all the chunks given in the chunk order."""
+        # the common result message attributes, like TriggeringMessageIds, are the same in all the chunks
+        return {
+            attribute_name: (
+                value if attribute_name in AbstractResultMessage.MESSAGE_ATTRIBUTES_FULL
+                else _merge_values([chunk_json[attribute_name] for chunk_json in chunk_jsons])
+            )
+            for attribute_name, value in chunk_jsons[0].items()
+            if attribute_name not in CHUNK_ATTRIBUTES
+        }
+
+    def get_missing_chunks(self, message_type: str, source_process_id: str, dataset_hash: str) -> List[int]:
+        """Returns the indexes of the chunks that have not yet been received for the given data set."""
+        chunks = self.__chunks.get((message_type, source_process_id, dataset_hash), {})
+        if not chunks:
+            return []
+        chunk_count = next(iter(chunks.values()))[CHUNK_COUNT_ATTRIBUTE]
+        return [index for index in range(chunk_count) if index not in chunks]
+
+    def iter_pending(self) -> Iterator[Tuple[Tuple[str, str, str], int]]:
+        """Iterates over the incomplete data sets and the number of chunks received for each."""
+        for key, chunks in self.__chunks.items():
+            yield key, len(chunks)
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+
+"""This module contains the codecs that convert the message JSON objects to the bytes sent to the message bus,
+   the registry that selects the codec by the AMQP content type, the topic or the message type and
+   the compression of the message bytes that is signalled by the AMQP content encoding."""
+
+from __future__ import annotations
+from array import array
+import json
+import struct
+import sys
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.exceptions.messages import MessageCodecError
+from tools.tools import FullLogger
+
+LOGGER = FullLogger(__name__)
+
+# the content encoding for the zlib compressed messages
+CONTENT_ENCODING_DEFLATE = "deflate"
+# the content encoding for the gzip compressed messages, only supported when receiving messages
+CONTENT_ENCODING_GZIP = "gzip"
+# the content encodings that mean the message is not compressed
+UNCOMPRESSED_CONTENT_ENCODINGS = (None, "", "identity")
+# the wbits parameter for zlib.decompress that accepts both the zlib and the gzip headers
+DECOMPRESS_WBITS = 32 + zlib.MAX_WBITS
+
+
+class MessageCodec():
+    """The base class for the message codecs. Each codec is identified by its AMQP content type."""
+    CONTENT_TYPE = ""
+
+    def encode(self, json_message: Dict[str, Any]) -> bytes:
+        """Returns the given message JSON object in bytes format."""
+        raise NotImplementedError
+
+    def decode(self, message_bytes: bytes) -> Dict[str, Any]:
+        """Returns the message JSON object from the given bytes.
+           Throws MessageCodecError if the bytes cannot be decoded."""
+        raise NotImplementedError
+
+
+class JsonCodec(MessageCodec):
+    """The JSON codec that produces the same bytes as BaseMessage.bytes(). This is the default codec."""
+    CONTENT_TYPE = "application/json"
+    MESSAGE_ENCODING = "UTF-8"
+
+    def encode(self, json_message: Dict[str, Any]) -> bytes:
+        return bytes(json.dumps(json_message), encoding=self.__class__.MESSAGE_ENCODING)
+
+    def decode(self, message_bytes: bytes) -> Dict[str, Any]:
+        try:
+            return json.loads(message_bytes.decode(self.__class__.MESSAGE_ENCODING))
+        except (UnicodeDecodeError, json.decoder.JSONDecodeError) as error:
+            raise MessageCodecError("Could not decode the message as JSON: {}".format(error)) from error
+
+
+class PackedArrayCodec(MessageCodec):
+    """A codec that sends the float arrays as packed little-endian 64-bit floats and the rest of the message
+       as JSON. The bytes contain:
+       - the 4 byte header "SPA1"
+       - the length of the JSON part as a 32-bit little-endian unsigned integer
+       - the JSON part in which each packed array is replaced by {"$PackedFloat64": [start, count]}
+       - padding to the next multiple of 8 bytes
+       - the packed floats of all the arrays
+       A list is packed if it has at least MIN_PACKED_LENGTH items and all the items are floats, so the lists
+       containing integers or booleans are kept as they are. Only the lists whose first item is a dictionary
+       or a list are searched for nested arrays."""
+    CONTENT_TYPE = "application/x-simces-packed-arrays"
+    MESSAGE_ENCODING = "UTF-8"
+
+    HEADER = b"SPA1"
+    LENGTH_FORMAT = "<I"
+    PACKED_ATTRIBUTE = "$PackedFloat64"
+    FLOAT_TYPECODE = "d"
+    FLOAT_SIZE = 8
+    MIN_PACKED_LENGTH = 8
+
+    def encode(self, json_message: Dict[str, Any]) -> bytes:
+        buffers = []
+        value_count = [0]
+
+        def pack(value: Any) -> Any:
+            if isinstance(value, dict):
+                return {key: pack(item) for key, item in value.items()}
+            if isinstance(value, list):
+                if (len(value) >= self.__class__.MIN_PACKED_LENGTH and
+                        all(type(item) is float for item in value)):
+                    try:
+                        values = array(self.__class__.FLOAT_TYPECODE, value)
+                    except (TypeError, OverflowError):
+                        return value
+                    placeholder = {self.__class__.PACKED_ATTRIBUTE: [value_count[0], len(values)]}
+                    buffers.append(values)
+                    value_count[0] += len(values)
+                    return placeholder
+                if value and isinstance(value[0], (dict, list)):
+                    return [pack(item) for item in value]
+            return value
+
+        json_bytes = bytes(json.dumps(pack(json_message)), encoding=self.__class__.MESSAGE_ENCODING)
+        header_length = len(self.__class__.HEADER) + struct.calcsize(self.__class__.LENGTH_FORMAT) + len(json_bytes)
+        parts = [
+            self.__class__.HEADER,
+            struct.pack(self.__class__.LENGTH_FORMAT, len(json_bytes)),
+            json_bytes,
+            bytes(-header_length % self.__class__.FLOAT_SIZE)
+        ]
+        for values in buffers:
+            if sys.byteorder != "little":
+                values.byteswap()
+            parts.append(values.tobytes())
+        return b"".join(parts)
+
+    def decode(self, message_bytes: bytes) -> Dict[str, Any]:
+        header = self.__class__.HEADER
+        length_size = struct.calcsize(self.__class__.LENGTH_FORMAT)
+        if message_bytes[:len(header)] != header or len(message_bytes) < len(header) + length_size:
+            raise MessageCodecError("The message does not start with the packed array header")
+
+        json_start = len(header) + length_size
+        json_length = struct.unpack_from(self.__class__.LENGTH_FORMAT, message_bytes, len(header))[0]
+        json_end = json_start + json_length
+        values_start = json_end + (-json_end % self.__class__.FLOAT_SIZE)
+        if len(message_bytes) < json_end or (len(message_bytes) - values_start) % self.__class__.FLOAT_SIZE != 0:
+            raise MessageCodecError("The packed array message has an invalid length")
+
+        try:
+            json_message = json.loads(message_bytes[json_start:json_end].decode(self.__class__.MESSAGE_ENCODING))
+        except (UnicodeDecodeError, json.decoder.JSONDecodeError) as error:
+            raise MessageCodecError("Could not decode the JSON part of the message: {}".format(error)) from error
+
+        values = array(self.__class__.FLOAT_TYPECODE)
+        values.frombytes(message_bytes[values_start:])
+        if sys.byteorder != "little":
+            values.byteswap()
+
+        def unpack(value: Any) -> Any:
+            if isinstance(value, dict):
+                packed_range = value.get(self.__class__.PACKED_ATTRIBUTE, None)
+                if packed_range is not None and len(value) == 1:
+                    if (not isinstance(packed_range, list) or len(packed_range) != 2 or
+                            not all(type(item) is int and item >= 0 for item in packed_range)):
+                        raise MessageCodecError("Invalid packed array range: {}".format(packed_range))
+                    start, count = packed_range
+                    if start + count > len(values):
+                        raise MessageCodecError("Packed array {} is outside the message".format(packed_range))
+                    return values[start:start + count].tolist()
+                return {key: unpack(item) for key, item in value.items()}
+            if isinstance(value, list) and value and isinstance(value[0], (dict, list)):
+                return [unpack(item) for item in value]
+            return value
+
+        return unpack(json_message)
+
+
+class CodecRegistry:
+    """Class for selecting the message codecs. The codec for an outgoing message is selected by the topic
+       name, then by the message type and finally the default codec is used, which is JSON unless changed.
+       The codec for an incoming message is selected by its content type and JSON is used if the content type
+       is missing or unknown, so the components that only send JSON keep working.
+    """
+    __codecs: Dict[str, MessageCodec] = {}
+    __topic_codecs: Dict[str, str] = {}
+    __message_type_codecs: Dict[str, str] = {}
+    __default_content_type = JsonCodec.CONTENT_TYPE
+
+    @classmethod
+    def register_codec(cls, codec: MessageCodec):
+        """Registers the given codec by its content type. A codec registered earlier for the same content type
+           is replaced."""
+        if codec.CONTENT_TYPE == "":
+            LOGGER.warning("Cannot register codec {:s} without a content type".format(type(codec).__name__))
+        else:
+            cls.__codecs[codec.CONTENT_TYPE] = codec
+
+    @classmethod
+    def get_content_types(cls) -> List[str]:
+        """Returns the content types of the registered codecs."""
+        return list(cls.__codecs)
+
+    @classmethod
+    def get_codec(cls, content_type: Optional[str]) -> MessageCodec:
+        """Returns the codec for the given content type or the JSON codec if the content type is None or unknown."""
+        codec = cls.__codecs.get(content_type, None) if content_type else None
+        if codec is None:
+            if content_type:
+                LOGGER.warning("Unknown content type '{:s}', using JSON".format(content_type))
+            return cls.__codecs[JsonCodec.CONTENT_TYPE]
+        return codec
+
+    @classmethod
+    def __check_content_type(cls, content_type: Optional[str]):
+        if content_type is not None and content_type not in cls.__codecs:
+            raise MessageCodecError("No codec registered for the content type '{}'".format(content_type))
+
+    @classmethod
+    def set_default_codec(cls, content_type: str):
+        """Sets the codec that is used for the messages that have no topic or message type specific codec."""
+        cls.__check_content_type(content_type)
+        cls.__default_content_type = content_type
+
+    @classmethod
+    def set_topic_codec(cls, topic_name: str, content_type: Optional[str]):
+        """Sets the codec for the messages sent to the given topic. None removes the topic specific codec."""
+        cls.__check_content_type(content_type)
+        if content_type is None:
+            cls.__topic_codecs.pop(topic_name, None)
+        else:
+            cls.__topic_codecs[topic_name] = content_type
+
+    @classmethod
+    def set_message_type_codec(cls, message_type: str, content_type: Optional[str]):
+        """Sets the codec for the messages of the given type, e.g. "Init.NIS.NetworkComponentInfo".
+           None removes the message type specific codec."""
+        cls.__check_content_type(content_type)
+        if content_type is None:
+            cls.__message_type_codecs.pop(message_type, None)
+        else:
+            cls.__message_type_codecs[message_type] = content_type
+
+    @classmethod
+    def select_codec(cls, topic_name: str, message_type: Optional[str] = None) -> MessageCodec:
+        """Returns the codec for a message of the given type that is sent to the given topic."""
+        content_type = cls.__topic_codecs.get(topic_name, None)
+        if content_type is None and message_type is not None:
+            content_type = cls.__message_type_codecs.get(message_type, None)
+        return cls.__codecs[content_type or cls.__default_content_type]
+
+    @classmethod
+    def encode(cls, topic_name: str, json_message: Dict[str, Any]) -> Tuple[bytes, str]:
+        """Returns the given message JSON object encoded with the selected codec and the content type."""
+        codec = cls.select_codec(topic_name, json_message.get("Type", None))
+        return codec.encode(json_message), codec.CONTENT_TYPE
+
+    @classmethod
+    def decode(cls, message_bytes: bytes, content_type: Optional[str]) -> Dict[str, Any]:
+        """Returns the message JSON object from the given bytes using the codec for the given content type."""
+        return cls.get_codec(content_type).decode(message_bytes)
+
+
+CodecRegistry.register_codec(JsonCodec())
+CodecRegistry.register_codec(PackedArrayCodec())
+
+
+def compress_message(message_bytes: bytes, compression_level: int) -> bytes:
+    """Returns the given message bytes compressed with zlib using the given compression level (0-9).
+       The content encoding for the compressed bytes is CONTENT_ENCODING_DEFLATE."""
+    return zlib.compress(message_bytes, compression_level)
+
+
+def decompress_message(message_bytes: bytes, content_encoding: Optional[str]) -> bytes:
+    """Returns the given message bytes decompressed according to the given content encoding.
+       Throws MessageCodecError if the content encoding is not supported or the bytes cannot be decompressed."""
+    if content_encoding in UNCOMPRESSED_CONTENT_ENCODINGS:
+        return message_bytes
+    if content_encoding not in (CONTENT_ENCODING_DEFLATE, CONTENT_ENCODING_GZIP):
+        raise MessageCodecError("Unsupported content encoding '{}'".format(content_encoding))
+    try:
+        return zlib.decompress(message_bytes, DECOMPRESS_WBITS)
+    except zlib.error as error:
+        raise MessageCodecError("Could not decompress the message: {}".format(error)) from error
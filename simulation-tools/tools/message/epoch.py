@@ -8,7 +8,7 @@
 
 from __future__ import annotations
 import datetime
-from typing import Any, Dict, Union
+from typing import Any, Dict, Union, cast
 
 from tools.datetime_tools import to_iso_format_datetime_string
 from tools.exceptions.messages import MessageDateError, MessageValueError
@@ -20,6 +20,7 @@ LOGGER = FullLogger(__name__)
 
 class EpochMessage(AbstractResultMessage):
     """Class containing all the attributes for a epoch message."""
+    __slots__ = ("__start_time", "__end_time")
     CLASS_MESSAGE_TYPE = "Epoch"
     MESSAGE_TYPE_CHECK = True
 
@@ -28,6 +29,7 @@ class EpochMessage(AbstractResultMessage):
         "EndTime": "end_time"
     }
     OPTIONAL_ATTRIBUTES = []
+    STORED_VALUE_ATTRIBUTES = list(MESSAGE_ATTRIBUTES)
 
     MESSAGE_ATTRIBUTES_FULL = {
         **AbstractResultMessage.MESSAGE_ATTRIBUTES_FULL,
@@ -95,9 +97,7 @@ class EpochMessage(AbstractResultMessage):
     def from_json(cls, json_message: Dict[str, Any]) -> Union[EpochMessage, None]:
         """Returns a class object created based on the given JSON attributes.
            If the given JSON does not contain valid values, returns None."""
-        if cls.validate_json(json_message):
-            return cls(**json_message)
-        return None
+        return cast(Union[EpochMessage, None], super().from_json(json_message))
 
 
 EpochMessage.register_to_factory()
@@ -7,7 +7,7 @@
 """This module contains the message class for a example message."""
 
 from __future__ import annotations
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Union, cast
 
 from tools.exceptions.messages import MessageValueError
 from tools.message.abstract import AbstractResultMessage
@@ -19,6 +19,10 @@ LOGGER = FullLogger(__name__)
 
 class ExampleMessage(AbstractResultMessage):
     """Example message class that for testing and demonstration purposes."""
+    __slots__ = (
+        "__positive_integer", "__power_quantity", "__current_array", "__temperature", "__eight_characters",
+        "__time_quantity", "__voltage_array", "__weight"
+    )
 
     CLASS_MESSAGE_TYPE = "Example"
     MESSAGE_TYPE_CHECK = True
@@ -64,6 +68,8 @@ class ExampleMessage(AbstractResultMessage):
         VOLTAGE_ARRAY_ATTRIBUTE,
         WEIGHT_ATTRIBUTE
     ]
+    # list the attributes whose property getter only returns the stored value (use the JSON attribute names)
+    STORED_VALUE_ATTRIBUTES = list(MESSAGE_ATTRIBUTES)
 
     # all attributes that are using the Quantity block format should be listed here
     QUANTITY_BLOCK_ATTRIBUTES = {
@@ -311,9 +317,7 @@ class ExampleMessage(AbstractResultMessage):
 
     @classmethod
     def from_json(cls, json_message: Dict[str, Any]) -> Union[ExampleMessage, None]:
-        if cls.validate_json(json_message):
-            return cls(**json_message)
-        return None
+        return cast(Union[ExampleMessage, None], super().from_json(json_message))
 
 
 ExampleMessage.register_to_factory()
@@ -56,6 +56,7 @@ class MessageFactory:
 
            If the given message type is not supported by the factory or some of the attributes
            are not valid values for the message type, an exception MessageError, ValueError or TypeError will be thrown.
+           The message object is created with decode_json, so each attribute is checked only once.
         """
         if message_type is None:
             message_type = kwargs.get("Type", None)
@@ -65,4 +66,4 @@ class MessageFactory:
         if message_type not in cls.__message_types:
             raise TypeError("Message type {:s} is not supported by the factory".format(str(message_type)))
 
-        return cls.__message_types[message_type](**kwargs)
+        return cls.__message_types[message_type].decode_json(kwargs)
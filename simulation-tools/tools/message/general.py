@@ -7,7 +7,7 @@
 """This module contains general utils for working with simulation platform message classes."""
 
 from __future__ import annotations
-from typing import Any, Dict, Union
+from typing import Any, Dict, Union, cast
 
 from tools.exceptions.messages import MessageValueError
 from tools.message.abstract import AbstractResultMessage, BaseMessage, get_json
@@ -20,6 +20,7 @@ class GeneralMessage(BaseMessage):
     """Class for a generic message containing at least all the required attributes from BaseMessage.
        Useful when making general use message listeners and
        handling message types that have not yet been implemented."""
+    __slots__ = ("__general_attributes",)
     CLASS_MESSAGE_TYPE = "General"
 
     MESSAGE_ATTRIBUTES = {}
@@ -88,13 +89,12 @@ class GeneralMessage(BaseMessage):
     def from_json(cls, json_message: Dict[str, Any]) -> Union[GeneralMessage, None]:
         """Returns a class object created based on the given JSON attributes.
            If the given JSON does not contain valid values, returns None."""
-        if cls.validate_json(json_message):
-            return cls(**json_message)
-        return None
+        return super().from_json(json_message)
 
 
 class ResultMessage(AbstractResultMessage):
     """Class for a generic result message containing at least all the required attributes for AbstractResultMessage."""
+    __slots__ = ("__result_values",)
     CLASS_MESSAGE_TYPE = "Result"
 
     MESSAGE_ATTRIBUTES = {}
@@ -157,9 +157,7 @@ class ResultMessage(AbstractResultMessage):
     def from_json(cls, json_message: Dict[str, Any]) -> Union[ResultMessage, None]:
         """Returns a class object created based on the given JSON attributes.
            If the given JSON does not contain valid values, returns None."""
-        if cls.validate_json(json_message):
-            return cls(**json_message)
-        return None
+        return cast(Union[ResultMessage, None], super().from_json(json_message))
 
 
 GeneralMessage.register_to_factory()
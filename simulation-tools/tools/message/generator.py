@@ -7,13 +7,15 @@
 """This module contains general utils for working with simulation platform message classes."""
 
 import datetime
-from typing import Iterator, List, Optional, Type, Union
+from typing import Iterable, Iterator, List, Optional, Tuple, Type, Union
 
+from tools.datetime_tools import get_utcnow_in_milliseconds
 from tools.exceptions.messages import MessageError
-from tools.message.abstract import AbstractMessage
+from tools.message.abstract import AbstractMessage, AbstractResultMessage
 from tools.message.epoch import EpochMessage
 from tools.message.simulation_state import SimulationStateMessage
 from tools.message.status import StatusMessage
+from tools.message.template import DEFAULT_HEADER_ATTRIBUTES, MessageTemplate
 from tools.message.utils import get_next_message_id
 from tools.tools import FullLogger
 
@@ -42,6 +44,8 @@ class MessageGenerator:
     """Message generator class to help with the creation of simulation message objects."""
     def __init__(self, simulation_id: str, source_process_id: str, start_message_id: int = 1):
         # TODO: add checks for the parameters
+        self._simulation_id = simulation_id
+        self._source_process_id = source_process_id
         self._message_id_generator = get_next_message_id(source_process_id, start_message_id)
         self._abstract_message_generator = abstract_message_generator(
             self._message_id_generator, simulation_id, source_process_id)
@@ -84,6 +88,61 @@ class MessageGenerator:
             **kwargs
         )
 
+    def get_trusted_message(self, message_class: Type[AbstractResultMessage], **kwargs) -> AbstractResultMessage:
+        """Returns a new message instance of type message_class using the from_trusted constructor of the class.
+           The list and quantity array block values are not checked item by item, so this should only be used
+           for data that has already been validated.
+           Throws an MessageError or ValueError exception if there is a problem with the other parameters.
+        """
+        if not issubclass(message_class, AbstractResultMessage):
+            raise MessageError("{:s} is not a subclass of {:s}".format(
+                getattr(message_class, "__name__"), AbstractResultMessage.__name__))
+
+        abstract_message = self.get_abstract_message()
+        return message_class.from_trusted(
+            Type=message_class.CLASS_MESSAGE_TYPE,
+            SimulationId=abstract_message.simulation_id,
+            SourceProcessId=abstract_message.source_process_id,
+            MessageId=abstract_message.message_id,
+            Timestamp=abstract_message.timestamp,
+            **kwargs
+        )
+
+    def get_message_template(self, message_class: Type[AbstractMessage],
+                             header_attributes: Iterable[str] = DEFAULT_HEADER_ATTRIBUTES,
+                             **kwargs) -> MessageTemplate:
+        """Returns a template for messages of type message_class with the given attribute values.
+           The messages are created from the template with the method get_template_bytes which replaces
+           the given header attributes. The template message does not use a message id from the generator.
+           Throws an MessageError or ValueError exception if there is a problem with the given parameters.
+        """
+        if not issubclass(message_class, AbstractMessage):
+            raise MessageError("{:s} is not a subclass of {:s}".format(
+                getattr(message_class, "__name__"), AbstractMessage.__name__))
+
+        template_message = message_class(
+            Type=message_class.CLASS_MESSAGE_TYPE,
+            SimulationId=self._simulation_id,
+            SourceProcessId=self._source_process_id,
+            MessageId="{:s}-template".format(self._source_process_id),
+            Timestamp=None,
+            **kwargs
+        )
+        return MessageTemplate(template_message, header_attributes)
+
+    def get_template_bytes(self, template: MessageTemplate, **header_values) -> Tuple[str, bytes]:
+        """Returns the message id and the message bytes for a new message created from the given template.
+           The new message id and the current time are used for MessageId and Timestamp and the other
+           header attributes are replaced by the given values.
+           Throws an MessageError exception if some of the given values are not valid.
+        """
+        message_id = next(self._message_id_generator)
+        return message_id, template.bytes(
+            MessageId=message_id,
+            Timestamp=get_utcnow_in_milliseconds(),
+            **header_values
+        )
+
     def get_epoch_message(self, EpochNumber: int, TriggeringMessageIds: List[str],
                           StartTime: Union[str, datetime.datetime], EndTime: Union[str, datetime.datetime],
                           LastUpdatedInEpoch: Optional[int] = None, Warnings: Optional[List[str]] = None,
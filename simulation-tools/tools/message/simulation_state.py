@@ -7,7 +7,7 @@
 """This module contains the message class for the simulation platform simulation state messages."""
 
 from __future__ import annotations
-from typing import Any, Dict, Union
+from typing import Any, Dict, Union, cast
 
 from tools.exceptions.messages import MessageStateValueError, MessageValueError
 from tools.message.abstract import AbstractMessage
@@ -18,6 +18,7 @@ LOGGER = FullLogger(__name__)
 
 class SimulationStateMessage(AbstractMessage):
     """Class containing all the attributes for a simulation state message."""
+    __slots__ = ("__simulation_state", "__name", "__description")
     CLASS_MESSAGE_TYPE = "SimState"
     MESSAGE_TYPE_CHECK = True
 
@@ -27,6 +28,7 @@ class SimulationStateMessage(AbstractMessage):
         "Description": "description"
     }
     OPTIONAL_ATTRIBUTES = ["Name", "Description"]
+    STORED_VALUE_ATTRIBUTES = list(MESSAGE_ATTRIBUTES)
 
     MESSAGE_ATTRIBUTES_FULL = {
         **AbstractMessage.MESSAGE_ATTRIBUTES_FULL,
@@ -98,9 +100,7 @@ class SimulationStateMessage(AbstractMessage):
     def from_json(cls, json_message: Dict[str, Any]) -> Union[SimulationStateMessage, None]:
         """Returns a class object created based on the given JSON attributes.
            If the given JSON does not contain valid values, returns None."""
-        if cls.validate_json(json_message):
-            return cls(**json_message)
-        return None
+        return cast(Union[SimulationStateMessage, None], super().from_json(json_message))
 
 
 SimulationStateMessage.register_to_factory()
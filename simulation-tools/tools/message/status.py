@@ -7,7 +7,7 @@
 """This module contains the message class for the simulation platform status messages."""
 
 from __future__ import annotations
-from typing import Any, Dict, Union
+from typing import Any, Dict, Union, cast
 
 from tools.exceptions.messages import MessageValueError
 from tools.message.abstract import AbstractResultMessage
@@ -18,6 +18,7 @@ LOGGER = FullLogger(__name__)
 
 class StatusMessage(AbstractResultMessage):
     """Class containing all the attributes for a status message."""
+    __slots__ = ("__value", "__description")
     CLASS_MESSAGE_TYPE = "Status"
     MESSAGE_TYPE_CHECK = True
 
@@ -26,6 +27,7 @@ class StatusMessage(AbstractResultMessage):
         "Description": "description"
     }
     OPTIONAL_ATTRIBUTES = ["Description"]  # Description SHOULD be used if status value is "error"
+    STORED_VALUE_ATTRIBUTES = list(MESSAGE_ATTRIBUTES)
 
     STATUS_VALUES = ["ready", "error"]
 
@@ -92,9 +94,7 @@ class StatusMessage(AbstractResultMessage):
     def from_json(cls, json_message: Dict[str, Any]) -> Union[StatusMessage, None]:
         """Returns a class object created based on the given JSON attributes.
            If the given JSON does not contain valid values, returns None."""
-        if cls.validate_json(json_message):
-            return cls(**json_message)
-        return None
+        return cast(Union[StatusMessage, None], super().from_json(json_message))
 
 
 StatusMessage.register_to_factory()
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+
+"""This module contains a message template class that serializes the invariant part of a message once
+   and produces the message bytes by splicing in only the header attributes that change for each message."""
+
+from __future__ import annotations
+import datetime
+import json
+import re
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Type, Union
+import uuid
+
+from tools.datetime_tools import to_iso_format_datetime_string
+from tools.exceptions.messages import MessageValueError
+from tools.message.abstract import BaseMessage
+from tools.tools import FullLogger
+
+LOGGER = FullLogger(__name__)
+
+# the attributes that are replaced for each message by default
+DEFAULT_HEADER_ATTRIBUTES = ("MessageId", "Timestamp", "EpochNumber", "TriggeringMessageIds")
+TIMESTAMP_ATTRIBUTE = "Timestamp"
+
+
+class MessageTemplate:
+    """Pre-serialized message with replaceable header attributes.
+       The bytes produced by the template are the same as the bytes from the bytes() method of a message object
+       with the same attribute values. The replaced values are checked with the checks of the message class,
+       but creating the bytes does not depend on the size of the rest of the message.
+    """
+    MESSAGE_ENCODING = BaseMessage.MESSAGE_ENCODING
+
+    def __init__(self, message: BaseMessage, header_attributes: Iterable[str] = DEFAULT_HEADER_ATTRIBUTES):
+        """Creates a template from the given message object. The given header attributes, using the JSON names,
+           are replaced for each message created with the template and they must be included in the message.
+           Throws MessageValueError if some of the header attributes are missing from the message."""
+        self.__message_class = type(message)
+        self.__header_attributes = tuple(header_attributes)
+
+        json_message = message.json()
+        missing_attributes = [name for name in self.__header_attributes if name not in json_message]
+        if missing_attributes:
+            raise MessageValueError("Header attributes missing from the template message: {}".format(
+                ", ".join(missing_attributes)))
+
+        # the header values are replaced by unique placeholder strings that cannot appear elsewhere in the message
+        marker = uuid.uuid4().hex
+        message_str = json.dumps({
+            **json_message,
+            **{name: "{}-{}".format(marker, index) for index, name in enumerate(self.__header_attributes)}
+        })
+
+        parts = []
+        header_order = []
+        position = 0
+        for match in re.finditer('"{}-(\\d+)"'.format(marker), message_str):
+            parts.append(message_str[position:match.start()])
+            header_order.append(self.__header_attributes[int(match.group(1))])
+            position = match.end()
+        parts.append(message_str[position:])
+
+        encoding = self.__class__.MESSAGE_ENCODING
+        self.__parts: List[bytes] = [bytes(part, encoding=encoding) for part in parts]
+        self.__header_order: Tuple[str, ...] = tuple(header_order)
+        self.__values: Dict[str, Any] = {name: json_message[name] for name in self.__header_attributes}
+        self.__checks: Dict[str, Callable[[Any], bool]] = {
+            name: self.__message_class.ATTRIBUTE_CHECKS[name]
+            for name in self.__header_attributes
+        }
+
+    @property
+    def message_class(self) -> Type[BaseMessage]:
+        """The class of the message the template was created from."""
+        return self.__message_class
+
+    @property
+    def header_attributes(self) -> Tuple[str, ...]:
+        """The JSON names of the attributes that can be replaced."""
+        return self.__header_attributes
+
+    @property
+    def size(self) -> int:
+        """The number of bytes in the template without the header values."""
+        return sum(len(part) for part in self.__parts)
+
+    def _check_header_value(self, attribute_name: str, value: Any) -> Any:
+        """Returns the value in the form used in the JSON message.
+           Throws MessageValueError if the value is not valid for the attribute."""
+        if attribute_name not in self.__checks:
+            raise MessageValueError("'{}' is not a header attribute in the template".format(attribute_name))
+        try:
+            is_valid = self.__checks[attribute_name](value)
+        except (TypeError, ValueError):
+            is_valid = False
+        if not is_valid:
+            raise MessageValueError("'{}' is not a valid value for {}".format(value, attribute_name))
+        if attribute_name == TIMESTAMP_ATTRIBUTE and isinstance(value, datetime.datetime):
+            return to_iso_format_datetime_string(value)
+        return value
+
+    def bytes(self, **header_values: Union[str, int, List[str], datetime.datetime]) -> bytes:
+        """Returns the message in bytes format with the given header values.
+           The header attributes that are not given keep the values from the template message.
+           Throws MessageValueError if some of the values are not valid."""
+        values = self.__values
+        if header_values:
+            values = {
+                **values,
+                **{name: self._check_header_value(name, value) for name, value in header_values.items()}
+            }
+
+        parts = self.__parts
+        encoding = self.__class__.MESSAGE_ENCODING
+        message_parts = [parts[0]]
+        for name, part in zip(self.__header_order, parts[1:]):
+            message_parts.append(bytes(json.dumps(values[name]), encoding=encoding))
+            message_parts.append(part)
+        return b"".join(message_parts)
+
+    def json(self, **header_values: Union[str, int, List[str], datetime.datetime]) -> Dict[str, Any]:
+        """Returns the message as a JSON object with the given header values."""
+        return json.loads(self.bytes(**header_values).decode(self.__class__.MESSAGE_ENCODING))
@@ -15,3 +15,13 @@ def get_next_message_id(source_process_id: str, start_number: int = 1) -> Iterat
     while True:
         yield "{:s}-{:d}".format(source_process_id, message_number)
         message_number += 1
+
+
+def get_storage_name(object_class: type, property_name: str) -> str:
+    """Returns the name of the private attribute that holds the value of the given property.
+       The properties store their values in double underscore attributes, so the name includes the name of
+       the class that defines the property, e.g. "_EpochMessage__start_time" for the property start_time."""
+    for base_class in object_class.__mro__:
+        if property_name in vars(base_class):
+            return "_{:s}__{:s}".format(base_class.__name__, property_name)
+    return "_{:s}__{:s}".format(object_class.__name__, property_name)
@@ -13,6 +13,9 @@ from tools.message.abstract import AbstractResultMessage, get_json   # pylint: d
 from tools.message.block import QuantityBlock                        # pylint: disable=unused-import
 from tools.message.block import ValueArrayBlock, QuantityArrayBlock  # pylint: disable=unused-import
 from tools.message.block import TimeSeriesBlock                      # pylint: disable=unused-import
+from tools.message.block import ArrayTimeSeriesBlock                 # pylint: disable=unused-import
+from tools.message.chunk import ChunkedResultMessage                 # pylint: disable=unused-import
+from tools.message.chunk import ChunkAssembler                       # pylint: disable=unused-import
 from tools.message.epoch import EpochMessage                         # pylint: disable=unused-import
 from tools.message.factory import MessageFactory                     # pylint: disable=unused-import
 from tools.message.general import GeneralMessage, ResultMessage      # pylint: disable=unused-import
@@ -8,7 +8,7 @@
 
 import asyncio
 import json
-from typing import Union
+from typing import List, Optional, Union, cast
 
 from aiormq.types import DeliveredMessage
 from aiounittest.case import AsyncTestCase
@@ -16,7 +16,7 @@ from aio_pika.message import IncomingMessage
 import pamqp
 import pamqp.specification
 
-from tools.callbacks import MessageCallback
+from tools.callbacks import MessageCallback, MessageDispatcher
 from tools.messages import (
     BaseMessage, EpochMessage, GeneralMessage, ResultMessage, SimulationStateMessage, StatusMessage)
 from tools.tests.messages_abstract import ALTERNATE_JSON, DEFAULT_TIMESTAMP, FULL_JSON, MESSAGE_TYPE_ATTRIBUTE
@@ -52,6 +52,50 @@ class DummyHandler:
 HANDLER = DummyHandler()
 
 
+class DummyChannel:
+    """Stand-in for the RabbitMQ channel of the incoming messages."""
+    def __init__(self):
+        self.is_closed = False
+
+
+class DummyProcessedMessage:
+    """Incoming message that records when it is acknowledged or rejected instead of using a RabbitMQ channel."""
+    def __init__(self, incoming_message: IncomingMessage, acknowledged: List[str],
+                 channel: Optional[DummyChannel] = None):
+        self.__incoming_message = incoming_message
+        self.__acknowledged = acknowledged
+        self.channel = channel if channel is not None else DummyChannel()
+        self.processed = False
+        self.rejected = False
+
+    def __getattr__(self, attribute_name: str):
+        return getattr(self.__incoming_message, attribute_name)
+
+    async def ack(self):
+        """Records the routing key of the acknowledged message."""
+        self.processed = True
+        self.__acknowledged.append(self.__incoming_message.routing_key)
+
+    async def reject(self, requeue: bool = False):
+        """Records that the message was rejected."""
+        # pylint: disable=unused-argument
+        self.processed = True
+        self.rejected = True
+
+
+class BlockingHandler:
+    """Message handler that waits until it is released."""
+    def __init__(self):
+        self.handled_topics = []
+        self.release_event = asyncio.Event()
+
+    async def message_handler(self, message_object, message_topic):
+        """Waits for the release event and stores the topic."""
+        # pylint: disable=unused-argument
+        await self.release_event.wait()
+        self.handled_topics.append(message_topic)
+
+
 class TestMessageCallback(AsyncTestCase):
     """Unit tests for the MessageCallback class."""
     GENERAL_MESSAGE = GeneralMessage(Timestamp=DEFAULT_TIMESTAMP, **FULL_JSON)
@@ -224,3 +268,99 @@ class TestMessageCallback(AsyncTestCase):
         await callback_object.callback(
             get_incoming_message(bytes(FAIL_TEST_STR, encoding="UTF-8"), TestMessageCallback.TEST_TOPIC1))
         await self.helper_equality_tester(callback_object, FAIL_TEST_STR, TestMessageCallback.TEST_TOPIC1)
+
+
+class TestMessageDispatcher(AsyncTestCase):
+    """Unit tests for the MessageDispatcher class."""
+    MESSAGE = GeneralMessage(Timestamp=DEFAULT_TIMESTAMP, **FULL_JSON)
+
+    async def test_in_flight_limit(self):
+        """Unit test for limiting the number of messages handled at the same time."""
+        handler = BlockingHandler()
+        acknowledged = []
+        dispatcher = MessageDispatcher(MessageCallback(handler.message_handler), max_in_flight=2)
+        messages = [
+            cast(IncomingMessage, DummyProcessedMessage(
+                get_incoming_message(self.MESSAGE.bytes(), "topic{}".format(index)), acknowledged))
+            for index in range(3)
+        ]
+
+        await dispatcher.dispatch(messages[0])
+        await dispatcher.dispatch(messages[1])
+        # the third message has to wait until one of the first two messages has been handled
+        third_dispatch = asyncio.create_task(dispatcher.dispatch(messages[2]))
+        await asyncio.sleep(0.1)
+        self.assertFalse(third_dispatch.done())
+        self.assertEqual(dispatcher.in_flight, 2)
+        self.assertEqual(dispatcher.metrics["waiting"], 1)
+        # no message is acknowledged before the handler has finished
+        self.assertEqual(acknowledged, [])
+
+        handler.release_event.set()
+        await third_dispatch
+        await dispatcher.wait_until_idle()
+
+        self.assertEqual(handler.handled_topics, ["topic0", "topic1", "topic2"])
+        self.assertEqual(sorted(acknowledged), ["topic0", "topic1", "topic2"])
+        metrics = dispatcher.metrics
+        self.assertEqual(metrics["received"], 3)
+        self.assertEqual(metrics["processed"], 3)
+        self.assertEqual(metrics["failed"], 0)
+        self.assertEqual(metrics["in_flight"], 0)
+        self.assertEqual(metrics["peak_in_flight"], 2)
+        self.assertEqual(metrics["waiting"], 0)
+        self.assertGreater(metrics["wait_time"], 0.0)
+
+    async def test_failed_message(self):
+        """Unit test for a message whose handling ends with an exception."""
+        async def failing_handler(message_object, message_topic):
+            # pylint: disable=unused-argument
+            raise ValueError("handler error")
+
+        acknowledged = []
+        dispatcher = MessageDispatcher(MessageCallback(failing_handler), max_in_flight=2)
+        message = DummyProcessedMessage(get_incoming_message(self.MESSAGE.bytes(), "topic"), acknowledged)
+        await dispatcher.dispatch(cast(IncomingMessage, message))
+        self.assertTrue(await dispatcher.wait_until_idle())
+
+        # the message is rejected and the error is not raised from the handler task
+        self.assertTrue(message.rejected)
+        self.assertEqual(acknowledged, [])
+        self.assertEqual(dispatcher.metrics["failed"], 1)
+        self.assertEqual(dispatcher.metrics["processed"], 0)
+
+    async def test_closed_channel(self):
+        """Unit test for the messages that are handled after their channel has been closed."""
+        handler = BlockingHandler()
+        acknowledged = []
+        channel = DummyChannel()
+        dispatcher = MessageDispatcher(MessageCallback(handler.message_handler))
+        message = DummyProcessedMessage(get_incoming_message(self.MESSAGE.bytes(), "topic"), acknowledged, channel)
+        await dispatcher.dispatch(cast(IncomingMessage, message))
+
+        channel.is_closed = True
+        handler.release_event.set()
+        self.assertTrue(await dispatcher.wait_until_idle())
+        self.assertEqual(handler.handled_topics, ["topic"])
+        self.assertFalse(message.processed)
+        self.assertEqual(acknowledged, [])
+
+    async def test_wait_timeout_and_cancel(self):
+        """Unit test for waiting for the messages with a timeout and cancelling the remaining messages."""
+        handler = BlockingHandler()
+        acknowledged = []
+        dispatcher = MessageDispatcher(MessageCallback(handler.message_handler), max_in_flight=2)
+        for index in range(2):
+            await dispatcher.dispatch(cast(IncomingMessage, DummyProcessedMessage(
+                get_incoming_message(self.MESSAGE.bytes(), "topic{}".format(index)), acknowledged)))
+
+        self.assertFalse(await dispatcher.wait_until_idle(0.1))
+        self.assertEqual(dispatcher.in_flight, 2)
+
+        # the cancelled messages are not acknowledged and their slots are freed
+        await dispatcher.cancel_all()
+        self.assertEqual(dispatcher.in_flight, 0)
+        self.assertEqual(acknowledged, [])
+        self.assertEqual(handler.handled_topics, [])
+        self.assertTrue(await dispatcher.wait_until_idle(0.1))
+
@@ -7,12 +7,16 @@
 """Unit tests for the RabbitmqClient class."""
 
 import asyncio
-from typing import Iterator, Union
+from typing import Iterator, List, Tuple, Union, cast
+from unittest.mock import AsyncMock, patch
 
+import aio_pika
 from aiounittest.case import AsyncTestCase
 
-from tools.clients import RabbitmqClient
+from tools.clients import (
+    LISTENER_CLOSE_TIMEOUT, RabbitmqChannelPool, RabbitmqClient, RabbitmqConnection, RabbitmqPublisher)
 from tools.messages import BaseMessage, EpochMessage, GeneralMessage, StatusMessage, get_next_message_id
+from tools.tests.callbacks import DummyChannel, DummyProcessedMessage, get_incoming_message
 from tools.tests.messages_common import EPOCH_TEST_JSON, ERROR_TEST_JSON, GENERAL_TEST_JSON, STATUS_TEST_JSON
 
 
@@ -41,6 +45,81 @@ class MessageStorage:
         self.messages.append((message_object, message_topic))
 
 
+class DummyQueue:
+    """Stand-in for a RabbitMQ queue that delivers the given messages and then waits for more."""
+    def __init__(self, messages: List[DummyProcessedMessage]):
+        self.messages = messages
+
+    async def bind(self, exchange, routing_key: str):
+        """Does nothing since there is no message bus."""
+        # pylint: disable=unused-argument
+
+    def iterator(self):
+        """Returns the queue itself as the message iterator."""
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def __aiter__(self):
+        for message in self.messages:
+            yield message
+        await asyncio.Event().wait()
+
+
+class DummyListenerChannel:
+    """Stand-in for the RabbitMQ channel of a listener that records when it is closed."""
+    def __init__(self, queue: DummyQueue):
+        self.queue = queue
+        self.is_closed = False
+
+    async def set_qos(self, prefetch_count: int):
+        """Does nothing since there is no message bus."""
+        # pylint: disable=unused-argument
+
+    async def declare_queue(self, **kwargs):
+        """Returns the dummy queue."""
+        # pylint: disable=unused-argument
+        return self.queue
+
+    async def close(self):
+        """Marks the channel as closed."""
+        self.is_closed = True
+
+
+class DummyExchange:
+    """Stand-in for a RabbitMQ exchange that records the published messages with the index of its channel."""
+    def __init__(self, channel_index: int, published: List[Tuple[int, str]]):
+        self.channel_index = channel_index
+        self.published = published
+
+    async def publish(self, message: aio_pika.Message, routing_key: str):
+        """Records the channel index and the message body."""
+        # pylint: disable=unused-argument
+        self.published.append((self.channel_index, message.body.decode()))
+
+
+class DummyPublishConnection:
+    """Stand-in for RabbitmqConnection that opens a new numbered channel for each request."""
+    def __init__(self):
+        self.published: List[Tuple[int, str]] = []
+        self.opened_channels = 0
+
+    async def open_channel(self, publisher_confirms: bool = True):
+        """Returns a new channel that is open."""
+        # pylint: disable=unused-argument
+        self.opened_channels += 1
+        return DummyChannel()
+
+    async def declare_exchange(self, channel):
+        """Returns an exchange for the latest opened channel."""
+        # pylint: disable=unused-argument
+        return DummyExchange(self.opened_channels - 1, self.published)
+
+
 class TestRabbitmqClient(AsyncTestCase):
     """Unit tests for sending and receiving messages using RabbitmqClient object."""
     async def test_message_sending_and_receiving(self):
@@ -129,3 +208,78 @@ class TestRabbitmqClient(AsyncTestCase):
     async def test_connection_failures(self):
         """Unit tests for failed connections to the message bus."""
         # TODO: implement test_connection_failures
+
+
+class TestRabbitmqClientClosing(AsyncTestCase):
+    """Unit tests for closing RabbitmqClient without a RabbitMQ message bus."""
+    async def test_close_from_message_handler(self):
+        """Tests that a message handler can close the client without waiting for itself
+           and that the channel of the listener is closed."""
+        acknowledged: List[str] = []
+        status_message = StatusMessage(**STATUS_TEST_JSON)
+        channel = DummyListenerChannel(DummyQueue([]))
+        channel.queue.messages.append(DummyProcessedMessage(
+            get_incoming_message(status_message.bytes(), "SimState"), acknowledged, channel))  # type: ignore
+
+        with patch.object(RabbitmqConnection, "open_channel", AsyncMock(return_value=channel)), \
+                patch.object(RabbitmqConnection, "declare_exchange", AsyncMock(return_value=AsyncMock())):
+            client = RabbitmqClient()
+            closing_times: List[float] = []
+            loop = asyncio.get_running_loop()
+
+            async def closing_handler(message_object: Union[BaseMessage, dict, str], message_topic: str):
+                # pylint: disable=unused-argument
+                start_time = loop.time()
+                await client.close()
+                closing_times.append(loop.time() - start_time)
+
+            client.add_listener("SimState", closing_handler)
+            await asyncio.wait_for(self.wait_for_closing(closing_times), LISTENER_CLOSE_TIMEOUT)
+
+        self.assertTrue(client.is_closed)
+        self.assertTrue(channel.is_closed)
+        self.assertLess(closing_times[0], 1.0)
+        # the channel was closed before the handler finished, so the message is not acknowledged
+        self.assertEqual(acknowledged, [])
+
+    @staticmethod
+    async def wait_for_closing(closing_times: List[float]):
+        """Waits until the message handler has closed the client."""
+        while not closing_times:
+            await asyncio.sleep(0.01)
+
+
+class TestRabbitmqPublisher(AsyncTestCase):
+    """Unit tests for the channel use of RabbitmqPublisher without a RabbitMQ message bus."""
+    MESSAGE_COUNT = 6
+    BATCH_SIZE = 2
+
+    async def publish_messages(self, pool_size: int) -> List[Tuple[int, str]]:
+        """Publishes the test messages in several batches and returns the channel indexes and the message bodies."""
+        connection = DummyPublishConnection()
+        publisher = RabbitmqPublisher(
+            RabbitmqChannelPool(cast(RabbitmqConnection, connection), pool_size),
+            TestRabbitmqPublisher.BATCH_SIZE)
+        await publisher.publish([
+            ("test", aio_pika.Message(str(index).encode()))
+            for index in range(TestRabbitmqPublisher.MESSAGE_COUNT)
+        ])
+        await publisher.close()
+
+        self.assertEqual(publisher.metrics["published"], TestRabbitmqPublisher.MESSAGE_COUNT)
+        self.assertEqual(publisher.metrics["batches"],
+                         TestRabbitmqPublisher.MESSAGE_COUNT // TestRabbitmqPublisher.BATCH_SIZE)
+        return connection.published
+
+    async def test_one_channel(self):
+        """Tests that with one channel all the batches are published in order using the same channel."""
+        published = await self.publish_messages(1)
+        self.assertEqual(published, [(0, str(index)) for index in range(TestRabbitmqPublisher.MESSAGE_COUNT)])
+
+    async def test_several_channels(self):
+        """Tests that with several channels the consecutive batches are published using different channels.
+           The message bus keeps the order only within a channel, so the order of these batches is not guaranteed."""
+        published = await self.publish_messages(2)
+        self.assertEqual(
+            [channel_index for channel_index, _ in published],
+            [0, 0, 1, 1, 0, 0])
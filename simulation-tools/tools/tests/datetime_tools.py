@@ -9,7 +9,9 @@
 from datetime import datetime, timedelta, timezone
 import unittest
 
-from tools.datetime_tools import get_utcnow_in_milliseconds, to_iso_format_datetime_string, to_utc_datetime_object
+from tools.datetime_tools import (
+    from_epoch_milliseconds, get_utcnow_in_milliseconds, to_epoch_milliseconds, to_iso_format_datetime_string,
+    to_iso_format_datetime_strings, to_utc_datetime_object, to_utc_datetime_objects)
 
 
 class TestDatetimeTools(unittest.TestCase):
@@ -65,6 +67,50 @@ class TestDatetimeTools(unittest.TestCase):
         self.assertRaises(ValueError, to_utc_datetime_object, input_string_invalid1)
         self.assertRaises(ValueError, to_utc_datetime_object, input_string_invalid2)
 
+    def test_canonical_format(self):
+        """Unit test for the strings that are already in the format used in the messages."""
+        for valid_string in ("2020-05-25T15:24:59.987Z", "2020-02-29T00:00:00.000Z", "0999-12-31T23:59:59.999Z"):
+            with self.subTest(value=valid_string):
+                self.assertEqual(to_iso_format_datetime_string(valid_string), valid_string)
+                # the result is the same when the string is converted through a datetime object
+                self.assertEqual(to_iso_format_datetime_string(to_utc_datetime_object(valid_string)), valid_string)
+
+        for invalid_string in ("2021-02-29T00:00:00.000Z", "2020-13-01T00:00:00.000Z", "2020-05-25T15:24:5a.987Z"):
+            with self.subTest(value=invalid_string):
+                self.assertRaises(ValueError, to_iso_format_datetime_string, invalid_string)
+                # the results for the invalid values are not cached
+                self.assertRaises(ValueError, to_iso_format_datetime_string, invalid_string)
+
+        self.assertEqual(to_iso_format_datetime_string("2020-05-25T18:24:59.987+03:00"), "2020-05-25T15:24:59.987Z")
+        self.assertEqual(to_iso_format_datetime_string("2020-05-25T15:24:59Z"), "2020-05-25T15:24:59.000Z")
+
+    def test_batch_conversions(self):
+        """Unit test for the functions that convert lists of date times."""
+        datetime_strings = ["2020-05-25T15:24:59.987Z", "2020-05-25T18:24:59.987654+03:00"]
+        datetime_objects = [
+            datetime(2020, 5, 25, 15, 24, 59, 987000, tzinfo=timezone.utc),
+            datetime(2020, 5, 25, 15, 24, 59, 987654, tzinfo=timezone.utc)
+        ]
+        self.assertEqual(to_iso_format_datetime_strings(datetime_strings), [datetime_strings[0]] * 2)
+        self.assertEqual(to_iso_format_datetime_strings(datetime_objects), [datetime_strings[0]] * 2)
+        self.assertEqual(to_iso_format_datetime_strings([]), [])
+        self.assertIsNone(to_iso_format_datetime_strings(datetime_strings + ["not a time"]))
+        self.assertIsNone(to_iso_format_datetime_strings(datetime_strings + [12]))  # type: ignore
+
+        self.assertEqual(to_utc_datetime_objects(datetime_strings), datetime_objects)
+        self.assertRaises(ValueError, to_utc_datetime_objects, datetime_strings + ["not a time"])
+
+    def test_epoch_milliseconds(self):
+        """Unit test for the conversions to and from epoch milliseconds."""
+        self.assertEqual(to_epoch_milliseconds("1970-01-01T00:00:01.500Z"), 1500)
+        self.assertEqual(to_epoch_milliseconds(datetime(1970, 1, 1, 2, tzinfo=timezone(timedelta(hours=2)))), 0)
+        self.assertEqual(from_epoch_milliseconds(-1), "1969-12-31T23:59:59.999Z")
+        self.assertEqual(
+            from_epoch_milliseconds(to_epoch_milliseconds("2020-05-25T18:24:59.987654+03:00")),
+            "2020-05-25T15:24:59.987Z")
+        self.assertRaises(ValueError, to_epoch_milliseconds, "not a time")
+        self.assertRaises(ValueError, to_epoch_milliseconds, 1500)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+
+"""Unit tests for the value array blocks that use float buffers as the values and for ArrayTimeSeriesBlock."""
+
+from array import array
+import datetime
+import json
+import unittest
+
+from tools.exceptions.messages import MessageDateError, MessageValueError
+from tools.message.block import (
+    ArrayTimeSeriesBlock, QuantityArrayBlock, TimeSeriesBlock, ValueArrayBlock, get_float_buffer)
+from tools.message.example import ExampleMessage
+from tools.tests.message.example import EXAMPLE_MESSAGE
+
+FLOAT_VALUES = [1.5, 2.25, -3.0, 4.125]
+TIME_INDEX = [
+    "2020-10-01T00:00:00.000Z",
+    "2020-10-01T01:00:00.000Z",
+    "2020-10-01T02:30:00.500Z",
+    "2020-10-01T03:00:00.000Z"
+]
+TIMESERIES_BLOCK = {
+    "TimeIndex": TIME_INDEX,
+    "Series": {
+        "Price": {"UnitOfMeasure": "EUR", "Values": FLOAT_VALUES},
+        "Status": {"UnitOfMeasure": "", "Values": ["a", "b", "c", "d"]}
+    }
+}
+
+
+class ArrayExampleMessage(ExampleMessage):
+    """Example message that uses ArrayTimeSeriesBlock for the time series."""
+    __slots__ = ()
+    TIMESERIES_BLOCK_CLASS = ArrayTimeSeriesBlock
+
+
+class TestFloatBufferBlocks(unittest.TestCase):
+    """Unit tests for the value array blocks with float buffer values."""
+
+    def test_float_buffer(self):
+        """Unit test for recognizing the float buffers."""
+        self.assertIsNotNone(get_float_buffer(array("d", FLOAT_VALUES)))
+        self.assertIsNotNone(get_float_buffer(memoryview(array("d", FLOAT_VALUES))))
+        for not_buffer in (FLOAT_VALUES, array("f", FLOAT_VALUES), array("q", [1, 2]), b"12345678", "text", 1.5):
+            with self.subTest(value=not_buffer):
+                self.assertIsNone(get_float_buffer(not_buffer))
+
+    def test_array_values(self):
+        """Unit test for creating a block from a float array without copying it."""
+        float_array = array("d", FLOAT_VALUES)
+        block = QuantityArrayBlock(Values=float_array, UnitOfMeasure="A")
+        self.assertIs(block.value_array, float_array)
+        self.assertEqual(block.json(), {"UnitOfMeasure": "A", "Values": FLOAT_VALUES})
+        self.assertEqual(json.loads(str(block)), block.json())
+
+        # the list is created when the values are first used and then kept
+        self.assertEqual(block.values, FLOAT_VALUES)
+        self.assertIs(block.values, block.values)
+        self.assertEqual(block, QuantityArrayBlock(Values=FLOAT_VALUES, UnitOfMeasure="A"))
+
+        list_block = ValueArrayBlock(Values=FLOAT_VALUES, UnitOfMeasure="A")
+        self.assertEqual(list_block.value_array, float_array)
+        with self.assertRaises(TypeError):
+            _ = ValueArrayBlock(Values=["a", "b"], UnitOfMeasure="A").value_array
+
+        trusted_block = QuantityArrayBlock.from_trusted(float_array, "A")
+        self.assertIs(trusted_block.value_array, float_array)
+        self.assertEqual(trusted_block, block)
+
+        for invalid_values in (array("q", [1, 2]), (1.0, 2.0), "12.3"):
+            with self.subTest(values=invalid_values):
+                with self.assertRaises(MessageValueError):
+                    QuantityArrayBlock(Values=invalid_values, UnitOfMeasure="A")  # type: ignore
+
+    def test_message_array_values(self):
+        """Unit test for using float arrays as quantity array block values in messages."""
+        float_array = array("d", EXAMPLE_MESSAGE["CurrentArray"]["Values"])
+        message = ExampleMessage(**{**EXAMPLE_MESSAGE, "CurrentArray": float_array})
+        self.assertIs(message.current_array.value_array, float_array)
+        self.assertEqual(message.current_array.unit_of_measure, "mA")
+        self.assertEqual(message.json()["CurrentArray"], EXAMPLE_MESSAGE["CurrentArray"])
+
+        message_json = {**EXAMPLE_MESSAGE, "CurrentArray": {"UnitOfMeasure": "mA", "Values": float_array}}
+        self.assertEqual(ExampleMessage(**message_json), ExampleMessage(**EXAMPLE_MESSAGE))
+        trusted_message = ExampleMessage.from_trusted(**message_json)
+        self.assertIs(trusted_message.current_array.value_array, float_array)
+
+        # the voltage array check still applies to the array values
+        with self.assertRaises(MessageValueError):
+            ExampleMessage(**{**EXAMPLE_MESSAGE, "VoltageArray": array("d", [1000.0])})
+
+
+
+class TestArrayTimeSeriesBlock(unittest.TestCase):
+    """Unit tests for the ArrayTimeSeriesBlock class."""
+
+    def test_array_time_series(self):
+        """Unit test for creating array time series blocks."""
+        block = ArrayTimeSeriesBlock(**TIMESERIES_BLOCK)
+        self.assertEqual(block.json(), TIMESERIES_BLOCK)
+        self.assertEqual(block.time_index, TIME_INDEX)
+        self.assertEqual(block.time_index_milliseconds.typecode, "q")
+        self.assertEqual(block.time_index_milliseconds[1] - block.time_index_milliseconds[0], 3600 * 1000)
+
+        # the float series are stored as float arrays and the other series as lists
+        self.assertEqual(block.series["Price"].value_array.typecode, "d")
+        self.assertEqual(block.series["Price"].values, FLOAT_VALUES)
+        self.assertEqual(block.series["Status"].values, ["a", "b", "c", "d"])
+
+        # the blocks are equal to the corresponding TimeSeriesBlock in both directions
+        list_block = TimeSeriesBlock(**TIMESERIES_BLOCK)
+        self.assertEqual(block, list_block)
+        self.assertEqual(list_block, block)
+        self.assertEqual(block, ArrayTimeSeriesBlock.from_json(json.loads(str(block))))
+        self.assertNotEqual(block, ArrayTimeSeriesBlock(**{**TIMESERIES_BLOCK, "TimeIndex": TIME_INDEX[::-1]}))
+
+        # datetime objects and epoch millisecond arrays can be used for the time index
+        datetime_block = ArrayTimeSeriesBlock(
+            TimeIndex=[datetime.datetime(2020, 10, 1, hour, tzinfo=datetime.timezone.utc) for hour in range(2)],
+            Series={"Price": ValueArrayBlock(Values=FLOAT_VALUES[:2], UnitOfMeasure="EUR")})
+        self.assertEqual(datetime_block.time_index, TIME_INDEX[:2])
+        datetime_block.time_index = array("q", block.time_index_milliseconds[2:])
+        self.assertEqual(datetime_block.time_index, TIME_INDEX[2:])
+
+    def test_invalid_array_time_series(self):
+        """Unit test for the checks in the array time series blocks."""
+        self.assertIsNone(ArrayTimeSeriesBlock.from_json({**TIMESERIES_BLOCK, "TimeIndex": TIME_INDEX[:3]}))
+        block = ArrayTimeSeriesBlock(**TIMESERIES_BLOCK)
+        for invalid_time_index in (TIME_INDEX[:3], TIME_INDEX[:3] + ["not a time"], tuple(TIME_INDEX),
+                                   array("d", [0.0, 1.0, 2.0, 3.0])):
+            with self.subTest(time_index=invalid_time_index):
+                with self.assertRaises(MessageDateError):
+                    setattr(block, "time_index", invalid_time_index)
+        self.assertEqual(block.time_index, TIME_INDEX)
+
+        with self.assertRaises(MessageValueError):
+            block.series = {"Price": {"UnitOfMeasure": "EUR", "Values": FLOAT_VALUES[:2]}}
+        with self.assertRaises(MessageValueError):
+            block.add_series("Short", ValueArrayBlock(Values=array("d", FLOAT_VALUES[:2]), UnitOfMeasure="EUR"))
+
+    def test_message_array_time_series(self):
+        """Unit test for messages that use ArrayTimeSeriesBlock for the time series."""
+        message = ArrayExampleMessage.decode_json(EXAMPLE_MESSAGE)
+        self.assertIsInstance(message.temperature, ArrayTimeSeriesBlock)
+        self.assertEqual(
+            message.json(), ExampleMessage(**{**EXAMPLE_MESSAGE, "Timestamp": message.timestamp}).json())
+        self.assertIsInstance(ArrayExampleMessage(**EXAMPLE_MESSAGE).temperature, ArrayTimeSeriesBlock)
+        self.assertIsInstance(ExampleMessage.decode_json(EXAMPLE_MESSAGE).temperature, TimeSeriesBlock)
+        self.assertNotIsInstance(ExampleMessage.decode_json(EXAMPLE_MESSAGE).temperature, ArrayTimeSeriesBlock)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+
+"""Unit tests for the ChunkedResultMessage and ChunkAssembler classes."""
+
+import unittest
+from typing import Any, Dict, cast
+
+from tools.exceptions.messages import MessageValueError
+from tools.message.chunk import ChunkAssembler, ChunkedResultMessage, get_chunk_ranges
+
+CHUNK_BASE = {
+    "Type": "Chunked",
+    "SimulationId": "2023-01-01T00:00:00.000Z",
+    "SourceProcessId": "chunk-test",
+    "MessageId": "chunk-test-1",
+    "Timestamp": "2023-01-01T00:00:00.000Z",
+    "EpochNumber": 1,
+    "TriggeringMessageIds": ["manager-1"]
+}
+
+FULL_DATA = {
+    "Names": ["a", "b", "c", "d", "e"],
+    "Currents": {
+        "UnitOfMeasure": "A",
+        "Values": [1.0, 2.0, 3.0, 4.0, 5.0]
+    },
+    "Scale": 10.0
+}
+
+
+def get_chunk_jsons(chunk_size: int, dataset_hash: str = "abc"):
+    """Returns the JSON of the chunks of FULL_DATA."""
+    row_ranges = get_chunk_ranges(len(FULL_DATA["Names"]), chunk_size)
+    return [
+        {
+            **CHUNK_BASE,
+            "MessageId": "chunk-test-{}".format(index + 1),
+            "Names": FULL_DATA["Names"][rows.start:rows.stop],
+            "Currents": {
+                "UnitOfMeasure": "A",
+                "Values": FULL_DATA["Currents"]["Values"][rows.start:rows.stop]
+            },
+            "Scale": FULL_DATA["Scale"],
+            "ChunkIndex": index,
+            "ChunkCount": len(row_ranges),
+            "DatasetHash": dataset_hash
+        }
+        for index, rows in enumerate(row_ranges)
+    ]
+
+
+class TestChunkedResultMessage(unittest.TestCase):
+    """Unit tests for the chunk attributes and the chunk ranges."""
+
+    def test_chunk_ranges(self):
+        """Unit test for splitting rows into chunks."""
+        self.assertEqual(get_chunk_ranges(5, 2), [range(0, 2), range(2, 4), range(4, 5)])
+        self.assertEqual(get_chunk_ranges(4, 2), [range(0, 2), range(2, 4)])
+        self.assertEqual(get_chunk_ranges(5, 0), [range(0, 5)])
+        self.assertEqual(get_chunk_ranges(5, 10), [range(0, 5)])
+        self.assertEqual(get_chunk_ranges(0, 10), [range(0, 0)])
+
+    def test_chunk_attributes(self):
+        """Unit test for the chunk attributes."""
+        message = ChunkedResultMessage(**CHUNK_BASE, ChunkIndex=1, ChunkCount=3, DatasetHash="abc")
+        self.assertEqual(message.chunk_index, 1)
+        self.assertEqual(message.chunk_count, 3)
+        self.assertEqual(message.dataset_hash, "abc")
+        self.assertTrue(message.is_chunk)
+        self.assertEqual(message.json()["ChunkCount"], 3)
+        self.assertEqual(ChunkedResultMessage.from_json(message.json()), message)
+
+        unchunked_message = ChunkedResultMessage(**CHUNK_BASE)
+        self.assertFalse(unchunked_message.is_chunk)
+        self.assertNotIn("ChunkIndex", unchunked_message.json())
+
+        for invalid_attributes in ({"ChunkIndex": -1}, {"ChunkCount": 0}, {"DatasetHash": ""}):
+            with self.assertRaises(MessageValueError):
+                ChunkedResultMessage(**CHUNK_BASE, **invalid_attributes)
+
+
+class TestChunkAssembler(unittest.TestCase):
+    """Unit tests for reassembling chunked messages."""
+
+    def test_assemble_in_order(self):
+        """Unit test for reassembling chunks that arrive in order."""
+        assembler = ChunkAssembler()
+        chunk_jsons = get_chunk_jsons(2)
+        self.assertEqual(len(chunk_jsons), 3)
+        self.assertIsNone(assembler.add(chunk_jsons[0]))
+        self.assertIsNone(assembler.add(chunk_jsons[1]))
+        self.assertEqual(assembler.get_missing_chunks("Chunked", "chunk-test", "abc"), [2])
+
+        full_json = cast(Dict[str, Any], assembler.add(chunk_jsons[2]))
+        self.assertIsNotNone(full_json)
+        for attribute_name, value in FULL_DATA.items():
+            self.assertEqual(full_json[attribute_name], value)
+        for attribute_name in ("ChunkIndex", "ChunkCount", "DatasetHash"):
+            self.assertNotIn(attribute_name, full_json)
+        # the scalar attributes are taken from the first chunk
+        self.assertEqual(full_json["MessageId"], "chunk-test-1")
+        self.assertEqual(list(assembler.iter_pending()), [])
+
+    def test_assemble_out_of_order_with_duplicates(self):
+        """Unit test for reassembling chunks that arrive in a different order and more than once."""
+        assembler = ChunkAssembler()
+        chunk_jsons = get_chunk_jsons(1)
+        other_jsons = get_chunk_jsons(2, "other")
+        self.assertIsNone(assembler.add(chunk_jsons[4]))
+        self.assertIsNone(assembler.add(other_jsons[1]))
+        self.assertIsNone(assembler.add(chunk_jsons[2]))
+        self.assertIsNone(assembler.add(chunk_jsons[4]))
+        self.assertIsNone(assembler.add(chunk_jsons[0]))
+        self.assertIsNone(assembler.add(chunk_jsons[3]))
+        self.assertEqual(len(list(assembler.iter_pending())), 2)
+
+        full_json = cast(Dict[str, Any], assembler.add(chunk_jsons[1]))
+        self.assertEqual(full_json["Names"], FULL_DATA["Names"])
+        self.assertEqual(full_json["Currents"], FULL_DATA["Currents"])
+        self.assertEqual(list(assembler.iter_pending()), [(("Chunked", "chunk-test", "other"), 1)])
+
+    def test_message_objects(self):
+        """Unit test for adding message objects and messages that are not chunked."""
+        assembler = ChunkAssembler()
+        unchunked_message = ChunkedResultMessage(**CHUNK_BASE)
+        self.assertEqual(assembler.add(unchunked_message), unchunked_message.json())
+
+        messages = [
+            ChunkedResultMessage(**CHUNK_BASE, ChunkIndex=index, ChunkCount=2, DatasetHash="abc")
+            for index in (1, 0)
+        ]
+        self.assertIsNone(assembler.add(messages[0]))
+        full_json = cast(Dict[str, Any], assembler.add(messages[1]))
+        self.assertEqual(ChunkedResultMessage.from_json(full_json), unchunked_message)
+
+    def test_invalid_chunks(self):
+        """Unit test for chunks with inconsistent chunk attributes."""
+        assembler = ChunkAssembler()
+        chunk_jsons = get_chunk_jsons(2)
+        with self.assertRaises(MessageValueError):
+            assembler.add({**chunk_jsons[0], "ChunkIndex": 3})
+        with self.assertRaises(MessageValueError):
+            assembler.add({**chunk_jsons[0], "DatasetHash": None})
+
+        assembler.add(chunk_jsons[0])
+        with self.assertRaises(MessageValueError):
+            assembler.add({**chunk_jsons[1], "ChunkCount": 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+
+"""Unit tests for the message codecs and the CodecRegistry class."""
+
+import json
+import struct
+import unittest
+import zlib
+
+from tools.exceptions.messages import MessageCodecError
+from tools.message.codec import (
+    CONTENT_ENCODING_DEFLATE, CONTENT_ENCODING_GZIP, CodecRegistry, JsonCodec, MessageCodec, PackedArrayCodec,
+    compress_message, decompress_message)
+from tools.message.example import ExampleMessage
+from tools.tests.message.example import EXAMPLE_MESSAGE
+
+ARRAY_MESSAGE = {
+    **EXAMPLE_MESSAGE,
+    "CurrentArray": {
+        "UnitOfMeasure": "mA",
+        "Values": [float(index) / 3 for index in range(100)]
+    },
+    "VoltageArray": {
+        "UnitOfMeasure": "V",
+        "Values": [1.5, 2] * 10
+    },
+    "Names": ["a", "b", "c", "d", "e", "f", "g", "h", "i"],
+    "Mixed": [0.5, "text", 1.5, 2.5, 3.5, 4.5, 5.5, 6.5]
+}
+
+
+class TestCodecs(unittest.TestCase):
+    """Unit tests for the JSON and packed array codecs."""
+
+    def test_json_codec(self):
+        """Unit test for the JSON codec."""
+        example_message = ExampleMessage(**EXAMPLE_MESSAGE)
+        codec = JsonCodec()
+        self.assertEqual(codec.encode(example_message.json()), example_message.bytes())
+        self.assertEqual(codec.decode(example_message.bytes()), example_message.json())
+        with self.assertRaises(MessageCodecError):
+            codec.decode(b"{not json")
+
+    def test_packed_array_codec(self):
+        """Unit test for encoding and decoding messages with packed float arrays."""
+        codec = PackedArrayCodec()
+        message_bytes = codec.encode(ARRAY_MESSAGE)
+        self.assertTrue(message_bytes.startswith(PackedArrayCodec.HEADER))
+        self.assertLess(len(message_bytes), len(JsonCodec().encode(ARRAY_MESSAGE)))
+
+        decoded_message = codec.decode(message_bytes)
+        self.assertEqual(decoded_message, ARRAY_MESSAGE)
+        # only the lists containing only floats are packed, so the integers are kept as they are
+        self.assertEqual(
+            [type(value) for value in decoded_message["VoltageArray"]["Values"]],
+            [type(value) for value in ARRAY_MESSAGE["VoltageArray"]["Values"]])
+        self.assertIn(b'"Values": [1.5, 2, ', message_bytes)
+
+        # numbers that do not fit into a double and booleans are not converted to floats
+        number_message = {"Large": [1.0] * 20 + [10**400], "Booleans": [1.5] * 10 + [True, 5]}
+        self.assertEqual(codec.decode(codec.encode(number_message)), number_message)
+        self.assertIs(codec.decode(codec.encode(number_message))["Booleans"][10], True)
+
+        # the short arrays are kept in the JSON part
+        example_message = ExampleMessage(**EXAMPLE_MESSAGE)
+        self.assertEqual(codec.decode(codec.encode(example_message.json())), example_message.json())
+        self.assertEqual(ExampleMessage(**codec.decode(codec.encode(example_message.json()))), example_message)
+
+    def test_invalid_packed_messages(self):
+        """Unit test for decoding invalid packed array messages."""
+        codec = PackedArrayCodec()
+        message_bytes = codec.encode(ARRAY_MESSAGE)
+        for invalid_bytes in (b"", json.dumps(ARRAY_MESSAGE).encode("UTF-8"), message_bytes[:-4],
+                              message_bytes[:-16]):
+            with self.assertRaises(MessageCodecError):
+                codec.decode(invalid_bytes)
+
+    def test_corrupted_packed_ranges(self):
+        """Unit test for decoding packed array messages whose array ranges are not valid."""
+        codec = PackedArrayCodec()
+        for packed_range in ([0, 1, 2], [0], "0, 1", [0.0, 1], [-1, 2], [0, -1], [True, 1], [1, 2], None):
+            with self.subTest(packed_range=packed_range):
+                json_bytes = json.dumps({"Values": {PackedArrayCodec.PACKED_ATTRIBUTE: packed_range}}).encode("UTF-8")
+                header_length = len(PackedArrayCodec.HEADER) + struct.calcsize("<I") + len(json_bytes)
+                message_bytes = b"".join([
+                    PackedArrayCodec.HEADER, struct.pack("<I", len(json_bytes)), json_bytes,
+                    bytes(-header_length % 8), struct.pack("<2d", 1.5, 2.5)])
+                if packed_range is None:
+                    # a null value is not a packed array placeholder
+                    self.assertEqual(codec.decode(message_bytes), {"Values": {PackedArrayCodec.PACKED_ATTRIBUTE: None}})
+                    continue
+                with self.assertRaises(MessageCodecError):
+                    codec.decode(message_bytes)
+
+
+class TestCompression(unittest.TestCase):
+    """Unit tests for compressing and decompressing the message bytes."""
+
+    def test_compression(self):
+        """Unit test for compressing and decompressing messages."""
+        message_bytes = JsonCodec().encode(ARRAY_MESSAGE)
+        compressed_bytes = compress_message(message_bytes, 1)
+        self.assertLess(len(compressed_bytes), len(message_bytes))
+        self.assertEqual(decompress_message(compressed_bytes, CONTENT_ENCODING_DEFLATE), message_bytes)
+
+        gzip_compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+        gzip_bytes = gzip_compressor.compress(message_bytes) + gzip_compressor.flush()
+        self.assertEqual(decompress_message(gzip_bytes, CONTENT_ENCODING_GZIP), message_bytes)
+
+        # the messages without a content encoding are not compressed
+        for content_encoding in (None, "", "identity"):
+            self.assertEqual(decompress_message(message_bytes, content_encoding), message_bytes)
+
+        with self.assertRaises(MessageCodecError):
+            decompress_message(compressed_bytes, "br")
+        with self.assertRaises(MessageCodecError):
+            decompress_message(message_bytes, CONTENT_ENCODING_DEFLATE)
+
+
+class DummyCodec(MessageCodec):
+    """Codec for testing the registration of new codecs."""
+    CONTENT_TYPE = "application/x-dummy"
+
+    def encode(self, json_message):
+        return b"dummy"
+
+    def decode(self, message_bytes):
+        return {"Type": "dummy"}
+
+
+class TestCodecRegistry(unittest.TestCase):
+    """Unit tests for selecting the codecs."""
+
+    def tearDown(self):
+        CodecRegistry.set_default_codec(JsonCodec.CONTENT_TYPE)
+        CodecRegistry.set_topic_codec("Example.topic", None)
+        CodecRegistry.set_message_type_codec("Example", None)
+
+    def test_get_codec(self):
+        """Unit test for getting the codecs by the content type."""
+        self.assertIsInstance(CodecRegistry.get_codec(JsonCodec.CONTENT_TYPE), JsonCodec)
+        self.assertIsInstance(CodecRegistry.get_codec(PackedArrayCodec.CONTENT_TYPE), PackedArrayCodec)
+        # the messages without a known content type are decoded as JSON
+        self.assertIsInstance(CodecRegistry.get_codec(None), JsonCodec)
+        self.assertIsInstance(CodecRegistry.get_codec("application/unknown"), JsonCodec)
+
+        CodecRegistry.register_codec(DummyCodec())
+        self.assertIn(DummyCodec.CONTENT_TYPE, CodecRegistry.get_content_types())
+        self.assertEqual(CodecRegistry.decode(b"", DummyCodec.CONTENT_TYPE), {"Type": "dummy"})
+
+    def test_select_codec(self):
+        """Unit test for selecting the codec by the topic and the message type."""
+        self.assertEqual(CodecRegistry.encode("Example.topic", EXAMPLE_MESSAGE)[1], JsonCodec.CONTENT_TYPE)
+
+        CodecRegistry.set_message_type_codec("Example", PackedArrayCodec.CONTENT_TYPE)
+        message_bytes, content_type = CodecRegistry.encode("Other.topic", EXAMPLE_MESSAGE)
+        self.assertEqual(content_type, PackedArrayCodec.CONTENT_TYPE)
+        self.assertEqual(CodecRegistry.decode(message_bytes, content_type), EXAMPLE_MESSAGE)
+
+        CodecRegistry.set_topic_codec("Example.topic", JsonCodec.CONTENT_TYPE)
+        self.assertIsInstance(CodecRegistry.select_codec("Example.topic", "Example"), JsonCodec)
+        self.assertIsInstance(CodecRegistry.select_codec("Other.topic", "Example"), PackedArrayCodec)
+        self.assertIsInstance(CodecRegistry.select_codec("Other.topic", "Other"), JsonCodec)
+
+        CodecRegistry.set_default_codec(PackedArrayCodec.CONTENT_TYPE)
+        self.assertIsInstance(CodecRegistry.select_codec("Other.topic", "Other"), PackedArrayCodec)
+
+        with self.assertRaises(MessageCodecError):
+            CodecRegistry.set_topic_codec("Example.topic", "application/unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,10 +9,11 @@
 import copy
 import datetime
 import json
+import pickle
 import unittest
 
 from tools.datetime_tools import to_utc_datetime_object
-from tools.exceptions.messages import MessageValueError
+from tools.exceptions.messages import MessageError, MessageValueError
 from tools.message.abstract import AbstractResultMessage
 from tools.message.block import QuantityArrayBlock, QuantityBlock, ValueArrayBlock, TimeSeriesBlock
 from tools.message.example import ExampleMessage
@@ -293,6 +294,100 @@ class TestExampleMessage(unittest.TestCase):
                 setattr(message_copy, attribute_name, getattr(message_original, attribute_name))
                 self.assertEqual(message_copy, message_original)
 
+    def test_message_from_trusted(self):
+        """Unit test for creating a message from trusted values without the item checks."""
+        message_json = {
+            **EXAMPLE_MESSAGE,
+            "Timestamp": "2020-01-01T00:00:00.000Z"
+        }
+        trusted_message = ExampleMessage.from_trusted(**message_json)
+        self.assertIsInstance(trusted_message, ExampleMessage)
+        self.assertEqual(trusted_message, ExampleMessage(**message_json))
+        self.assertEqual(trusted_message.json(), message_json)
+        self.assertIsInstance(trusted_message.current_array, QuantityArrayBlock)
+
+        # lists for quantity array blocks get the default unit
+        trusted_alternate = ExampleMessage.from_trusted(**ALTERNATE_MESSAGE)
+        self.assertEqual(trusted_alternate.current_array.unit_of_measure, "mA")
+        self.assertEqual(trusted_alternate.current_array.values, ALTERNATE_MESSAGE["CurrentArray"])
+        self.assertIsNone(trusted_alternate.voltage_array)
+
+        # the common attributes and the units are still checked
+        with self.assertRaises(MessageValueError):
+            ExampleMessage.from_trusted(**{**EXAMPLE_MESSAGE, "CurrentArray": {"UnitOfMeasure": "V", "Values": []}})
+        with self.assertRaises((MessageValueError, ValueError)):
+            ExampleMessage.from_trusted(**{**EXAMPLE_MESSAGE, "EpochNumber": -1})
+
+    def test_message_decode_json(self):
+        """Unit test for creating a message from JSON with a single pass of the attribute checks."""
+        message_json = ExampleMessage(**EXAMPLE_MESSAGE).json()
+        decoded_message = ExampleMessage.decode_json(message_json)
+        self.assertEqual(decoded_message, ExampleMessage(**message_json))
+        self.assertEqual(ExampleMessage.from_json(message_json), decoded_message)
+        self.assertIsInstance(decoded_message.current_array, QuantityArrayBlock)
+        self.assertIsInstance(decoded_message.temperature, TimeSeriesBlock)
+        # the given JSON is not modified
+        self.assertIsInstance(message_json["CurrentArray"], dict)
+
+        invalid_jsons = [
+            {**message_json, "PositiveInteger": -1},
+            {**message_json, "PowerQuantity": {"UnitOfMeasure": "MW", "Value": 12.3}},
+            {**message_json, "CurrentArray": {"UnitOfMeasure": "mA", "Values": "12.3"}},
+            {**message_json, "Temperature": {"TimeIndex": [], "Series": {}}},
+            {key: value for key, value in message_json.items() if key != "PowerQuantity"}
+        ]
+        for invalid_json in invalid_jsons:
+            with self.subTest(invalid_json=invalid_json):
+                self.assertFalse(ExampleMessage.validate_json(invalid_json))
+                self.assertIsNone(ExampleMessage.from_json(invalid_json))
+                with self.assertRaises((MessageError, ValueError, TypeError)):
+                    ExampleMessage.decode_json(invalid_json)
+
+        with self.assertRaises(TypeError):
+            ExampleMessage.decode_json(["not", "a", "dictionary"])  # type: ignore
+
+    def test_attribute_tables(self):
+        """Unit test for the check functions and storage names resolved when the message class is created."""
+        self.assertEqual(
+            [json_attribute_name for json_attribute_name, _, _, _ in ExampleMessage.VALIDATION_TABLE],
+            list(ExampleMessage.MESSAGE_ATTRIBUTES_FULL))
+        self.assertEqual(ExampleMessage.ATTRIBUTE_CHECKS["PositiveInteger"], ExampleMessage._check_positive_integer)
+        self.assertEqual(ExampleMessage.ATTRIBUTE_STORAGE_NAMES["CurrentArray"], "_ExampleMessage__current_array")
+        self.assertEqual(ExampleMessage.ATTRIBUTE_STORAGE_NAMES["EpochNumber"], "_AbstractResultMessage__epoch_number")
+
+        # the block attributes are stored using the class that defines the property also in subclasses
+        class ExampleSubMessage(ExampleMessage):
+            """Subclass of the example message without any new attributes."""
+
+        message_json = ExampleMessage(**EXAMPLE_MESSAGE).json()
+        sub_message = ExampleSubMessage(**message_json)
+        self.assertEqual(sub_message.current_array.values, EXAMPLE_MESSAGE["CurrentArray"]["Values"])
+        self.assertEqual(sub_message.json(), message_json)
+
+    def test_message_slots(self):
+        """Unit test for the slot based storage of the message and block attributes."""
+        example_message = ExampleMessage(**EXAMPLE_MESSAGE)
+        for message_object in (example_message, example_message.power_quantity, example_message.current_array,
+                               example_message.temperature, example_message.temperature.series["PlaceA"]):
+            with self.subTest(object_type=type(message_object).__name__):
+                self.assertFalse(hasattr(message_object, "__dict__"))
+                with self.assertRaises(AttributeError):
+                    setattr(message_object, "unknown_attribute", 1)
+
+        self.assertEqual(copy.deepcopy(example_message), example_message)
+        self.assertEqual(pickle.loads(pickle.dumps(example_message)), example_message)
+
+        # subclasses without __slots__ can still have other attributes
+        class ExampleDictMessage(ExampleMessage):
+            """Subclass of the example message that stores an extra attribute."""
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+                self.extra_attribute = "extra"
+
+        dict_message = ExampleDictMessage(**example_message.json())
+        self.assertEqual(dict_message.extra_attribute, "extra")
+        self.assertEqual(dict_message.json(), example_message.json())
+
     def test_invalid_values(self):
         """Unit tests for testing that invalid attribute values are recognized."""
         example_message = ExampleMessage(**EXAMPLE_MESSAGE)
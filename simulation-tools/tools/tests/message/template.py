@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+
+"""Unit tests for the MessageTemplate class."""
+
+import datetime
+import json
+import unittest
+
+from tools.exceptions.messages import MessageValueError
+from tools.message.example import ExampleMessage
+from tools.message.generator import MessageGenerator
+from tools.message.status import StatusMessage
+from tools.message.template import MessageTemplate
+from tools.tests.message.example import EXAMPLE_MESSAGE
+
+HEADER_VALUES = {
+    "MessageId": "example-test-5",
+    "Timestamp": "2021-01-01T12:00:00.000Z",
+    "EpochNumber": 5,
+    "TriggeringMessageIds": ["manager-5", "other-3"]
+}
+
+
+class TestMessageTemplate(unittest.TestCase):
+    """Unit tests for the MessageTemplate class."""
+
+    def test_template_bytes(self):
+        """Unit test for creating message bytes from a template."""
+        example_message = ExampleMessage(**EXAMPLE_MESSAGE)
+        template = MessageTemplate(example_message)
+        self.assertIs(template.message_class, ExampleMessage)
+        self.assertEqual(template.bytes(), example_message.bytes())
+
+        new_message = ExampleMessage(**{**EXAMPLE_MESSAGE, **HEADER_VALUES})
+        self.assertEqual(template.bytes(**HEADER_VALUES), new_message.bytes())
+        self.assertEqual(template.json(**HEADER_VALUES), new_message.json())
+
+        # only some of the header attributes are replaced
+        self.assertEqual(
+            template.bytes(EpochNumber=7),
+            ExampleMessage(**{**example_message.json(), "EpochNumber": 7}).bytes())
+
+        # datetime objects are converted to the ISO format
+        self.assertEqual(
+            template.json(Timestamp=datetime.datetime(2021, 1, 1, 12, tzinfo=datetime.timezone.utc))["Timestamp"],
+            HEADER_VALUES["Timestamp"])
+
+    def test_custom_header_attributes(self):
+        """Unit test for a template with other header attributes."""
+        example_message = ExampleMessage(**EXAMPLE_MESSAGE)
+        template = MessageTemplate(example_message, ["MessageId", "PositiveInteger"])
+        self.assertEqual(template.header_attributes, ("MessageId", "PositiveInteger"))
+        self.assertEqual(
+            template.bytes(MessageId="example-test-9", PositiveInteger=1),
+            ExampleMessage(**{**example_message.json(), "MessageId": "example-test-9", "PositiveInteger": 1}).bytes())
+
+        with self.assertRaises(MessageValueError):
+            template.bytes(EpochNumber=2)
+        with self.assertRaises(MessageValueError):
+            MessageTemplate(example_message, ["MessageId", "EightCharacters", "VoltageArray", "Missing"])
+
+    def test_invalid_header_values(self):
+        """Unit test for the checks of the header values."""
+        template = MessageTemplate(ExampleMessage(**EXAMPLE_MESSAGE))
+        for invalid_values in ({"EpochNumber": -1}, {"TriggeringMessageIds": []}, {"MessageId": ""},
+                               {"Timestamp": "not a time"}):
+            with self.assertRaises(MessageValueError):
+                template.bytes(**invalid_values)
+
+    def test_generator_templates(self):
+        """Unit test for creating templates and messages with the message generator."""
+        generator = MessageGenerator("2021-01-01T00:00:00.000Z", "generator")
+        template = generator.get_message_template(
+            StatusMessage, Value="ready", EpochNumber=1, TriggeringMessageIds=["manager-1"])
+
+        message_id, message_bytes = generator.get_template_bytes(
+            template, EpochNumber=2, TriggeringMessageIds=["manager-2"])
+        # creating the template does not use message ids
+        self.assertEqual(message_id, "generator-1")
+        status_message = StatusMessage(**json.loads(message_bytes))
+        self.assertEqual(message_bytes, status_message.bytes())
+        self.assertEqual(status_message.message_id, message_id)
+        self.assertEqual(status_message.epoch_number, 2)
+        self.assertEqual(status_message.triggering_message_ids, ["manager-2"])
+        self.assertEqual(generator.get_template_bytes(template, EpochNumber=3)[0], "generator-2")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,6 +12,7 @@ import json
 import unittest
 
 import tools.exceptions.messages
+import tools.message.abstract
 import tools.messages
 from tools.datetime_tools import to_utc_datetime_object
 
@@ -134,5 +135,78 @@ class TestAbstractMessage(unittest.TestCase):
                         tools.messages.AbstractMessage(**json_invalid_attribute)
 
 
+class LabeledMessage(tools.messages.AbstractMessage):
+    """Message class with a property whose getter does not only return the stored value."""
+    CLASS_MESSAGE_TYPE = "Labeled"
+
+    MESSAGE_ATTRIBUTES = {"Label": "label"}
+    OPTIONAL_ATTRIBUTES = ["Label"]
+    MESSAGE_ATTRIBUTES_FULL = {**tools.messages.AbstractMessage.MESSAGE_ATTRIBUTES_FULL, **MESSAGE_ATTRIBUTES}
+    OPTIONAL_ATTRIBUTES_FULL = tools.messages.AbstractMessage.OPTIONAL_ATTRIBUTES_FULL + OPTIONAL_ATTRIBUTES
+
+    def __init__(self, **kwargs):
+        self.__label = None
+        super().__init__(**kwargs)
+
+    @property
+    def label(self):
+        """The label in upper case."""
+        if self.__label is None:
+            return None
+        return self.__label.upper()
+
+    @label.setter
+    def label(self, label):
+        self.__label = label
+
+    @classmethod
+    def _check_label(cls, label):
+        return label is None or isinstance(label, str)
+
+
+class PrefixedMessage(tools.messages.AbstractMessage):
+    """Message class that overrides the property getter of a stored value attribute in its parent class."""
+    CLASS_MESSAGE_TYPE = "Prefixed"
+
+    @property
+    def source_process_id(self):
+        """The source process id with a prefix."""
+        return "process-" + super().source_process_id
+
+    @source_process_id.setter
+    def source_process_id(self, source_process_id):
+        tools.messages.AbstractMessage.source_process_id.fset(self, source_process_id)  # type: ignore
+
+
+class TestSerializationPlan(unittest.TestCase):
+    """Unit tests for the compiled serialization plans used by get_json."""
+
+    def test_serialization_plan(self):
+        """Unit test for the attributes in the serialization plan."""
+        plan = tools.message.abstract.get_serialization_plan(tools.messages.AbstractMessage)
+        self.assertIs(plan, tools.message.abstract.get_serialization_plan(tools.messages.AbstractMessage))
+        self.assertEqual(
+            [json_attribute_name for json_attribute_name, _, _ in plan],
+            list(tools.messages.AbstractMessage.MESSAGE_ATTRIBUTES_FULL))
+        self.assertFalse(any(is_optional for _, _, is_optional in plan))
+
+        # the plans are separate for each class
+        labeled_plan = tools.message.abstract.get_serialization_plan(LabeledMessage)
+        self.assertEqual(labeled_plan[-1][0], "Label")
+        self.assertTrue(labeled_plan[-1][2])
+
+    def test_property_getters(self):
+        """Unit test for the attributes whose property getter must be called."""
+        labeled_message = LabeledMessage(**FULL_JSON, Label="label")
+        self.assertEqual(labeled_message.json()["Label"], "LABEL")
+        self.assertEqual(labeled_message.json()[MESSAGE_ID_ATTRIBUTE], DEFAULT_MESSAGE_ID)
+        self.assertNotIn("Label", LabeledMessage(**FULL_JSON).json())
+
+        # an overridden property getter is called even if the parent class reads the stored value directly
+        prefixed_json = PrefixedMessage(**FULL_JSON).json()
+        self.assertEqual(prefixed_json[SOURCE_PROCESS_ID_ATTRIBUTE], "process-" + DEFAULT_SOURCE_PROCESS_ID)
+        self.assertEqual(prefixed_json[MESSAGE_ID_ATTRIBUTE], DEFAULT_MESSAGE_ID)
+
+
 if __name__ == '__main__':
     unittest.main()
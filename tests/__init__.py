@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+
+'''
+Unit tests for the domain tools and the NIS component.
+The tests are run from the repository root, e.g. python -m unittest discover -s tests -t . -p "*.py"
+'''
+
+# adds the simulation-tools and domain-tools directories to the python path
+import init  # noqa: F401
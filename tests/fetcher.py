@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+
+'''
+Unit tests for the incremental json parsing in Fetcher.py.
+'''
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from tests.network_data import BUS_NAMES, create_network_content, values_of, write_network_file
+
+from Fetcher import JsonFileError, JsonFileNIS, NetworkFileWatcher, _JsonStream, find_feeder_files, load_feeders
+
+# a document with the cases that are difficult for the batched array parsing: separators inside strings,
+# escapes, nested values, numbers in all forms and whitespace around everything
+TRICKY_DOCUMENT = {
+    'Numbers': [0, -1, 2.5, -3.25e-3, 1E10, 12345678901234, 0.1, 1e-300],
+    'Strings': ['a,b', 'c]d', '[e', '"quoted", ]', 'back\\slash', 'unicode äö', ''],
+    'Nested': [[1, 2], {'key': [3, {'inner': 'x,y]'}]}, [], {}],
+    'Mixed': [None, True, False, 'text', 1.5],
+    'Empty': [],
+    'Object': {'a': 1, 'b': [1, 2, 3]}
+}
+
+
+def stream_for(text: str, chunk_size: int) -> _JsonStream:
+    '''Return a json stream that reads the given text in chunks of the given size.'''
+    return _JsonStream(io.StringIO(text), chunk_size)
+
+
+class TestJsonStream(unittest.TestCase):
+    '''Unit tests for the _JsonStream class.'''
+
+    def test_arrays_across_chunk_boundaries(self):
+        '''Test that the arrays are decoded like json.loads with any chunk size.'''
+        for indent in (None, 2):
+            text = json.dumps(TRICKY_DOCUMENT, indent=indent)
+            for chunk_size in range(1, 40):
+                with self.subTest(indent=indent, chunk_size=chunk_size):
+                    stream = stream_for(text, chunk_size)
+                    result = {}
+                    for key in stream.iter_object():
+                        if key == 'Object':
+                            result[key] = stream.read_value()
+                        else:
+                            values = []
+                            stream.read_array(values.extend)
+                            result[key] = values
+                    self.assertEqual(stream.peek(), '')
+                    self.assertEqual(result, json.loads(text))
+
+    def test_skip_value(self):
+        '''Test that skipped values are consumed completely.'''
+        text = json.dumps({'Skipped': TRICKY_DOCUMENT, 'Kept': [1, 2, 3]})
+        for chunk_size in (1, 3, 16, 1024):
+            with self.subTest(chunk_size=chunk_size):
+                stream = stream_for(text, chunk_size)
+                result = {}
+                for key in stream.iter_object():
+                    if key == 'Kept':
+                        result[key] = stream.read_value()
+                    else:
+                        stream.skip_value()
+                self.assertEqual(result, {'Kept': [1, 2, 3]})
+
+    def test_invalid_content(self):
+        '''Test that invalid json content raises JsonFileError.'''
+        for text in ('[1, 2', '[1, , 2]', '[1 2]', '{"a": [1, 2]', '[1, 2]]'):
+            with self.subTest(text=text):
+                stream = stream_for(text, 4)
+                values = []
+                with self.assertRaises(JsonFileError):
+                    stream.read_array(values.extend)
+                    if stream.peek() != '':
+                        raise JsonFileError('Unexpected content')
+
+
+class TestJsonFileNIS(unittest.TestCase):
+    '''Unit tests for the JsonFileNIS class.'''
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def assert_content_equal(self, tables, content):
+        '''Check that the given tables contain the data of the given json content.'''
+        component_content = tables.component_content()
+        bus_content = tables.bus_content()
+        for key, value in content.items():
+            result = bus_content[key] if key.startswith('Bus') else component_content[key]
+            self.assertEqual(values_of(result), values_of(value), key)
+            if isinstance(value, dict):
+                self.assertEqual(result['UnitOfMeasure'], value['UnitOfMeasure'], key)
+
+    def test_equivalent_to_json_load(self):
+        '''Test that the parsed tables match the content loaded with json.load for different chunk sizes.'''
+        content = create_network_content()
+        content['Resistance'] = {'UnitOfMeasure': '{pu}', 'Values': content['Resistance']}
+        content['Ignored'] = TRICKY_DOCUMENT
+        file_name = write_network_file(self.directory.name, content, indent=1)
+        with open(file_name, encoding='utf-8') as json_file:
+            loaded = json.load(json_file)
+
+        for chunk_size in (1, 5, 64, JsonFileNIS.CHUNK_SIZE):
+            with self.subTest(chunk_size=chunk_size), mock.patch.object(JsonFileNIS, 'CHUNK_SIZE', chunk_size):
+                tables = JsonFileNIS(file_name).get_tables()
+                loaded_without_ignored = {key: value for key, value in loaded.items() if key != 'Ignored'}
+                self.assert_content_equal(tables, loaded_without_ignored)
+
+    def test_attribute_order(self):
+        '''Test that the end points are mapped to the buses whether the bus names come before or after them.'''
+        content = create_network_content()
+        for ordered in (content, {key: content[key] for key in reversed(list(content))}):
+            bus_names_first = list(ordered).index('BusName') < list(ordered).index('SendingEndBus')
+            with self.subTest(bus_names_first=bus_names_first):
+                tables = JsonFileNIS(write_network_file(self.directory.name, ordered)).get_tables()
+                self.assert_content_equal(tables, content)
+                self.assertEqual(tables.node_names, BUS_NAMES)
+                self.assertEqual(list(tables.sending_end_bus), [0, 1, 1, 3])
+                self.assertEqual(list(tables.receiving_end_bus), [1, 2, 3, 4])
+
+    def test_invalid_files(self):
+        '''Test that the invalid files raise JsonFileError.'''
+        invalid_values = {
+            'missing attribute': ('BusType', None),
+            'string in a float array': ('ShuntAdmittance', [0.0, 'a', 0.0, 0.0]),
+            'integer too large for a double': ('ShuntAdmittance', [0, 10 ** 400, 0, 0]),
+            'number as a bus name': ('SendingEndBus', ['bus0', 1, 'bus1', 'bus3']),
+            'block without values': ('Resistance', {'UnitOfMeasure': '{pu}'})
+        }
+        for case, (key, value) in invalid_values.items():
+            with self.subTest(case=case):
+                content = create_network_content()
+                if value is None:
+                    del content[key]
+                else:
+                    content[key] = value
+                file_name = write_network_file(self.directory.name, content)
+                self.assertRaises(JsonFileError, JsonFileNIS, file_name)
+
+        self.assertRaises(JsonFileError, JsonFileNIS, self.directory.name + '/missing.json')
+
+
+class TestLoadFeeders(unittest.TestCase):
+    '''Unit tests for loading several feeder files.'''
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_find_feeder_files(self):
+        '''Test finding the feeder files from a directory or with a glob pattern.'''
+        file_names = [
+            write_network_file(self.directory, create_network_content(), file_name)
+            for file_name in ('feeder2.json', 'feeder1.json')
+        ]
+        self.assertEqual(find_feeder_files(self.directory), sorted(file_names))
+        self.assertEqual(find_feeder_files(os.path.join(self.directory, '*1.json')), [file_names[1]])
+        self.assertEqual(find_feeder_files(file_names[0]), [file_names[0]])
+        self.assertRaises(JsonFileError, find_feeder_files, os.path.join(self.directory, '*.txt'))
+        self.assertRaises(JsonFileError, find_feeder_files, None)
+        self.assertRaises(JsonFileError, find_feeder_files, '')
+
+    def test_watcher_without_source(self):
+        '''Test that a watcher without a json file reports the error only when loading.'''
+        watcher = NetworkFileWatcher(None)
+        self.assertFalse(watcher.has_changed())
+        self.assertRaises(JsonFileError, watcher.load)
+
+    def test_load_feeders(self):
+        '''Test that the feeder files are parsed in parallel and merged into one network.'''
+        feeder2 = create_network_content(
+            bus_names=['root2', 'bus10'], bus_types=['root', 'dummy'], branches=[('line10', 'root2', 'bus10')])
+        file_names = [
+            write_network_file(self.directory, create_network_content(), 'feeder1.json'),
+            write_network_file(self.directory, feeder2, 'feeder2.json')
+        ]
+        tables = load_feeders(file_names, use_cache=False, max_workers=2)
+        self.assertEqual(tables.bus_name, BUS_NAMES + ['bus10'])
+        self.assertEqual(tables.component_content()['SendingEndBus'][-1], 'bus0')
+
+        broken_file = write_network_file(self.directory, {'BusName': []}, 'feeder3.json')
+        self.assertRaises(JsonFileError, load_feeders, file_names + [broken_file], False)
+
+
+if __name__ == '__main__':
+    unittest.main()
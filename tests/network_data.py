@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+
+'''
+Small network data sets used in the unit tests.
+'''
+
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+# the buses of the example feeder, the first bus is the root
+BUS_NAMES = ['bus0', 'bus1', 'bus2', 'bus3', 'bus4']
+BUS_TYPES = ['root', 'dummy', 'usage-point', 'dummy', 'usage-point']
+# the branches of the example feeder as (device id, sending end bus, receiving end bus)
+BRANCHES = [
+    ('line1', 'bus0', 'bus1'),
+    ('line2', 'bus1', 'bus2'),
+    ('line3', 'bus1', 'bus3'),
+    ('line4', 'bus3', 'bus4')
+]
+
+
+def create_network_content(bus_names: Optional[List[str]] = None, bus_types: Optional[List[str]] = None,
+                           branches: Optional[List[tuple]] = None, power_base: Any = 10.0,
+                           scale: float = 1.0) -> Dict[str, Any]:
+    '''
+    Return the content of a NIS json file for the given buses and branches.
+    The example feeder is used by default. The float parameters are derived from the row numbers and
+    multiplied by scale, so that different data sets can be created from the same topology.
+    '''
+    bus_names = BUS_NAMES if bus_names is None else bus_names
+    bus_types = BUS_TYPES if bus_types is None else bus_types
+    branches = BRANCHES if branches is None else branches
+    branch_count = len(branches)
+    return {
+        'PowerBase': power_base,
+        'DeviceId': [branch[0] for branch in branches],
+        'SendingEndBus': [branch[1] for branch in branches],
+        'ReceivingEndBus': [branch[2] for branch in branches],
+        'Resistance': [0.25 * (row + 1) * scale for row in range(branch_count)],
+        'Reactance': [0.5 * (row + 1) * scale for row in range(branch_count)],
+        'ShuntAdmittance': [0.0] * branch_count,
+        'ShuntConductance': [0.0] * branch_count,
+        'RatedCurrent': [100.0 * (row + 1) for row in range(branch_count)],
+        'BusName': list(bus_names),
+        'BusType': list(bus_types),
+        'BusVoltageBase': [20.0] + [0.4] * (len(bus_names) - 1)
+    }
+
+
+def write_network_file(directory: str, content: Dict[str, Any], file_name: str = 'network.json',
+                       indent: Optional[int] = None) -> str:
+    '''Write the given content as a json file to the given directory and return the file path.'''
+    file_path = os.path.join(directory, file_name)
+    with open(file_path, 'w', encoding='utf-8') as json_file:
+        json.dump(content, json_file, indent=indent)
+    return file_path
+
+
+def values_of(value: Any) -> Any:
+    '''Return the values of a quantity array block or the given value if it is not a block.'''
+    if isinstance(value, dict):
+        return value['Values']
+    return value
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+
+'''
+Unit tests for the comparison of the network tables in NetworkDiff.py.
+'''
+
+import unittest
+
+from tests.network_data import BRANCHES, BUS_NAMES, BUS_TYPES, create_network_content
+
+from NetworkDiff import diff_network_tables
+from NetworkTables import NetworkTables
+
+
+def create_tables(**kwargs) -> NetworkTables:
+    '''Return the network tables for the content created with the given arguments.'''
+    content = create_network_content(**kwargs)
+    return NetworkTables.from_content(content, content)
+
+
+class TestNetworkDiff(unittest.TestCase):
+    '''Unit tests for the diff_network_tables function.'''
+
+    def test_same_tables(self):
+        '''Test that the same data gives an empty diff.'''
+        network_diff = diff_network_tables(create_tables(), create_tables())
+        self.assertTrue(network_diff.is_empty)
+        self.assertEqual(network_diff.component_content()['DeviceId'], [])
+        self.assertEqual(network_diff.bus_content()['BusName'], [])
+
+    def test_changes(self):
+        '''Test the added, changed and removed branches and buses.'''
+        bus_names = BUS_NAMES[:4] + ['bus5']
+        bus_types = BUS_TYPES[:3] + ['usage-point', 'usage-point']
+        branches = [BRANCHES[0], BRANCHES[1], ('line3', 'bus1', 'bus5'), ('line5', 'bus1', 'bus3')]
+        new_tables = create_tables(bus_names=bus_names, bus_types=bus_types, branches=branches)
+        new_tables.float_arrays['Resistance'][1] = 10.0
+        network_diff = diff_network_tables(create_tables(), new_tables)
+
+        self.assertFalse(network_diff.is_empty)
+        self.assertFalse(network_diff.power_base_changed)
+        # line2 has a new resistance and line3 a new receiving end bus
+        self.assertEqual(network_diff.changed_branches, [1, 2])
+        self.assertEqual(network_diff.added_branches, [3])
+        self.assertEqual(network_diff.removed_device_ids, ['line4'])
+        # bus3 has a new bus type
+        self.assertEqual(network_diff.changed_buses, [3])
+        self.assertEqual(network_diff.added_buses, [4])
+        self.assertEqual(network_diff.removed_bus_names, ['bus4'])
+
+        component_content = network_diff.component_content()
+        self.assertEqual(component_content['DeviceId'], ['line2', 'line3', 'line5'])
+        self.assertEqual(component_content['ReceivingEndBus'], ['bus2', 'bus5', 'bus3'])
+        self.assertEqual(network_diff.bus_content()['BusName'], ['bus3', 'bus5'])
+        self.assertIn('2 changed', str(network_diff))
+
+    def test_bus_indices_are_not_compared(self):
+        '''Test that the end points are compared by name when the bus order differs.'''
+        reordered = create_tables(bus_names=list(reversed(BUS_NAMES)), bus_types=list(reversed(BUS_TYPES)))
+        network_diff = diff_network_tables(create_tables(), reordered)
+        self.assertEqual(network_diff.changed_branches, [])
+        # the voltage bases are given by row, so only the first and the last bus changed in the reordering
+        self.assertEqual(network_diff.changed_buses, [0, 4])
+        self.assertEqual(network_diff.added_buses, [])
+
+    def test_power_base(self):
+        '''Test that a changed power base is noticed.'''
+        network_diff = diff_network_tables(create_tables(), create_tables(power_base=20.0))
+        self.assertTrue(network_diff.power_base_changed)
+        self.assertFalse(network_diff.is_empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
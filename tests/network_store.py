@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+
+'''
+Unit tests for the binary network store in NetworkStore.py and the cache handling in Fetcher.py.
+'''
+
+import json
+import os
+import struct
+import tempfile
+import unittest
+
+from tests.network_data import create_network_content, write_network_file
+
+from Fetcher import CACHE_FILE_SUFFIX, JsonFileNIS, get_source_key, load_network_tables
+from NetworkStore import (
+    HEADER_LENGTH_FORMAT, MAGIC, NetworkStoreError, open_network_store, read_header, read_network_store,
+    write_network_store)
+from NetworkTables import NetworkTables
+
+STORE_KEY = 'test-key'
+
+
+class TestNetworkStore(unittest.TestCase):
+    '''Unit tests for writing and reading the network store files.'''
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.json_file = write_network_file(directory.name, create_network_content())
+        self.store_file = os.path.join(directory.name, 'network.store')
+        self.tables = JsonFileNIS(self.json_file).get_tables()
+        write_network_store(self.tables, self.store_file, STORE_KEY)
+
+    def assert_tables_equal(self, tables: NetworkTables, expected: NetworkTables):
+        '''Check that the given tables contain the same data as the expected tables.'''
+        self.assertEqual(tables.component_content(), expected.component_content())
+        self.assertEqual(tables.bus_content(), expected.bus_content())
+        self.assertEqual(tables.node_names, expected.node_names)
+        self.assertEqual(tables.content_hash, expected.content_hash)
+
+    def modify_store(self, position: int, content: bytes):
+        '''Overwrite the store file at the given position with the given bytes.'''
+        with open(self.store_file, 'r+b') as store_file:
+            store_file.seek(position)
+            store_file.write(content)
+
+    def section_position(self, name: str) -> int:
+        '''Return the position of the given section in the store file.'''
+        with open(self.store_file, 'rb') as store_file:
+            header = read_header(store_file)
+        return header['data_start'] + header['sections'][name]['offset']
+
+    def test_round_trip(self):
+        '''Test that the tables are the same after writing and reading them with both readers.'''
+        self.assert_tables_equal(read_network_store(self.store_file, STORE_KEY), self.tables)
+        self.assert_tables_equal(open_network_store(self.store_file, STORE_KEY), self.tables)
+
+        # the end points that are not buses are stored as extra node names
+        content = create_network_content()
+        content['ReceivingEndBus'][-1] = 'unknown'
+        tables = NetworkTables.from_content(content, content)
+        write_network_store(tables, self.store_file, STORE_KEY)
+        for reader in (read_network_store, open_network_store):
+            with self.subTest(reader=reader.__name__):
+                self.assert_tables_equal(reader(self.store_file), tables)
+
+    def test_key_mismatch(self):
+        '''Test that a different key is not accepted.'''
+        for reader in (read_network_store, open_network_store):
+            with self.subTest(reader=reader.__name__):
+                self.assertRaises(NetworkStoreError, reader, self.store_file, 'other-key')
+
+    def test_corrupted_files(self):
+        '''Test that the corrupted files raise NetworkStoreError.'''
+        prefix_length = len(MAGIC) + struct.calcsize(HEADER_LENGTH_FORMAT)
+        with open(self.store_file, 'rb') as store_file:
+            original = store_file.read()
+
+        def header_of(header) -> bytes:
+            encoded = json.dumps(header).encode('utf-8')
+            return MAGIC + struct.pack(HEADER_LENGTH_FORMAT, len(encoded)) + encoded
+
+        corruptions = {
+            'wrong magic': lambda: self.modify_store(0, b'NOTASTOR'),
+            'huge header length': lambda: self.modify_store(len(MAGIC), struct.pack(HEADER_LENGTH_FORMAT, 1 << 60)),
+            'header is not json': lambda: self.modify_store(prefix_length, b'\xff\xfe'),
+            'header is a list': lambda: self.modify_store(0, header_of([1, 2, 3])),
+            'header without sections': lambda: self.modify_store(0, header_of({'key': STORE_KEY})),
+            'truncated file': lambda: os.truncate(self.store_file, len(original) - 16),
+            'invalid bus index': lambda: self.modify_store(
+                self.section_position('sending_end_bus'), struct.pack('i', 1000)),
+            'negative bus index': lambda: self.modify_store(
+                self.section_position('receiving_end_bus'), struct.pack('i', -5)),
+            'invalid bus type': lambda: self.modify_store(self.section_position('bus_type'), struct.pack('i', 99)),
+            'bus names are not a list': lambda: self.modify_store(self.section_position('bus_name'), b'{}  ')
+        }
+        for case, corrupt in corruptions.items():
+            for reader in (read_network_store, open_network_store):
+                with self.subTest(case=case, reader=reader.__name__):
+                    with open(self.store_file, 'wb') as store_file:
+                        store_file.write(original)
+                    corrupt()
+                    self.assertRaises(NetworkStoreError, reader, self.store_file, STORE_KEY)
+
+
+class TestNetworkCache(unittest.TestCase):
+    '''Unit tests for using the network store as the cache of the json file.'''
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.json_file = write_network_file(directory.name, create_network_content())
+        self.cache_file = self.json_file + CACHE_FILE_SUFFIX
+        self.expected = JsonFileNIS(self.json_file).get_tables()
+
+    def test_cache_is_used(self):
+        '''Test that the cache file is created and used for the same file content.'''
+        for memory_map in (False, True):
+            with self.subTest(memory_map=memory_map):
+                tables = load_network_tables(self.json_file, use_cache=True, memory_map=memory_map)
+                self.assertTrue(os.path.isfile(self.cache_file))
+                self.assertEqual(tables.content_hash, self.expected.content_hash)
+
+                with open(self.cache_file, 'rb') as cache_file:
+                    self.assertEqual(read_header(cache_file)['key'], get_source_key(self.json_file))
+                tables = load_network_tables(self.json_file, use_cache=True, memory_map=memory_map)
+                self.assertEqual(tables.content_hash, self.expected.content_hash)
+
+    def test_corrupted_cache_falls_back_to_json(self):
+        '''Test that a corrupted cache file is replaced by parsing the json file again.'''
+        for memory_map in (False, True):
+            with self.subTest(memory_map=memory_map):
+                load_network_tables(self.json_file, use_cache=True)
+                with open(self.cache_file, 'r+b') as cache_file:
+                    cache_file.seek(len(MAGIC))
+                    cache_file.write(struct.pack(HEADER_LENGTH_FORMAT, 1 << 60))
+
+                tables = load_network_tables(self.json_file, use_cache=True, memory_map=memory_map)
+                self.assertEqual(tables.content_hash, self.expected.content_hash)
+                # the cache file was rewritten
+                self.assertEqual(read_network_store(self.cache_file).content_hash, self.expected.content_hash)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+
+'''
+Unit tests for the NetworkTables class in NetworkTables.py.
+'''
+
+import unittest
+
+from tests.network_data import BRANCHES, BUS_NAMES, BUS_TYPES, create_network_content
+
+from NetworkTables import NetworkTables
+from Validation import validate_network_tables
+
+
+def create_tables(**kwargs) -> NetworkTables:
+    '''Return the network tables for the content created with the given arguments.'''
+    content = create_network_content(**kwargs)
+    return NetworkTables.from_content(content, content)
+
+
+# a second feeder that shares its root bus name with the example feeder and has one bus with a shared name
+FEEDER2_BUS_NAMES = ['root2', 'bus10', 'bus2']
+FEEDER2_BUS_TYPES = ['root', 'dummy', 'usage-point']
+FEEDER2_BRANCHES = [('line10', 'root2', 'bus10'), ('line11', 'bus10', 'bus2')]
+
+
+class TestNetworkTables(unittest.TestCase):
+    '''Unit tests for the NetworkTables class.'''
+
+    def test_from_content(self):
+        '''Test that the content is the same after creating the tables from it.'''
+        content = create_network_content()
+        tables = NetworkTables.from_content(content, content)
+        self.assertEqual(tables.branch_count, len(BRANCHES))
+        self.assertEqual(tables.bus_count, len(BUS_NAMES))
+        for key, value in tables.component_content().items():
+            self.assertEqual(value, content[key], key)
+        for key, value in tables.bus_content().items():
+            self.assertEqual(value, content[key], key)
+
+        rows = range(1, 3)
+        self.assertEqual(tables.component_content(rows)['DeviceId'], ['line2', 'line3'])
+        self.assertEqual(tables.component_content([3, 0])['SendingEndBus'], ['bus3', 'bus0'])
+        self.assertEqual(tables.bus_content(rows)['BusType'], BUS_TYPES[1:3])
+
+    def test_content_hash(self):
+        '''Test that the content hash depends on the data.'''
+        self.assertEqual(create_tables().content_hash, create_tables().content_hash)
+        self.assertNotEqual(create_tables().content_hash, create_tables(scale=2.0).content_hash)
+
+    def test_merge_shared_root(self):
+        '''Test merging two feeders under the root bus of the first feeder.'''
+        feeder2 = create_tables(bus_names=FEEDER2_BUS_NAMES, bus_types=FEEDER2_BUS_TYPES, branches=FEEDER2_BRANCHES)
+        merged = NetworkTables.merge([create_tables(), feeder2], shared_root=True)
+
+        self.assertEqual(merged.bus_name, BUS_NAMES + ['bus10'])
+        self.assertEqual(merged.branch_count, len(BRANCHES) + len(FEEDER2_BRANCHES))
+        component_content = merged.component_content()
+        self.assertEqual(component_content['DeviceId'][-2:], ['line10', 'line11'])
+        self.assertEqual(component_content['SendingEndBus'][-2:], ['bus0', 'bus10'])
+        self.assertEqual(component_content['ReceivingEndBus'][-2:], ['bus10', 'bus2'])
+        # the attributes of the shared buses come from the first feeder
+        self.assertEqual(merged.bus_content()['BusVoltageBase'], [20.0] + [0.4] * 5)
+        self.assertTrue(validate_network_tables(merged).is_valid)
+
+    def test_merge_separate_roots(self):
+        '''Test merging two feeders that keep their own root buses.'''
+        feeder2 = create_tables(bus_names=FEEDER2_BUS_NAMES, bus_types=FEEDER2_BUS_TYPES, branches=FEEDER2_BRANCHES)
+        merged = NetworkTables.merge([create_tables(), feeder2], shared_root=False)
+
+        self.assertEqual(merged.bus_name, BUS_NAMES + ['root2', 'bus10'])
+        self.assertEqual(merged.bus_types().count('root'), 2)
+        self.assertEqual(merged.component_content()['SendingEndBus'][-2:], ['root2', 'bus10'])
+        self.assertFalse(validate_network_tables(merged, single_root=True).is_valid)
+        self.assertTrue(validate_network_tables(merged, single_root=False).is_valid)
+
+    def test_merge_unknown_end_points(self):
+        '''Test that the end points that are not buses in any feeder stay after the buses.'''
+        feeder1 = create_tables(branches=BRANCHES + [('line5', 'bus4', 'unknown')])
+        feeder2 = create_tables(bus_names=FEEDER2_BUS_NAMES, bus_types=FEEDER2_BUS_TYPES, branches=FEEDER2_BRANCHES)
+        merged = NetworkTables.merge([feeder1, feeder2])
+
+        self.assertEqual(merged.node_names, BUS_NAMES + ['bus10', 'unknown'])
+        self.assertEqual(merged.component_content()['ReceivingEndBus'][len(BRANCHES)], 'unknown')
+
+    def test_merge_incompatible(self):
+        '''Test that feeders with different power bases or units cannot be merged.'''
+        self.assertRaises(ValueError, NetworkTables.merge, [])
+        self.assertRaises(ValueError, NetworkTables.merge, [create_tables(), create_tables(power_base=20.0)])
+
+        with_units = create_network_content()
+        with_units['Resistance'] = {'UnitOfMeasure': 'Ohm', 'Values': with_units['Resistance']}
+        other_units = create_network_content()
+        other_units['Resistance'] = {'UnitOfMeasure': '{pu}', 'Values': other_units['Resistance']}
+        self.assertRaises(
+            ValueError, NetworkTables.merge,
+            [NetworkTables.from_content(with_units, with_units), NetworkTables.from_content(other_units, other_units)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+
+'''
+Unit tests for the loading and reloading of the network data in the NIS component.
+The message bus is not used: the RabbitMQ client of the component is replaced with a mock.
+'''
+
+import asyncio
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+from tests.network_data import BRANCHES, create_network_content, write_network_file
+
+from Fetcher import JsonFileError, NetworkFileWatcher
+
+from NIS.component import NIS
+from NIS.NISDeltaMessage import NISDeltaMessage
+
+
+class TestNISLoad(unittest.IsolatedAsyncioTestCase):
+    '''Unit tests for loading the network data when the component is started.'''
+
+    async def test_load_failure(self):
+        '''Test that any failure in the loading is reported as an initialization error instead of being raised.'''
+        with tempfile.TemporaryDirectory() as directory:
+            json_file = write_network_file(directory, create_network_content())
+            for error in (JsonFileError('invalid file'), IndexError('invalid index'), MemoryError()):
+                with self.subTest(error=type(error).__name__):
+                    component = NIS(NetworkFileWatcher(json_file, use_cache=False))
+                    component._rabbitmq_client = mock.AsyncMock()
+                    component._triggering_message_ids = ['manager-1']
+                    with mock.patch.object(component._watcher, 'load', side_effect=error):
+                        component._load_task = asyncio.create_task(component._load_network())
+                        await component._wait_for_network()
+
+                    self.assertIsNotNone(component.initialization_error)
+                    self.assertFalse(await component.process_epoch())
+                    component._rabbitmq_client.send_message.assert_awaited_once()
+
+
+class TestNISReload(unittest.IsolatedAsyncioTestCase):
+    '''Unit tests for reloading the network data when the json file changes.'''
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.json_file = write_network_file(self.directory, create_network_content())
+
+    async def create_component(self, **kwargs) -> NIS:
+        '''Return a NIS component that has loaded the json file and whose RabbitMQ client is a mock.'''
+        watcher = NetworkFileWatcher(self.json_file, use_cache=False)
+        component = NIS(watcher, watch_file=True, **kwargs)
+        component._rabbitmq_client = mock.AsyncMock()
+        component._triggering_message_ids = ['manager-1']
+        await component._load_network()
+        self.assertIsNone(component.initialization_error)
+        return component
+
+    def sent_messages(self, component: NIS) -> list:
+        '''Return the messages the component has sent as (topic, message) pairs.'''
+        client = component._rabbitmq_client
+        messages = [
+            (call.kwargs['topic_name'], call.kwargs['message_bytes'])
+            for call in client.send_message.call_args_list
+        ]
+        for call in client.send_messages.call_args_list:
+            messages.extend(call.args[0])
+        return messages
+
+    async def test_reload_publishes_delta(self):
+        '''Test that the changes are published as a delta message after the first epoch.'''
+        component = await self.create_component()
+        component._latest_epoch = 2
+        branches = BRANCHES + [('line5', 'bus4', 'bus2')]
+        write_network_file(self.directory, create_network_content(branches=branches))
+
+        self.assertTrue(await component.process_epoch())
+        messages = self.sent_messages(component)
+        self.assertEqual(len(messages), 1)
+        topic, message = messages[0]
+        self.assertEqual(topic, component.DeltaDataTopic)
+        self.assertIsInstance(message, NISDeltaMessage)
+        self.assertEqual(message.device_id, ['line5'])
+        self.assertEqual(component._network_tables.branch_count, len(branches))
+        self.assertEqual(component.topology.branch_count, len(branches))
+
+        # without further changes, nothing is published
+        self.assertTrue(await component.process_epoch())
+        self.assertEqual(len(self.sent_messages(component)), 1)
+
+    async def test_reload_before_first_epoch(self):
+        '''Test that the data reloaded before the first epoch is published in full in the first epoch.'''
+        component = await self.create_component()
+        self.assertIsNotNone(component._message_templates)
+        component._latest_epoch = 1
+        branches = BRANCHES + [('line5', 'bus4', 'bus2')]
+        write_network_file(self.directory, create_network_content(branches=branches, scale=2.0))
+
+        self.assertTrue(await component.process_epoch())
+        messages = {
+            topic: json.loads(message_bytes)
+            for topic, message_bytes in self.sent_messages(component)
+        }
+        self.assertEqual(set(messages), {component.BusDataTopic, component.ComponentDataTopic})
+        component_message = messages[component.ComponentDataTopic]
+        self.assertEqual(component_message['DeviceId'], [branch[0] for branch in branches])
+        self.assertEqual(component_message['Resistance']['Values'][0], 0.5)
+        self.assertEqual(component_message['EpochNumber'], 1)
+        self.assertIsNone(component._message_templates)
+
+    async def test_reload_failure_keeps_previous_data(self):
+        '''Test that the previous data is kept if the changed file cannot be loaded for any reason.'''
+        component = await self.create_component()
+        component._latest_epoch = 2
+        network_tables = component._network_tables
+
+        with open(self.json_file, 'w', encoding='utf-8') as json_file:
+            json_file.write('{"BusName": [')
+        self.assertTrue(await component.process_epoch())
+        self.assertIs(component._network_tables, network_tables)
+
+        with mock.patch.object(component._watcher, 'has_changed', return_value=True), \
+                mock.patch.object(component._watcher, 'load', side_effect=IndexError('invalid index')):
+            self.assertTrue(await component.process_epoch())
+        self.assertIs(component._network_tables, network_tables)
+        self.assertEqual(self.sent_messages(component), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+
+'''
+Unit tests for the TopologyIndex class in Topology.py.
+'''
+
+import unittest
+
+from tests.network_data import BRANCHES, BUS_NAMES, BUS_TYPES, create_network_content
+
+from NetworkTables import NetworkTables
+from Topology import NO_INDEX, TopologyIndex
+
+
+def create_tables(bus_names=None, bus_types=None, branches=None) -> NetworkTables:
+    '''Return the network tables for the given buses and branches, the example feeder by default.'''
+    content = create_network_content(bus_names, bus_types, branches)
+    return NetworkTables.from_content(content, content)
+
+
+class TestTopologyIndex(unittest.TestCase):
+    '''Unit tests for the TopologyIndex class.'''
+
+    def test_radial_network(self):
+        '''Test the index of the radial example feeder.'''
+        topology = TopologyIndex(create_tables())
+
+        self.assertTrue(topology.is_radial)
+        self.assertEqual(topology.root, 0)
+        self.assertEqual(topology.roots, [0])
+        self.assertEqual(topology.tree_count, 1)
+        self.assertEqual(list(topology.parent_bus), [NO_INDEX, 0, 1, 1, 3])
+        self.assertEqual(list(topology.parent_branch), [NO_INDEX, 0, 1, 2, 3])
+        self.assertEqual(list(topology.depth), [0, 1, 2, 2, 3])
+        self.assertEqual(list(topology.bfs_order), [0, 1, 2, 3, 4])
+        self.assertEqual(list(topology.dfs_order), [0, 1, 2, 3, 4])
+        self.assertEqual(list(topology.backward_sweep_order()), [4, 3, 2, 1, 0])
+
+        self.assertEqual(sorted(topology.neighbours_of(1)), [0, 2, 3])
+        self.assertEqual(sorted(topology.branches_of(1)), [0, 1, 2])
+        self.assertEqual(topology.children_of(1), [2, 3])
+        self.assertEqual(topology.children_of(4), [])
+        self.assertEqual(topology.path_to_root(4), [4, 3, 1, 0])
+        self.assertEqual(topology.describe_problems(create_tables()), [])
+
+    def test_depth_first_order(self):
+        '''Test that the depth-first order visits each subtree completely before the next one.'''
+        branches = [('a', 'bus0', 'bus1'), ('b', 'bus0', 'bus2'), ('c', 'bus1', 'bus3'), ('d', 'bus2', 'bus4')]
+        topology = TopologyIndex(create_tables(branches=branches))
+        self.assertEqual(list(topology.bfs_order), [0, 1, 2, 3, 4])
+        self.assertEqual(list(topology.dfs_order), [0, 1, 3, 2, 4])
+
+    def test_loops_and_islands(self):
+        '''Test that the loop branches and the islands are found.'''
+        bus_names = BUS_NAMES + ['bus5', 'bus6']
+        bus_types = BUS_TYPES + ['dummy', 'dummy']
+        branches = BRANCHES + [('loop', 'bus2', 'bus4'), ('island', 'bus5', 'bus6')]
+        tables = create_tables(bus_names, bus_types, branches)
+        topology = TopologyIndex(tables)
+
+        self.assertFalse(topology.is_radial)
+        # bus4 is reached from bus2 through the loop branch before it is reached from bus3
+        self.assertEqual(list(topology.loop_branches), [3])
+        self.assertEqual([sorted(island) for island in topology.islands], [[5, 6]])
+        self.assertIsNone(topology.path_to_root(6))
+        self.assertEqual(len(topology.describe_problems(tables)), 2)
+
+    def test_unknown_end_points(self):
+        '''Test that the end points that are not buses are included as nodes after the buses.'''
+        branches = BRANCHES + [('line5', 'bus4', 'unknown')]
+        tables = create_tables(branches=branches)
+        topology = TopologyIndex(tables)
+
+        self.assertEqual(topology.node_count, len(BUS_NAMES) + 1)
+        self.assertEqual(topology.path_to_root(5), [5, 4, 3, 1, 0])
+
+    def test_without_root(self):
+        '''Test a network without a root bus.'''
+        topology = TopologyIndex(create_tables(bus_types=['dummy'] * len(BUS_NAMES)))
+
+        self.assertEqual(topology.root, NO_INDEX)
+        self.assertFalse(topology.is_radial)
+        self.assertEqual(len(topology.islands), 1)
+        self.assertEqual(len(topology.bfs_order), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
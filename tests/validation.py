@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Tampere University
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+
+'''
+Unit tests for the validation of the network tables in Validation.py.
+'''
+
+import math
+import unittest
+
+from tests.network_data import BUS_NAMES, BUS_TYPES, create_network_content
+
+from NetworkTables import NetworkTables
+from Validation import MAX_EXAMPLES, validate_network_tables
+
+
+class TestValidation(unittest.TestCase):
+    '''Unit tests for the validate_network_tables function.'''
+
+    def validate(self, content, single_root: bool = True):
+        '''Return the tables for the given content and the validation report for them.'''
+        tables = NetworkTables.from_content(content, content)
+        return tables, validate_network_tables(tables, single_root)
+
+    def assert_issue(self, content, check: str, single_root: bool = True):
+        '''Check that the given content fails only the given check.'''
+        tables, report = self.validate(content, single_root)
+        self.assertFalse(report.is_valid)
+        self.assertFalse(tables.trusted)
+        self.assertEqual([issue.check for issue in report.issues], [check], str(report))
+
+    def test_valid_network(self):
+        '''Test that the example feeder is valid and the tables are marked as trusted.'''
+        tables, report = self.validate(create_network_content())
+        self.assertTrue(report.is_valid, str(report))
+        self.assertTrue(tables.trusted)
+        self.assertEqual(report.branch_count, 4)
+        self.assertEqual(report.bus_count, 5)
+
+    def test_lengths(self):
+        '''Test that the arrays with different lengths are reported.'''
+        content = create_network_content()
+        content['ShuntAdmittance'] = [0.0] * 3
+        self.assert_issue(content, 'length')
+
+    def test_unknown_end_points(self):
+        '''Test that the end points that are not in BusName are reported by name.'''
+        content = create_network_content()
+        content['ReceivingEndBus'][-1] = 'unknown'
+        tables, report = self.validate(content)
+        self.assertEqual([issue.check for issue in report.issues], ['endpoint'])
+        self.assertEqual(report.issues[0].examples, ['unknown'])
+        self.assertFalse(tables.trusted)
+
+    def test_duplicates(self):
+        '''Test that the duplicate device ids and bus names are reported.'''
+        content = create_network_content()
+        content['DeviceId'][1] = content['DeviceId'][0]
+        self.assert_issue(content, 'duplicate')
+
+        content = create_network_content(bus_names=BUS_NAMES + ['bus1'], bus_types=BUS_TYPES + ['dummy'])
+        self.assert_issue(content, 'duplicate')
+
+    def test_bus_types(self):
+        '''Test the root bus count and the unknown bus types.'''
+        two_roots = create_network_content(bus_types=['root', 'root'] + BUS_TYPES[2:])
+        self.assert_issue(two_roots, 'bus_type')
+        _, report = self.validate(two_roots, single_root=False)
+        self.assertTrue(report.is_valid)
+
+        self.assert_issue(create_network_content(bus_types=['dummy'] + BUS_TYPES[1:]), 'bus_type', single_root=False)
+        self.assert_issue(create_network_content(bus_types=BUS_TYPES[:-1] + ['other']), 'bus_type')
+
+    def test_values(self):
+        '''Test that the negative and non-finite values are reported with a limited number of examples.'''
+        for invalid_value in (-1.0, math.inf, math.nan):
+            with self.subTest(value=invalid_value):
+                content = create_network_content()
+                content['ShuntConductance'][2] = invalid_value
+                self.assert_issue(content, 'value')
+
+        branches = [(f'line{row}', 'bus0', 'bus1') for row in range(MAX_EXAMPLES + 3)]
+        content = create_network_content(branches=branches)
+        content['DeviceId'] = [f'line{row}' for row in range(len(branches))]
+        content['ShuntAdmittance'] = [-1.0] * len(branches)
+        _, report = self.validate(content)
+        issue = report.issues[0]
+        self.assertEqual(issue.count, len(branches))
+        self.assertEqual(len(issue.examples), MAX_EXAMPLES)
+        self.assertIn('and 3 more', str(issue))
+
+
+if __name__ == '__main__':
+    unittest.main()